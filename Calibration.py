@@ -0,0 +1,319 @@
+### Calibration of the evaporation coefficient sigma and the heat transfer coefficients
+### to measured plant data: the misfit of the simulated tank pressure PV and liquid
+### level h to the measured series is minimized by a trust region least squares method
+### (scipy.optimize.least_squares). The gradients come from the IDA sensitivities of
+### the simulation (Tank sensitivities) or from finite differences of perturbed runs in
+### the worker processes of Sweep.iter_sweep. One pre-processed tank is simulated again
+### for every evaluation and the evaluations are cached.
+### Command line, from the repository root:
+###     python -m Calibration plant_data.xlsx --parameters sigma Ul Uv --output fit.json
+### calibrates the base case (or --config, as in Sweep) to the measurements: columns
+### "Time (min)" (from the start of the simulation), "Pressure (kPa)" and/or "h (m)".
+
+import io
+import sys
+import json
+import timeit
+import argparse
+import contextlib
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares
+import matplotlib.pyplot as plt
+from matplotlib.ticker import FormatStrFormatter
+from TankModel import SENSITIVITY_PARAMETERS
+from Tank_v2 import Tank
+from Sweep import BASE_CASE, load_config, iter_sweep, _value
+
+CALIBRATION_PARAMETERS = ["sigma", "Ul", "Uv", "Uvw", "Ulw"]
+CALIBRATION_OUTPUTS = {"PV": "Pressure (kPa)", "h": "h (m)"}  # measured columns (as in Tank.save_results)
+CALIBRATION_SCALES = {"PV": 0.1, "h": 0.001}  # default measurement uncertainties (kPa, m)
+GRADIENTS = ["sensitivities", "finite-difference"]
+FD_STEP = 1e-2  # relative perturbation of the finite differences
+BOUNDS_FACTOR = 100  # default bounds: the initial values divided and multiplied by it
+
+def load_measurements(measurements):
+    """
+    Returns the measurements (a DataFrame, or an xlsx or csv path) as a DataFrame of the
+    column "Time (min)" and the measured columns of CALIBRATION_OUTPUTS, sorted by time.
+    Missing values (NaN) are left out of the misfit.
+    """
+    if isinstance(measurements, str):
+        measurements = pd.read_csv(measurements) if measurements.endswith(".csv") else pd.read_excel(measurements)
+    columns = [column for column in CALIBRATION_OUTPUTS.values() if column in measurements]
+    if "Time (min)" not in measurements or not columns:
+        raise ValueError(f"The measurements need the column \"Time (min)\" and at least one of "
+                         f"{list(CALIBRATION_OUTPUTS.values())}.")
+    measurements = measurements[["Time (min)"] + columns].astype(float)
+    measurements = measurements.sort_values("Time (min)", ignore_index=True)
+    if measurements["Time (min)"].iloc[0] < 0 or measurements["Time (min)"].iloc[-1] <= 0:
+        raise ValueError("The measurement times must not be negative and must not all be 0.")
+    return measurements
+
+class Calibration:
+    """
+    Least squares fit of the coefficients parameters (SENSITIVITY_PARAMETERS, in the
+    units of the Tank arguments) of the Tank arguments base to measurements
+    (load_measurements). The residuals are (simulated - measured) / scales[output] at
+    the measured times; the simulation runs up to the last of them (rounded up to 5
+    min) and returns its output there. The coefficients are fitted as the logarithm of
+    their ratio to the initial values, which keeps them positive and scales them alike
+    (a unit step is a factor e).
+    gradient is "sensitivities" (IDA, with each simulation) or "finite-difference"
+    (FD_STEP perturbed runs in workers processes, default one per core).
+    """
+
+    def __init__(self, base, measurements, parameters=CALIBRATION_PARAMETERS, gradient="sensitivities",
+                 workers=None, scales=None):
+        parameters = list(parameters)
+        for name in parameters:
+            if name not in SENSITIVITY_PARAMETERS:
+                raise ValueError(f"Unknown calibration parameter {name}. Choose from {SENSITIVITY_PARAMETERS}.")
+        if not parameters or len(set(parameters)) != len(parameters):
+            raise ValueError(f"Give distinct calibration parameters, got {parameters}.")
+        if gradient not in GRADIENTS:
+            raise ValueError(f"Unknown gradient {gradient}. Choose from {GRADIENTS}.")
+        self.parameters = parameters
+        self.gradient = gradient
+        self.workers = workers
+        self.measurements = load_measurements(measurements)
+        self.times = self.measurements["Time (min)"].to_numpy()
+        self.scales = {**CALIBRATION_SCALES, **(scales or {})}
+        self.outputs = [name for name, column in CALIBRATION_OUTPUTS.items() if column in self.measurements]
+        measured = np.concatenate([self.measurements[CALIBRATION_OUTPUTS[name]].to_numpy() for name in self.outputs])
+        self.mask = ~np.isnan(measured)
+        self.measured = measured[self.mask]
+
+        minutes = 5 * int(np.ceil(self.times[-1] / 5 - 1e-9))
+        self.config = load_config({**base, "numberofIterations": minutes,
+                                   "outputGrid": [time for time in self.times if time > 0]})
+        self.config.pop("sensitivities", None)  # the perturbed runs of the workers need none
+        self.initial = {name: float(self.config[name]) for name in parameters}
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.tank = Tank(**self.config, sensitivities=parameters if gradient == "sensitivities" else None)
+            status = self.tank.check_input()
+            if status is not True:
+                raise ValueError(status)
+            self.tank.data_preprocessing()  # once, for all the evaluations
+        self.cache = {}
+        self.history = []
+        self.cacheHits = 0
+
+    def values(self, z):
+        """
+        Returns the coefficients (dict) of the scaled parameters z.
+        """
+        return {name: self.initial[name] * float(np.exp(zj)) for name, zj in zip(self.parameters, z)}
+
+    def scaled(self, values):
+        """
+        Returns the scaled parameters z of the coefficients values (dict).
+        """
+        return np.array([np.log(values[name] / self.initial[name]) for name in self.parameters])
+
+    def residuals(self, z):
+        """
+        Returns the residuals at the scaled parameters z, simulating if z is not cached.
+        """
+        return self.evaluate(z)[0]
+
+    def jacobian(self, z):
+        """
+        Returns the Jacobian (residuals x parameters) of the residuals to z.
+        """
+        residuals, jacobian = self.evaluate(z)
+        if not np.all(np.isfinite(residuals)):
+            raise RuntimeError(f"The simulation failed: {self.history[-1]['status']}")
+        if jacobian is None:
+            jacobian = self.finite_differences(z, residuals)
+            self.cache[self._key(z)] = (residuals, jacobian)
+        return jacobian
+
+    def evaluate(self, z):
+        """
+        Returns the cached (residuals, Jacobian or None) at z, after simulating the tank
+        with the coefficients of z if they are not cached. With gradient "sensitivities"
+        the Jacobian comes with the simulation (None if the sensitivities are not finite).
+        If the simulation fails the residuals are NaN and are not cached (see history for
+        the error).
+        """
+        key = self._key(z)
+        if key in self.cache:
+            self.cacheHits += 1
+            return self.cache[key]
+        values = self.values(z)
+        for name, value in values.items():
+            setattr(self.tank, name, value)
+        start = timeit.default_timer()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.tank.run_simulation()
+            t = np.ravel(self.tank.t) * 24 * 60
+            residuals = self._residuals(t, {name: np.ravel(getattr(self.tank, name)) for name in self.outputs})
+            jacobian = None
+            if self.gradient == "sensitivities":
+                # d(residual)/dz = d(output)/dp * p / scale
+                sensitivities = self.tank.sensitivities
+                jacobian = np.concatenate([self._at(t, sensitivities[name]) / self.scales[name]
+                                           for name in self.outputs])[self.mask]
+                jacobian = jacobian * np.array([values[name] for name in self.parameters])
+                if not np.all(np.isfinite(jacobian)):
+                    jacobian = None  # finite differences instead
+            if not np.all(np.isfinite(residuals)):
+                raise FloatingPointError("The simulated outputs are not finite.")
+            status = "ok"
+        except Exception as error:
+            # not finite: least_squares rejects the step and shrinks its trust region
+            residuals, jacobian = np.full(len(self.measured), np.nan), None
+            status = f"{type(error).__name__}: {error}"
+        self.history.append({**values, "cost": 0.5 * float(residuals @ residuals), "status": status,
+                             "wall time (s)": timeit.default_timer() - start})
+        if status != "ok":
+            return residuals, jacobian  # failed runs are not cached
+        self.cache[key] = (residuals, jacobian)
+        return self.cache[key]
+
+    def finite_differences(self, z, residuals):
+        """
+        Returns the forward difference Jacobian at z from runs with each coefficient
+        perturbed by FD_STEP, in parallel in worker processes.
+        """
+        values = self.values(z)
+        dz = np.log(1 + FD_STEP)
+        variants = [{**values, name: values[name] * (1 + FD_STEP)} for name in self.parameters]
+        jacobian = np.zeros((len(residuals), len(self.parameters)))
+        for j, variant, result in iter_sweep(self.config, variants, self.workers, self.outputs):
+            if result["trajectories"] is None:
+                raise RuntimeError(f"The perturbed run of {self.parameters[j]} failed: {result['status']}")
+            trajectories = result["trajectories"]
+            perturbed = self._residuals(trajectories["time (min)"], trajectories)
+            zj = z.copy()
+            zj[j] += dz
+            self.cache.setdefault(self._key(zj), (perturbed, None))
+            jacobian[:, j] = (perturbed - residuals) / dz
+        return jacobian
+
+    def fit(self, initial=None, bounds=None, max_evaluations=50, callback=None):
+        """
+        Minimizes the misfit starting from the coefficients initial (dict, default the
+        Tank arguments; e.g. the result of an earlier calibration) within bounds (dict of
+        name to (lower, upper), default within BOUNDS_FACTOR of the initial values, which
+        keeps coefficients that hardly affect the outputs in range). callback(iteration, cost) is called
+        after each Jacobian evaluation. Returns a dict of the fitted coefficients, the
+        initial and final cost, the IDA runs, cache hits and wall time, the status of the
+        optimizer and the history of the evaluations (DataFrame).
+        """
+        start = timeit.default_timer()
+        z0 = self.scaled({**self.initial, **(initial or {})})
+        lower, upper = np.full(len(z0), -np.inf), np.full(len(z0), np.inf)
+        for j, name in enumerate(self.parameters):
+            value = np.exp(z0[j]) * self.initial[name]
+            low, high = (bounds or {}).get(name, (value / BOUNDS_FACTOR, value * BOUNDS_FACTOR))
+            lower[j] = np.log(low / self.initial[name]) if low > 0 else -np.inf
+            upper[j] = np.log(high / self.initial[name]) if np.isfinite(high) else np.inf
+        z0 = np.clip(z0, lower + 1e-12, upper - 1e-12)
+        iterations = []
+
+        def jacobian(z):
+            J = self.jacobian(z)
+            iterations.append(z)
+            if callback is not None:
+                residuals = self.cache[self._key(z)][0]
+                callback(len(iterations), 0.5 * float(residuals @ residuals))
+            return J
+
+        residuals = self.residuals(z0)
+        if not np.all(np.isfinite(residuals)):
+            raise RuntimeError(f"The simulation of the initial coefficients failed: {self.history[-1]['status']}")
+        initial_cost = 0.5 * float(residuals @ residuals)
+        result = least_squares(self.residuals, z0, jac=jacobian, bounds=(lower, upper), method="trf",
+                               max_nfev=max_evaluations)
+        return {"parameters": self.values(result.x), "initial cost": initial_cost, "cost": float(result.cost),
+                "status": result.message, "success": bool(result.success), "iterations": len(iterations),
+                "simulations": len(self.history), "cache hits": self.cacheHits,
+                "wall time (s)": timeit.default_timer() - start, "history": pd.DataFrame(self.history)}
+
+    def comparison(self, values):
+        """
+        Returns the measurements with the simulated outputs of the coefficients values
+        (dict) as columns "Simulated ..." beside them.
+        """
+        for name, value in values.items():
+            setattr(self.tank, name, value)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.tank.run_simulation()
+        table = self.measurements.copy()
+        t = np.ravel(self.tank.t) * 24 * 60
+        for name in self.outputs:
+            table[f"Simulated {CALIBRATION_OUTPUTS[name]}"] = np.interp(self.times, t, np.ravel(getattr(self.tank, name)))
+        return table
+
+    def _residuals(self, t, simulated):
+        return np.concatenate([(self._at(t, simulated[name]) - self.measurements[CALIBRATION_OUTPUTS[name]].to_numpy()) /
+                               self.scales[name] for name in self.outputs])[self.mask]
+
+    def _at(self, t, values):
+        # values (rows at the output times t, min) at the measured times; these are output
+        # times of the simulation, so the interpolation only picks rows
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1:
+            return np.interp(self.times, t, values)
+        return np.column_stack([np.interp(self.times, t, column) for column in values.T])
+
+    def _key(self, z):
+        return tuple(np.round(np.asarray(z, dtype=float), 12))
+
+def plot_fit(table, name):
+    """
+    Plots the measured and simulated output name (PV or h) of a comparison table
+    (Calibration.comparison) against the time (min).
+    """
+    column = CALIBRATION_OUTPUTS[name]
+    fig, ax = plt.subplots(1, 1, dpi=100)
+    ax.plot(table["Time (min)"], table[column], "o", markersize=3, label="Measured")
+    ax.plot(table["Time (min)"], table[f"Simulated {column}"], label="Calibrated model")
+    ax.yaxis.set_major_formatter(FormatStrFormatter('%.2f'))
+    ax.minorticks_on()
+    ax.set_xlim(xmin=0)
+    ax.set_xlabel('Time (min)', fontsize=14)
+    ax.set_ylabel({"PV": "Pressure (kPa)", "h": "Liquid level (m)"}[name], fontsize=14)
+    ax.set_title('Calibration Fit', fontsize=16)
+    ax.legend()
+    return fig
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calibration of the tank model coefficients to plant data.")
+    parser.add_argument("measurements", help="xlsx or csv with Time (min), Pressure (kPa) and/or h (m)")
+    parser.add_argument("--config", help="JSON file of Tank arguments (default: the base case)")
+    parser.add_argument("--set", nargs="*", default=[], metavar="NAME=VALUE", help="base arguments to override")
+    parser.add_argument("--parameters", nargs="*", default=CALIBRATION_PARAMETERS, help="coefficients to fit")
+    parser.add_argument("--gradient", default="sensitivities", choices=GRADIENTS)
+    parser.add_argument("--workers", type=int, help="worker processes of the finite differences")
+    parser.add_argument("--initial", help="JSON file of initial coefficients, e.g. an earlier --output")
+    parser.add_argument("--max-evaluations", type=int, default=50)
+    parser.add_argument("--output", default="calibration.json", help="JSON file of the fitted coefficients")
+    args = parser.parse_args(argv)
+
+    base = dict(BASE_CASE)
+    if args.config:
+        with open(args.config) as file:
+            base.update(json.load(file))
+    for item in args.set:
+        name, value = item.split("=", 1)
+        base[name] = _value(value)
+    initial = None
+    if args.initial:
+        with open(args.initial) as file:
+            initial = json.load(file)
+    calibration = Calibration(base, args.measurements, args.parameters, args.gradient, args.workers)
+    result = calibration.fit(initial, max_evaluations=args.max_evaluations,
+                             callback=lambda iteration, cost: print(f"Iteration {iteration}: cost {cost:.6g}"))
+    print(result["history"].to_string(index=False))
+    print(f"{result['status']} Cost {result['initial cost']:.6g} -> {result['cost']:.6g} in "
+          f"{result['simulations']} simulations ({result['cache hits']} cached), {result['wall time (s)']:.1f} s")
+    with open(args.output, "w") as file:
+        json.dump(result["parameters"], file, indent=2)
+    print(f"Saved the fitted coefficients to {args.output}: {result['parameters']}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
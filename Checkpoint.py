@@ -0,0 +1,123 @@
+### Checkpoints of Tank.run_simulation: the state of the DAE at the end of an IDA segment
+### in a small compressed NumPy file (np.savez_compressed), and the output rows in
+### history files next to it that the checkpoints only append to. Every run, and every
+### resume or fork of a run, appends to a history file of its own (new_history), and a
+### checkpoint records its lineage: the history files and the number of their rows that
+### make up the output up to it. A fork from an earlier checkpoint therefore never
+### overwrites the output of the run it came from, and the disk use grows linearly with
+### the simulated time. IDA is re-initialised at the end of every segment with the
+### derivative of TankModel.consistent_derivative, so the derivative is not stored and
+### resuming from a checkpoint (Tank.resume_from) continues the integration as the
+### uninterrupted run would. A checkpoint can also be the start of another scenario with
+### the same disks and components (a fork), which then does not simulate the common
+### prefix again.
+
+import json
+import os
+import numpy as np
+
+CHECKPOINT_VERSION = 3
+
+def new_history(path):
+    """
+    Creates an empty history file for a run writing the checkpoints path and returns its
+    path: run_history.bin for run_{minutes}.npz or run.npz, or run_history_2.bin,
+    run_history_3.bin, ... if that exists already.
+    """
+    root = os.path.splitext(path.replace("{minutes}", ""))[0].rstrip("_-.")
+    k = 1
+    while True:
+        history = root + ("_history.bin" if k == 1 else f"_history_{k}.bin")
+        try:
+            open(history, "xb").close()
+            return history
+        except FileExistsError:
+            k += 1
+
+def append_history(history, t, y, rows):
+    """
+    Appends the output times t (n x 1) and rows y (n x NE) to the history file history
+    after its first rows rows (rows of an append that did not complete are dropped).
+    Returns the number of rows in the file.
+    """
+    data = np.column_stack((np.reshape(t, (-1, 1)), y)).astype(float)
+    with open(history, "r+b") as file:
+        file.truncate(rows * data.shape[1] * data.itemsize)
+        file.seek(0, os.SEEK_END)
+        file.write(data.tobytes())
+        file.flush()
+        os.fsync(file.fileno())
+    return rows + len(data)
+
+def save_checkpoint(path, interval, u, lineage, statistics, jacobianErrors):
+    """
+    Writes a checkpoint at the start of the 5 minute interval interval: the state u at
+    the restart, the lineage of the output up to it (a list of history files and their
+    numbers of rows, in order) and the IDA statistics and Jacobian checks so far.
+    "{minutes}" in path is replaced by the simulated time, so that every checkpoint gets
+    its own file. The file is written under a temporary name and then renamed, so a
+    crash while writing leaves the previous checkpoint intact. Returns the path written.
+    """
+    path = path.format(minutes=5 * interval)
+    directory = os.path.dirname(os.path.abspath(path))
+    lineage = [[os.path.relpath(os.path.abspath(history), directory), int(rows)] for history, rows in lineage]
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        np.savez_compressed(file, version=CHECKPOINT_VERSION, interval=interval, u=u, lineage=json.dumps(lineage),
+                            statistics=json.dumps(statistics, default=lambda x: x.item()),
+                            jacobianErrors=np.asarray(jacobianErrors, dtype=float))
+    os.replace(temporary, path)
+    return path
+
+def load_checkpoint(path):
+    """
+    Reads a checkpoint written by save_checkpoint and the output up to it from its
+    history files into a dict with the keys interval, t, y, u, statistics,
+    jacobianErrors and lineage (with the paths of the history files).
+    """
+    with np.load(path) as data:
+        if int(data["version"]) != CHECKPOINT_VERSION:
+            raise ValueError(f"Checkpoint version {int(data['version'])} is not supported, "
+                             f"expected {CHECKPOINT_VERSION}.")
+        u = data["u"]
+        directory = os.path.dirname(os.path.abspath(path))
+        lineage = [(os.path.join(directory, history), rows) for history, rows in json.loads(str(data["lineage"]))]
+        checkpoint = {"interval": int(data["interval"]), "u": u, "lineage": lineage,
+                      "statistics": json.loads(str(data["statistics"])),
+                      "jacobianErrors": list(data["jacobianErrors"])}
+    outputs = []
+    for history, rows in lineage:
+        output = np.fromfile(history, dtype=float, count=rows * (len(u) + 1))
+        if len(output) != rows * (len(u) + 1):
+            raise ValueError(f"The history file {history} has fewer than the {rows} rows of the checkpoint.")
+        outputs.append(output.reshape(rows, len(u) + 1))
+    output = np.concatenate(outputs) if outputs else np.empty((0, len(u) + 1))
+    checkpoint["t"], checkpoint["y"] = output[:, :1], output[:, 1:]
+    return checkpoint
+
+class CheckpointWriter:
+    """
+    Writes the checkpoints of one run to path (see save_checkpoint). The run's output is
+    appended to a history file of its own, created at the first checkpoint. A run
+    resumed from checkpoint (the result of load_checkpoint) refers to the lineage of
+    the checkpoint for the output before it.
+    """
+    def __init__(self, path, checkpoint=None):
+        self.path = path
+        self.lineage = [] if checkpoint is None else list(checkpoint["lineage"])
+        self.inherited = sum(rows for _, rows in self.lineage)  # output rows before this run
+        self.history = None
+        self.rows = 0  # rows of this run in its history file
+
+    def write(self, interval, u, t, y, statistics, jacobianErrors):
+        """
+        Writes the checkpoint at the interval with the state u, after appending the rows
+        of the output times t and rows y of the run (including the output before a
+        resumed checkpoint) that are not in the history yet. Returns the path written.
+        """
+        if self.history is None:
+            self.history = new_history(self.path)
+        start = self.inherited + self.rows
+        self.rows = append_history(self.history, t[start:], y[start:], self.rows)
+        return save_checkpoint(self.path, interval, u, self.lineage + [(self.history, self.rows)], statistics,
+                               jacobianErrors)
@@ -0,0 +1,163 @@
+### Monte Carlo propagation of the uncertainty of the heat leak coefficients and the
+### evaporation coefficient sigma. The coefficients are sampled around their nominal
+### values, the ensemble is run in the worker processes of Sweep.iter_sweep, and the
+### tank pressure, liquid level and boil-off of each finished run are reduced at once
+### into percentile bands (P5, P50, P95) by streaming P-square estimators (Jain and
+### Chlamtac, 1985), so the memory does not grow with the number of samples.
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from matplotlib.ticker import FormatStrFormatter
+from Sweep import iter_sweep
+
+MC_PARAMETERS = ["sigma", "Ul", "Uv", "Uvw", "Ulw", "Ur", "Ub", "Uvr", "Ulr"]
+MC_OUTPUTS = ["PV", "h", "VF"]  # tank pressure, liquid level and boil-off
+MC_LABELS = {"PV": "Pressure (kPa)", "h": "Liquid level (m)", "VF": "Boil-off (kg/s)"}
+PERCENTILES = [5, 50, 95]
+DISTRIBUTIONS = ["fixed", "normal", "lognormal", "uniform", "triangular"]
+
+def sample_parameters(distributions, nominal, samples, seed=None):
+    """
+    Returns samples variants (dicts) of the coefficients in distributions, a dict of
+    name to (distribution, spread) around the nominal value nominal[name]:
+    "normal" (standard deviation spread * nominal, cut at zero), "lognormal" (median
+    nominal, standard deviation of the logarithm spread), "uniform" and "triangular"
+    (between (1 - spread) and (1 + spread) * nominal), or "fixed".
+    """
+    rng = np.random.default_rng(seed)
+    values = {}
+    for name, (distribution, spread) in distributions.items():
+        if name not in MC_PARAMETERS:
+            raise ValueError(f"Unknown uncertain parameter {name}. Choose from {MC_PARAMETERS}.")
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown distribution {distribution}. Choose from {DISTRIBUTIONS}.")
+        if spread < 0:
+            raise ValueError(f"The spread of {name} must not be negative, got {spread}.")
+        x = nominal[name]
+        if distribution == "fixed":
+            continue
+        elif distribution == "normal":
+            values[name] = np.maximum(rng.normal(x, spread * x, samples), 0)
+        elif distribution == "lognormal":
+            values[name] = x * rng.lognormal(0, spread, samples)
+        elif distribution == "uniform":
+            values[name] = rng.uniform((1 - spread) * x, (1 + spread) * x, samples)
+        else:
+            values[name] = rng.triangular((1 - spread) * x, x, (1 + spread) * x, samples) if spread > 0 \
+                else np.full(samples, x)
+    return [{name: float(values[name][k]) for name in values} for k in range(samples)]
+
+class StreamingPercentiles:
+    """
+    P-square estimates of the percentiles (in %) of a stream of vectors of equal
+    length, element by element: five markers per percentile and element, adjusted
+    by piecewise parabolic interpolation as the vectors arrive. The first exact
+    vectors are kept and give the exact percentiles; the markers start at their
+    order statistics.
+    """
+
+    def __init__(self, percentiles=PERCENTILES, exact=100):
+        self.p = np.asarray(percentiles, dtype=float).reshape(-1, 1, 1) / 100
+        self.dn = np.concatenate((0 * self.p, self.p / 2, self.p, (1 + self.p) / 2, 1 + 0 * self.p), axis=1)
+        self.exact = max(int(exact), 5)
+        self.count = 0
+        self._first = []
+        self.q = None  # marker heights (percentiles x 5 x length)
+
+    def add(self, x):
+        x = np.asarray(x, dtype=float).reshape(1, -1)
+        self.count += 1
+        if self.count <= self.exact:
+            self._first.append(x[0])
+            if self.count == self.exact:
+                first = np.sort(self._first, axis=0)
+                self._first = None
+                self.nd = (self.count - 1) * self.dn * np.ones((1, 1, first.shape[1]))
+                n = np.round(self.nd[:, :, 0]).astype(int)
+                for i in range(1, 4):  # distinct marker positions, within the samples
+                    n[:, i] = np.maximum(n[:, i], n[:, i - 1] + 1)
+                for i in range(3, 0, -1):
+                    n[:, i] = np.minimum(n[:, i], n[:, i + 1] - 1)
+                self.q = first[n]
+                self.n = n[:, :, None] * np.ones_like(self.q)
+            return
+        q, n = self.q, self.n
+        q[:, 0] = np.minimum(q[:, 0], x)
+        q[:, 4] = np.maximum(q[:, 4], x)
+        k = np.sum(x[:, None] >= q[:, 1:4], axis=1)  # cell of x between the markers
+        n[:, 1:] += np.arange(1, 5).reshape(1, 4, 1) > k[:, None]
+        self.nd += self.dn
+        for i in range(1, 4):
+            d = self.nd[:, i] - n[:, i]
+            move = ((d >= 1) & (n[:, i + 1] - n[:, i] > 1)) | ((d <= -1) & (n[:, i - 1] - n[:, i] < -1))
+            d = np.sign(d) * move
+            parabolic = q[:, i] + d / (n[:, i + 1] - n[:, i - 1]) * (
+                (n[:, i] - n[:, i - 1] + d) * (q[:, i + 1] - q[:, i]) / (n[:, i + 1] - n[:, i]) +
+                (n[:, i + 1] - n[:, i] - d) * (q[:, i] - q[:, i - 1]) / (n[:, i] - n[:, i - 1]))
+            j = np.where(d > 0, i + 1, i - 1)
+            qj = np.take_along_axis(q, j[:, None], axis=1)[:, 0]
+            nj = np.take_along_axis(n, j[:, None], axis=1)[:, 0]
+            linear = q[:, i] + d * (qj - q[:, i]) / np.where(move, nj - n[:, i], 1)
+            inside = (q[:, i - 1] < parabolic) & (parabolic < q[:, i + 1])
+            q[:, i] = np.where(move, np.where(inside, parabolic, linear), q[:, i])
+            n[:, i] += d
+
+    def percentiles(self):
+        """
+        Returns the estimated percentiles (percentiles x length).
+        """
+        if self.count == 0:
+            raise ValueError("No samples were added.")
+        if self.count < self.exact:
+            return np.percentile(self._first, 100 * self.p[:, 0, 0], axis=0)
+        return self.q[:, 2].copy()
+
+def monte_carlo(base, distributions, samples, workers=None, seed=None, callback=None):
+    """
+    Runs samples variants of the Tank arguments base with the coefficients sampled
+    from distributions (sample_parameters) in worker processes, and returns the output
+    times (min), the PERCENTILES bands of MC_OUTPUTS (dict of name to percentiles x
+    times) and a table of the sampled coefficients and status of each run.
+    callback(done, samples) is called as the runs finish.
+    """
+    if isinstance(base.get("outputGrid"), str):
+        raise ValueError("The runs of a Monte Carlo ensemble need the same output times, not the solver steps.")
+    variants = sample_parameters(distributions, base, samples, seed)
+    bands = {name: StreamingPercentiles(PERCENTILES) for name in MC_OUTPUTS}
+    t = None
+    runs = []
+    for done, (index, variant, result) in enumerate(iter_sweep(base, variants, workers, MC_OUTPUTS), 1):
+        runs.append({"run": index, **variant, "status": result["status"]})
+        trajectories = result["trajectories"]
+        if trajectories is not None:
+            if t is None:
+                t = trajectories["time (min)"]
+            if len(trajectories["time (min)"]) != len(t):
+                runs[-1]["status"] = "output times differ from the first run"
+            else:
+                for name in MC_OUTPUTS:
+                    bands[name].add(trajectories[name])
+        if callback is not None:
+            callback(done, samples)
+    if t is None:
+        raise RuntimeError(f"All {samples} runs failed, e.g. {runs[0]['status']}")
+    runs = pd.DataFrame(runs).sort_values("run", ignore_index=True)
+    return t, {name: bands[name].percentiles() for name in MC_OUTPUTS}, runs
+
+def plot_bands(t, bands, name):
+    """
+    Plots the median and the P5 to P95 band of the output name against the time (min).
+    """
+    fig, ax = plt.subplots(1, 1, dpi=100)
+    low, median, high = bands[name]
+    ax.fill_between(t, low, high, alpha=0.3, label=f"P{PERCENTILES[0]} to P{PERCENTILES[-1]}")
+    ax.plot(t, median, label=f"P{PERCENTILES[1]}")
+    ax.yaxis.set_major_formatter(FormatStrFormatter('%.2f'))
+    ax.minorticks_on()
+    ax.set_xlim(xmin=0)
+    ax.set_xlabel('Time (min)', fontsize=14)
+    ax.set_ylabel(MC_LABELS[name], fontsize=14)
+    ax.set_title(f'{MC_LABELS[name].split(" (")[0]} Uncertainty', fontsize=16)
+    ax.legend()
+    return fig
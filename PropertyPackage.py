@@ -0,0 +1,257 @@
+import importlib
+import numpy as np
+import pandas as pd
+from scipy.interpolate import CubicSpline
+from neuralNetwork import jit
+from neuralNetwork.mlp import stack_temperature_nets, stacked_temperature_net, stacked_temperature_net_and_derivative
+
+PROPERTY_MODES = ["network", "tabulated"]
+HEAT_CAPACITY_MODES = ["network", "derivative"]
+# largest relative deviation of dH/dT from the Cp network with heat_capacity="derivative"
+HEAT_CAPACITY_TOL = 0.1
+
+def tabulate_stack(stack, tol=1e-8, n_start=257, n_max=16385):
+    """
+    Builds cubic spline tables of the stacked networks over each network's training
+    window [Tmin, Tmax]. The number of grid points is doubled until the error at the
+    interval midpoints, relative to the range of each output, is below tol.
+    Returns a dictionary with the spline coefficients and the maximum absolute error.
+    """
+    I = len(stack["Tmin"])
+    n = n_start
+    while True:
+        s = np.linspace(0.0, 1.0, n).reshape(-1, 1)
+        Tgrid = stack["Tmin"] + s * stack["Trange"]
+        spline = CubicSpline(s[:, 0], stacked_temperature_net(Tgrid, stack), axis=0)
+        sm = (s[1:] + s[:-1]) / 2
+        ref = stacked_temperature_net(stack["Tmin"] + sm * stack["Trange"], stack)
+        error = np.abs(spline(sm[:, 0]) - ref).max(axis=0)
+        span = np.maximum(np.ptp(ref, axis=0), np.finfo(float).tiny)
+        if np.all(error / span <= tol) or 2 * n - 1 > n_max:
+            break
+        n = 2 * n - 1
+    # Coefficients in terms of the local coordinate u = (T - Tk)/h in [0, 1], laid out
+    # as I x (n-1) x 4M so that one gather returns every coefficient of a sample
+    coef = spline.c * (1.0 / (n - 1)) ** np.arange(3, -1, -1).reshape(-1, 1, 1, 1)
+    coef = np.ascontiguousarray(np.transpose(coef, (2, 1, 0, 3)).reshape(I, n - 1, -1))
+    return {"Tmin": stack["Tmin"], "h": stack["Trange"] / (n - 1), "n": n, "coef": coef,
+            "error": error, "span": span, "columns": np.arange(I)}
+
+def evaluate_table(T, table, stack, backend="numpy"):
+    """
+    Evaluates the spline tables at the Q temperatures T (in K). Temperatures outside
+    a network's training window are evaluated with the network itself (with backend).
+    Returns y of dimension Q x I x M.
+    """
+    T = np.asarray(T, dtype=float).reshape(-1, 1)
+    s = T - table["Tmin"]
+    s /= table["h"]
+    last = table["n"] - 1
+    k = s.astype(int)
+    outside = s.min() < 0 or s.max() > last
+    if outside:
+        np.maximum(k, 0, out=k)
+    np.minimum(k, last - 1, out=k)
+    u = s - k
+    u = u[:, :, np.newaxis]
+    c = table["coef"][table["columns"], k]
+    M = c.shape[2] // 4
+    y1 = c[:, :, :M] * u
+    y1 += c[:, :, M:2 * M]
+    y1 *= u
+    y1 += c[:, :, 2 * M:3 * M]
+    y1 *= u
+    y1 += c[:, :, 3 * M:]
+    if outside:
+        mask = (s < 0) | (s > last)
+        y1[mask] = stacked_temperature_net(T, stack, backend)[mask]
+    return y1
+
+def evaluate_table_and_derivative(T, table, stack, output=0, backend="numpy"):
+    """
+    Evaluates all outputs of the spline tables, as evaluate_table, and the exact
+    temperature derivative of one output from the same spline coefficients, with the
+    same fallback to the networks. Returns y of dimension Q x I x M and dy/dT (per K)
+    of dimension Q x I.
+    """
+    T = np.asarray(T, dtype=float).reshape(-1, 1)
+    s = T - table["Tmin"]
+    s /= table["h"]
+    last = table["n"] - 1
+    k = s.astype(int)
+    outside = s.min() < 0 or s.max() > last
+    if outside:
+        np.maximum(k, 0, out=k)
+    np.minimum(k, last - 1, out=k)
+    u = s - k
+    c = table["coef"][table["columns"], k]
+    M = c.shape[2] // 4
+    w = u[:, :, np.newaxis]
+    y1 = c[:, :, :M] * w
+    y1 += c[:, :, M:2 * M]
+    y1 *= w
+    y1 += c[:, :, 2 * M:3 * M]
+    y1 *= w
+    y1 += c[:, :, 3 * M:]
+    dy1 = 3 * c[:, :, output] * u
+    dy1 += 2 * c[:, :, M + output]
+    dy1 *= u
+    dy1 += c[:, :, 2 * M + output]
+    dy1 /= table["h"]
+    if outside:
+        mask = (s < 0) | (s > last)
+        y_net, dy_net = stacked_temperature_net_and_derivative(T, stack, output, backend)
+        y1[mask] = y_net[mask]
+        dy1[mask] = dy_net[mask]
+    return y1, dy1
+
+class PropertyPackage:
+    """
+    Evaluates the pure component properties of all components in the tank at once.
+
+    Components that expose their liquid and vapor ANNs as module level liq_net/vap_net
+    dictionaries (see components/Methane.py) have their weights stacked and are evaluated
+    together in a single batched pass. Components that only define the functions in
+    components/Component.py (e.g. user uploaded files) are called once per property with
+    the full temperature vector.
+
+    With mode="tabulated" the stacked networks are sampled once at construction and
+    replaced by cubic spline tables over their training windows (see error_report for
+    the maximum deviation from the networks).
+
+    The heat capacity is the Cp output of the networks (heat_capacity="network"). With
+    heat_capacity="derivative" it is the exact temperature derivative of the enthalpy
+    (of the network or of its spline table), so that Cp is consistent with H, where
+    dH/dT is positive and within heat_capacity_tol (relative) of the Cp output; at the
+    other temperatures, components and phases the Cp output is used and counted in
+    fallbacks. The enthalpy networks are not monotonic everywhere (e.g. nitrogen vapor
+    between 105 and 125 K), and dH/dT <= 0 would make the energy balances of the mass
+    matrix singular. Components without liq_net/vap_net always use their heat capacity
+    functions.
+
+    With backend="numba" (neuralNetwork/jit.py) the networks of this package run compiled
+    kernels and the vapor pressure and density functions of the components are compiled
+    when the package is created. The backend in use is backend, which is "numpy" if
+    numba is not installed.
+
+    All methods take a temperature array of any shape with Q values (in K) and return
+    arrays of dimension Q x I, where I is the number of components. The number of calls
+    of each method is counted in calls.
+    """
+    def __init__(self, componentList, mode="network", tabulation_tol=1e-8, heat_capacity="network",
+                 heat_capacity_tol=HEAT_CAPACITY_TOL, backend="numpy"):
+        if mode not in PROPERTY_MODES:
+            raise ValueError(f"Unknown property mode {mode}. Choose from {PROPERTY_MODES}.")
+        if heat_capacity not in HEAT_CAPACITY_MODES:
+            raise ValueError(f"Unknown heat capacity mode {heat_capacity}. Choose from {HEAT_CAPACITY_MODES}.")
+        self.componentList = componentList
+        self.mode = mode
+        self.heat_capacity = heat_capacity
+        self.heat_capacity_tol = heat_capacity_tol
+        self.backend = jit.resolve_backend(backend)
+        self.components = [importlib.import_module(name) for name in componentList]
+        self.I = len(self.components)
+        self.pure_functions = {}
+        for name in ["vapor_pressure", "density"]:
+            functions = [getattr(component, name) for component in self.components]
+            if self.backend == "numba":
+                functions = [jit.jit_function(function) for function in functions]
+            self.pure_functions[name] = functions
+        self.net_idx = [i for i, component in enumerate(self.components)
+                        if hasattr(component, "liq_net") and hasattr(component, "vap_net")]
+        self.func_idx = [i for i in range(self.I) if i not in self.net_idx]
+        self.calls = {"liq_prop": 0, "vap_prop": 0, "density": 0, "vapor_pressure": 0}
+        self.fallbacks = {"liq_prop": 0, "vap_prop": 0}  # values of dH/dT replaced by the Cp output
+        self.liq_stack = None
+        self.vap_stack = None
+        self.liq_table = None
+        self.vap_table = None
+        if self.net_idx:
+            self.liq_stack = stack_temperature_nets([self.components[i].liq_net for i in self.net_idx])
+            self.vap_stack = stack_temperature_nets([self.components[i].vap_net for i in self.net_idx])
+            if mode == "tabulated":
+                self.liq_table = tabulate_stack(self.liq_stack, tabulation_tol)
+                self.vap_table = tabulate_stack(self.vap_stack, tabulation_tol)
+
+    def _phase_prop(self, T, stack, table, enthalpy, heat_capacity, phase):
+        T = np.asarray(T, dtype=float).reshape(-1)
+        if self.net_idx:
+            # the enthalpy, Cp output and, for "derivative", dH/dT from one pass
+            if self.heat_capacity == "derivative" and table is not None:
+                y1, dH = evaluate_table_and_derivative(T, table, stack, backend=self.backend)
+            elif self.heat_capacity == "derivative":
+                y1, dH = stacked_temperature_net_and_derivative(T, stack, backend=self.backend)
+            elif table is not None:
+                y1 = evaluate_table(T, table, stack, backend=self.backend)
+            else:
+                y1 = stacked_temperature_net(T, stack, self.backend)
+            E_net, C_net = y1[:, :, 0], y1[:, :, 1]
+            if self.heat_capacity == "derivative":
+                valid = (dH > 0) & (np.abs(dH - C_net) <= self.heat_capacity_tol * np.abs(C_net))
+                self.fallbacks[phase] += valid.size - np.count_nonzero(valid)
+                C_net = np.where(valid, dH, C_net)
+            if not self.func_idx:
+                return E_net, C_net
+        E = np.empty((len(T), self.I))
+        C = np.empty((len(T), self.I))
+        if self.net_idx:
+            E[:, self.net_idx] = E_net
+            C[:, self.net_idx] = C_net
+        for i in self.func_idx:
+            E[:, i] = getattr(self.components[i], enthalpy)(T.reshape(-1, 1))
+            C[:, i] = getattr(self.components[i], heat_capacity)(T.reshape(-1, 1))
+        return E, C
+
+    def _pure_prop(self, T, name):
+        T = np.asarray(T, dtype=float).reshape(-1)
+        out = np.empty((len(T), self.I))
+        for i, function in enumerate(self.pure_functions[name]):
+            out[:, i] = function(T)
+        return out
+
+    def liq_prop(self, T):
+        """
+        Returns the liquid enthalpy (J/kg), heat capacity (J/kg/K) and density (kg/m3).
+        """
+        self.calls["liq_prop"] += 1
+        E, C = self._phase_prop(T, self.liq_stack, self.liq_table, "liq_enthalpy", "liq_heat_capacity",
+                                  "liq_prop")
+        return E, C, self._pure_prop(T, "density")
+
+    def vap_prop(self, T):
+        """
+        Returns the vapor enthalpy (J/kg) and heat capacity (J/kg/K).
+        """
+        self.calls["vap_prop"] += 1
+        return self._phase_prop(T, self.vap_stack, self.vap_table, "vap_enthalpy", "vap_heat_capacity",
+                                "vap_prop")
+
+    def density(self, T):
+        """
+        Returns the liquid density (kg/m3).
+        """
+        self.calls["density"] += 1
+        return self._pure_prop(T, "density")
+
+    def vapor_pressure(self, T):
+        """
+        Returns the vapor pressure (kPa).
+        """
+        self.calls["vapor_pressure"] += 1
+        return self._pure_prop(T, "vapor_pressure")
+
+    def error_report(self):
+        """
+        Returns a table of the maximum deviation of the tabulated properties from the
+        networks, or an empty table when the package is not in tabulated mode.
+        """
+        rows = []
+        for phase, table in [("Liquid", self.liq_table), ("Vapor", self.vap_table)]:
+            if table is None:
+                continue
+            for j, i in enumerate(self.net_idx):
+                for m, prop in enumerate(["Enthalpy (J/kg)", "Heat Capacity (J/kg/K)"]):
+                    rows.append([self.componentList[i], phase, prop, table["n"], table["error"][j, m],
+                                 table["error"][j, m] / table["span"][j, m]])
+        return pd.DataFrame(rows, columns=["Component", "Phase", "Property", "Grid Points",
+                                           "Max Abs Error", "Max Rel Error"])
@@ -0,0 +1,206 @@
+### Parameter sweeps of Tank: many variants of a base configuration simulated in a
+### pool of worker processes (concurrent.futures), gathered into one columnar table of
+### the key trajectories (tank pressure PV, liquid level h, interface temperature T_I
+### and evaporation rate wsqN).
+### Command line, from the repository root:
+###     python -m Sweep --grid sigma=5e-9,1e-8 Ul=100,200 --workers 4 --output sweep.parquet
+### runs the grid (all combinations) on the base case. --config gives another base
+### configuration (JSON of Tank arguments, data tables as xlsx paths), --set overrides
+### single arguments and --variants gives a JSON list of variants instead of a grid.
+
+import os
+import io
+import sys
+import json
+import timeit
+import argparse
+import itertools
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import pandas as pd
+from Tank_v2 import Tank
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+SWEEP_OUTPUTS = ["PV", "h", "T_I", "wsqN"]
+
+## Inputs of 1_Base_Case.py; the data tables are xlsx files read by load_config
+BASE_CASE = {
+    "noFeedStreams": 3, "noProductStreams": 3, "tankDiameter": 63.0, "tankHeight": 63.0,
+    "initialPressure": 110.0, "initialLiquidHeight": 90.0,
+    "feeds": {1: 95.0, 2: 95.0, 3: 95.0}, "products": {1: 5.0, 2: 100.0, 3: 100.0},
+    "feed_product_df": "base_feed_product_data.xlsx", "noComponents": 4,
+    "molecular_weights": {1: 16.0, 2: 30.0, 3: 44.1, 4: 28.0},
+    "componentList": ["components.Methane", "components.Ethane", "components.Propane", "components.Nitrogen"],
+    "ModelF": "neuralNetwork.ModelF", "ModelZg": "neuralNetwork.ModelZg",
+    "jacketStartValue": 0.0, "jacketEndValue": 0.0, "sigma": 5e-09, "Ul": 200.0, "Uv": 10.0,
+    "Uvw": 0.02, "Ulw": 0.02, "Ur": 0.025, "Ub": 0.025, "Uvr": 0.02, "Ulr": 0.02,
+    "groundTemp": 298.0, "ambTemp": 298.0, "roofTemp": 298.0, "refridgeTemp": 93.0,
+    "noLDisks": 5, "noVDisks": 5, "abstol": 0.01, "reltol": 0.0001, "numberofIterations": 40,
+    "diskinitCombined": "base_disk_initial_conditions.xlsx",
+}
+
+## Environment of the worker processes (set by their initializer, _init_worker): one
+## BLAS thread each, so that the workers do not compete for the cores
+WORKER_ENVIRONMENT = {"OMP_NUM_THREADS": "1", "OPENBLAS_NUM_THREADS": "1", "MKL_NUM_THREADS": "1"}
+
+def load_config(config):
+    """
+    Returns the Tank arguments of config with the data tables read: feed_product_df
+    (all sheets) and diskinitCombined may be xlsx paths. The keys of feeds, products
+    and molecular_weights become stream and component numbers (JSON gives strings).
+    """
+    config = dict(config)
+    if isinstance(config["feed_product_df"], str):
+        config["feed_product_df"] = pd.read_excel(config["feed_product_df"], sheet_name=None)
+    if isinstance(config["diskinitCombined"], str):
+        config["diskinitCombined"] = pd.read_excel(config["diskinitCombined"])
+    for name in ["feeds", "products", "molecular_weights"]:
+        config[name] = {int(key): value for key, value in config[name].items()}
+    return config
+
+def grid_variants(grid):
+    """
+    Returns the variants (list of dicts) of all combinations of the values in grid
+    (dict of argument name to list of values).
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def run_variant(config, outputs=SWEEP_OUTPUTS):
+    """
+    Simulates the Tank with the arguments config and returns its trajectories (time in
+    min and the Tank attributes outputs), IDA statistics and wall time, or the error of
+    a failed run. Runs in the worker processes; the output of Tank is discarded.
+    """
+    start = timeit.default_timer()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            myTank = Tank(**load_config(config))
+            status = myTank.check_input()
+            if status is not True:
+                raise ValueError(status)
+            myTank.data_preprocessing()
+            myTank.run_simulation()
+        result = {"time (min)": np.ravel(myTank.t) * 24 * 60}
+        result.update({name: np.ravel(getattr(myTank, name)) for name in outputs})
+        return {"status": "ok", "trajectories": result, "statistics": dict(myTank.solverStatistics),
+                "wall time (s)": timeit.default_timer() - start}
+    except Exception as error:
+        return {"status": f"{type(error).__name__}: {error}", "trajectories": None, "statistics": {},
+                "wall time (s)": timeit.default_timer() - start}
+
+def _init_worker(environment):
+    """
+    Sets environment in a worker process, for the libraries and processes it starts
+    later. NumPy's BLAS is loaded with this module before, so its thread pool is
+    limited to one thread with threadpoolctl, if installed.
+    """
+    os.environ.update(environment)
+    if threadpool_limits is not None:
+        threadpool_limits(1)
+
+def iter_sweep(base, variants, workers=None, outputs=SWEEP_OUTPUTS):
+    """
+    Simulates base updated with each of variants (any iterable) in a pool of workers
+    processes (default: one per core) and yields (index, variant, result of
+    run_variant) as the runs finish, in order of completion. At most two runs per
+    worker are queued, so the memory does not grow with the number of variants. The
+    workers get WORKER_ENVIRONMENT from their initializer; the environment of this
+    process (e.g. the Streamlit server of other sessions) is not changed.
+    """
+    workers = workers or os.cpu_count()
+    variants = enumerate(variants)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(WORKER_ENVIRONMENT,)) as pool:
+        pending = {}
+        def submit(count):
+            for index, variant in itertools.islice(variants, count):
+                pending[pool.submit(run_variant, {**base, **variant}, outputs)] = (index, variant)
+        submit(2 * workers)
+        while pending:
+            done = wait(pending, return_when=FIRST_COMPLETED)[0]
+            submit(len(done))
+            for future in done:
+                index, variant = pending.pop(future)
+                yield index, variant, future.result()
+
+def sweep(base, variants, workers=None):
+    """
+    Runs the sweep (iter_sweep) and returns two tables: the trajectories of all runs
+    in long format (columns run, the swept arguments, time (min) and SWEEP_OUTPUTS)
+    and one row per run with its status, wall time and IDA step count.
+    """
+    frames, runs = [], []
+    names = sorted({name for variant in variants for name in variant})
+    for done, (index, variant, result) in enumerate(iter_sweep(base, variants, workers), 1):
+        print(f"Run {index + 1} finished ({done}/{len(variants)}): {result['status']}")
+        parameters = {name: _cell(variant.get(name)) for name in names}
+        runs.append({"run": index, **parameters, "status": result["status"],
+                     "wall time (s)": result["wall time (s)"], "nsteps": result["statistics"].get("nsteps")})
+        if result["trajectories"] is not None:
+            frame = pd.DataFrame(result["trajectories"])
+            for name, value in reversed(list(parameters.items())):
+                frame.insert(0, name, value)
+            frame.insert(0, "run", index)
+            frames.append(frame)
+    table = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if len(table):
+        table = table.sort_values(["run", "time (min)"], kind="stable", ignore_index=True)
+    return table, pd.DataFrame(runs).sort_values("run", ignore_index=True)
+
+def _cell(value):
+    # dicts and lists of a variant (e.g. feeds) are stored as JSON text in the tables,
+    # data tables by their type
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=lambda x: type(x).__name__)
+    return value
+
+def _value(text):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parameter sweep of the tank model in a process pool.")
+    parser.add_argument("--config", help="JSON file of Tank arguments (default: the base case)")
+    parser.add_argument("--set", nargs="*", default=[], metavar="NAME=VALUE", help="base arguments to override")
+    parser.add_argument("--grid", nargs="*", default=[], metavar="NAME=V1,V2", help="arguments to sweep")
+    parser.add_argument("--variants", help="JSON file with a list of variants (dicts of Tank arguments)")
+    parser.add_argument("--workers", type=int, help="number of worker processes (default: number of cores)")
+    parser.add_argument("--output", default="sweep.csv", help="trajectory table (.csv or .parquet)")
+    args = parser.parse_args(argv)
+
+    base = dict(BASE_CASE)
+    if args.config:
+        with open(args.config) as file:
+            base.update(json.load(file))
+    for item in args.set:
+        name, value = item.split("=", 1)
+        base[name] = _value(value)
+    if args.variants:
+        with open(args.variants) as file:
+            variants = json.load(file)
+    else:
+        grid = {}
+        for item in args.grid:
+            name, values = item.split("=", 1)
+            grid[name] = [_value(value) for value in values.split(",")]
+        variants = grid_variants(grid)
+
+    table, runs = sweep(base, variants, args.workers)
+    if args.output.endswith(".parquet"):
+        table.to_parquet(args.output)
+    else:
+        table.to_csv(args.output, index=False)
+    print(runs.to_string(index=False))
+    print(f"Saved {len(table)} rows of {len(runs)} runs to {args.output}")
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,1177 @@
+import math
+import inspect
+import importlib
+import warnings
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+from scipy.special import gammaln
+
+JACOBIAN_MODES = ["structured", "finite-difference", "verify"]
+RESTART_MODES = ["breakpoints", "intervals"]
+RESIDUAL_MODES = ["exact", "smooth"]
+# "spgmr-experimental" left-preconditions the residual itself (krylov_residual), since
+# assimulo's IDA has no preconditioner callbacks
+LINEAR_SOLVERS = ["dense", "spgmr", "spgmr-experimental"]
+INITIAL_CONDITIONS = ["table", "steady"]
+# Coefficients of the forward sensitivity analysis (Tank sensitivities)
+SENSITIVITY_PARAMETERS = ["sigma", "Ul", "Uv", "Uvw", "Ulw", "Ur", "Ub", "Uvr", "Ulr"]
+SENSITIVITY_OUTPUTS = ["PV", "h", "wsqN"]
+# The SPGMR solver of IDA stops after 5 Krylov iterations; the preconditioner of
+# "spgmr-experimental" is updated after a linear solve that needed more than KRYLOV_ITERATIONS
+KRYLOV_ITERATIONS = 3
+# Magnitudes of the switches of the smooth residual, multiplied by smoothWidth: disk
+# position (disks), scaled inter-disk flow, evaporation driving force (mole fraction)
+# and equilibrium ratio floor
+SMOOTH_SCALES = {"disk": 1.0, "flow": 1e-4, "flux": 1e-2, "equilibrium": 1e-6}
+INTERVAL = 5 * 60  # length (s) of the intervals of the feed and product schedules
+FORCING = ["Af", "Bf", "AZf", "BZf", "ATf", "BTf", "APf", "BPf", "Ag", "Bg"]
+# measured feed quantities of Tank.advance and the forcing they hold
+FEED_INPUTS = {"flow": "Af", "temperature": "ATf", "pressure": "APf", "composition": "AZf"}
+
+def smoothstep(x):
+    """
+    0 for x <= 0, 1 for x >= 1 and 3 x^2 - 2 x^3 in between (continuous derivative).
+    """
+    x = np.clip(x, 0, 1)
+    return x * x * (3 - 2 * x)
+
+def smooth_max(x, width):
+    """
+    Smooth max(x, 0): x smoothstep(1/2 + x / (2 width)), equal to max(x, 0) outside
+    [-width, width], zero at x = 0 and with a continuous derivative.
+    """
+    x = np.asarray(x, dtype=float)
+    return x * smoothstep(0.5 + x / (2 * width))
+
+def resample_disks(values, n):
+    """
+    Interpolates the rows of values (one per disk of a phase, from the bottom) linearly
+    to n disks of equal height. Returns an n x columns array.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) == n:
+        return values
+    source = (np.arange(len(values)) + 0.5) / len(values)
+    target = (np.arange(n) + 0.5) / n
+    return np.column_stack([np.interp(target, source, column) for column in values.T])
+
+def poisson_pmf(n):
+    """
+    Returns the Poisson(1) probabilities of 0, 1, ..., n - 1 (the same expression as
+    scipy.stats.poisson.pmf(k, mu=1) without its argument checking).
+    """
+    return np.exp(-1 - gammaln(np.arange(max(n, 0)) + 1))
+
+def liquid_distribution(m, NL, N):
+    """
+    Returns the distribution (length N, not normalised) of a stream entering or leaving
+    the liquid at disk m (1-based, m <= NL): a Poisson(1) kernel decaying downwards from
+    disk m and upwards from disk m+1 to the interface.
+    """
+    column = np.zeros(N)
+    column[:m] = poisson_pmf(m)[::-1]
+    column[m:NL] = poisson_pmf(NL - m)
+    return column
+
+def feed_distribution(m, NL, N):
+    """
+    Returns the distribution (length N, not normalised) of the feed entering at disk m
+    (1-based) over the liquid and vapor disks.
+    """
+    if m < NL:
+        return liquid_distribution(m, NL, N)
+    column = np.zeros(N)
+    column[:NL] = poisson_pmf(NL)[::-1]
+    if m == NL:
+        column[NL:] = poisson_pmf(N - NL)
+    else:
+        column[NL:m - 1] = poisson_pmf(m - NL - 1)[::-1]
+        column[m - 1:] = poisson_pmf(N - m + 1)
+    return column
+
+def product_distribution(m, NL, N):
+    """
+    Returns the distribution (length N, not normalised) of the product leaving at disk m
+    (1-based). A product drawn from the vapor space only takes vapor.
+    """
+    if m <= NL:
+        return liquid_distribution(m, NL, N)
+    column = np.zeros(N)
+    column[NL:m] = poisson_pmf(m - NL)[::-1]
+    column[m:] = poisson_pmf(N - m)
+    return column
+
+def normalise_distribution(d, NL):
+    """
+    Normalises the liquid and vapor parts of each column of d (N x F) to sum to one.
+    Parts that are all zero stay zero.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        d[:NL, :] = d[:NL, :] / d[:NL, :].sum(axis=0)
+        d[NL:, :] = d[NL:, :] / d[NL:, :].sum(axis=0)
+    d = np.maximum(d, 0)
+    return np.nan_to_num(d)
+
+_distributions = {}
+distribution_counters = {"hits": 0, "misses": 0}
+
+def distribution(kind, m, NL, N):
+    """
+    Returns the normalised distribution (length N, read-only) of a "feed" or "product"
+    stream at disk m (1-based) for NL liquid disks out of N. The columns only change
+    when the liquid level moves a stream to another disk, so each one is computed once
+    per process and counted as a miss in distribution_counters; later calls are hits.
+    """
+    key = (kind, int(m), NL, N)
+    column = _distributions.get(key)
+    if column is None:
+        distribution_counters["misses"] += 1
+        build = feed_distribution if kind == "feed" else product_distribution
+        column = normalise_distribution(build(int(m), NL, N).reshape(-1, 1), NL)[:, 0]
+        column.setflags(write=False)
+        _distributions[key] = column
+    else:
+        distribution_counters["hits"] += 1
+    return column
+
+def distribution_matrix(kind, disks, NL, N):
+    """
+    Returns the distributions of streams at the disks (1-based) as the columns of an
+    N x len(disks) array.
+    """
+    return np.array([distribution(kind, m, NL, N) for m in disks]).reshape(-1, N).T
+
+def distribution_hit_rate():
+    """
+    Returns the fraction of distribution() calls served from the cache.
+    """
+    calls = distribution_counters["hits"] + distribution_counters["misses"]
+    return distribution_counters["hits"] / calls if calls else 0.0
+
+class TankModel:
+    """
+    The DAE model of the tank used by Tank.run_simulation: mass(u) and the right hand
+    side tankfunc(u, t), such that the residual is tankfunc(u, t) - mass(u) du.
+    The residual applies the mass matrix through its structure (mass_product), a
+    diagonal plus one row of enthalpies per energy balance, without forming it.
+
+    The state u (length NE) holds the scaled disk temperatures (N), the scaled component
+    holdups of each disk (N x I, disk by disk) and the scaled inter-disk flows of the
+    liquid (NL - 1) and vapor (NV - 1) phases.
+
+    tankfunc evaluates all disks at once: inter-disk flows are upwinded on whole arrays,
+    the feed and product source terms are matrix products with the (cached) stream
+    distributions, the hydrostatic pressure is a cumulative sum and the heat leak is
+    selected with masks.
+
+    The feed and product flows of the current 5 minute interval are set with set_forcing
+    or set_interval, as A + B (t - t0) with t0 the start of the interval.
+
+    With residual="smooth" the switches of the residual are replaced by continuous
+    blends (smooth_disks, smooth_max), so that IDA does not have to cut its step at
+    them: streams and jacket ends close to a disk boundary are split between the two
+    disks, and the upwinded flows, the evaporation/condensation split and the limits of
+    the equilibrium ratio use smooth_max. The widths are smoothWidth times SMOOTH_SCALES;
+    outside them the residual is the exact one.
+    """
+    def __init__(self, tank):
+        self.tank = tank
+        I = tank.noComponents
+        self.I = I
+        self.g = 9.81  ## gravitational acceleration (m2/s)
+        self.R = 8.314  ## gas constant
+
+        ## Fixed DAE model parameters, scale factors, and reference
+        N = tank.noLDisks + tank.noVDisks
+        self.N = N
+        self.F = tank.noFeedStreams
+        self.S = tank.noProductStreams
+        self.Tref = 100  # Scale factor for temperature
+        self.LDref = 400  # Reference liquid density (kg/m3)
+        self.VDref = 2  # Reference vapor density (kg/m3)
+        self.A = tank.tankArea
+        self.H = tank.tankHeight
+        self.D = tank.tankDiameter
+        self.Lref = self.A * self.H * self.LDref / N
+        self.Vref = self.A * self.H * self.VDref / N
+        self.NL = tank.noLDisks
+        self.NV = N - self.NL  # number of vapor disks
+        self.NC = N + N * I
+        self.NE = self.NC + N - 2
+        self.sigma = tank.sigma * 1000  # evaporation model coefficient (2E-5,5E-5,1E-4)
+
+        self.MW = [tank.molecular_weights[x] for x in range(1, I + 1)]  # component molecular weights (kg/kmol)
+        self.nf = [tank.feeds[x] * self.H / 100 for x in range(1, self.F + 1)]
+        self.ng = [tank.products[x] * self.H / 100 for x in range(1, self.S + 1)]
+
+        ## Temperatures, heat transfer coefficients, and other parameters
+        self.Tb = tank.groundTemp  # Ground temperature (K)
+        self.Tamb = [tank.ambTemp, 0, 0]  # ambient temperature as a function of t (K)
+        self.Tr = tank.roofTemp  # roof temperature (K)
+        self.Ul = tank.Ul  # liquid phase film heat transfer coefficient (W/m2 K)
+        self.Uv = tank.Uv  # vapor phase film heat transfer coefficient (W/m2 K)
+        self.Ui = (self.Ul * self.Uv) / (self.Ul + self.Uv)  # interface heat transfer coefficient (W/m2 K)
+        self.Uvw = tank.Uvw  # wall-vapor heat transfer coefficient (W/m2 K)
+        self.Ulw = tank.Ulw  # wall-liquid heat transfer coefficient (W/m2 K)
+        self.Ur = tank.Ur  # tank roof-vapor heat transfer coefficient (W/m2 K)
+        self.Ub = tank.Ub  # tank bottom-liquid heat transfer coefficient (W/m2 K)
+        ## Optional
+        self.nJ = [tank.jacketStartValue / 100, tank.jacketEndValue / 100]  # jacket location
+        self.Uvr = tank.Uvr  # jacket-vapor heat transfer coefficient (W/m2 K)
+        self.Ulr = tank.Ulr  # jacket-liquid side heat transfer coefficient (W/m2 K)
+        self.Tj = tank.refridgeTemp  # refrigerant temperature (K)
+        self.ModelF = importlib.import_module(tank.ModelF)
+        self.ModelZg = importlib.import_module(tank.ModelZg)
+        self.properties = tank.properties
+        ## network backend of the property package, for ModelF functions that take one
+        self.ModelF_options = {"backend": self.properties.backend} \
+            if "backend" in inspect.signature(self.ModelF.ModelF).parameters else {}
+
+        self.smooth = tank.residual == "smooth"
+        self.smooth_widths = {key: tank.smoothWidth * scale for key, scale in SMOOTH_SCALES.items()}
+        self.pressure_rtol = 1e-12  # relative tolerance of the vapor pressure fixed point iteration
+        self.pressure_maxiter = 50
+        self.t0 = 0.0  # start (s) of the schedule interval of the forcing
+        self._schedule = None
+        self.set_forcing([], [], [], [], [], [], [], [], [], [])
+
+        self.jacobian_floor = tank.abstol  # smallest scale of the finite difference increments
+        self._jacobian_structures = {}
+        self._preconditioner = None  # sparse LU of the iteration matrix for krylov_residual
+        self._preconditioner_c = None
+        self._krylov_c = None
+        self._krylov_point = None  # (t, u, du, F) of the last krylov_residual
+        self._krylov_t = None  # time of the last krylov_residual (the step the preconditioner is frozen in)
+        self._krylov_iterations = 0
+        self._update_preconditioner = False
+        self.statistics = {"residuals": 0, "jacobians": 0, "jacobian residuals": 0, "pressure iterations": 0,
+                           "pressure failures": 0, "jacobian-vector products": 0, "preconditioner updates": 0}
+
+    def set_forcing(self, Af, Bf, AZf, BZf, ATf, BTf, APf, BPf, Ag, Bg):
+        """
+        Sets the feed (flow, composition, temperature, pressure) and product flows of the
+        current interval as A + B (t - t0).
+        """
+        self.Af = np.array(Af, dtype=float)
+        self.Bf = np.array(Bf, dtype=float)
+        self.AZf = np.array(AZf, dtype=float).reshape(-1, self.I)
+        self.BZf = np.array(BZf, dtype=float).reshape(-1, self.I)
+        self.ATf = np.array(ATf, dtype=float)
+        self.BTf = np.array(BTf, dtype=float)
+        self.APf = np.array(APf, dtype=float)
+        self.BPf = np.array(BPf, dtype=float)
+        self.Ag = np.array(Ag, dtype=float)
+        self.Bg = np.array(Bg, dtype=float)
+
+    def parameters(self, names):
+        """
+        Returns the values of the coefficients names (SENSITIVITY_PARAMETERS) in the units
+        of Tank.
+        """
+        return np.array([self.sigma / 1000 if name == "sigma" else getattr(self, name) for name in names])
+
+    def set_parameters(self, names, p):
+        """
+        Sets the coefficients names to the values p (units of Tank), e.g. for the
+        perturbations of IDA's sensitivity analysis.
+        """
+        for name, value in zip(names, p):
+            if name == "sigma":
+                self.sigma = value * 1000
+            else:
+                setattr(self, name, value)
+        self.Ui = (self.Ul * self.Uv) / (self.Ul + self.Uv)
+        self._krylov_point = None  # the cached residual belongs to the previous values
+
+    def with_parameters(self, func, names):
+        """
+        Returns func (residual, jacobian, jacobian_vector, ...) with the parameter vector
+        p that IDA passes with sensitivity analysis (the last positional argument of the
+        residual, keyword p of the Jacobians): the coefficients names are set to p before
+        func is called.
+        """
+        def with_p(*args, p=None):
+            if p is None:
+                *args, p = args
+            self.set_parameters(names, p)
+            return func(*args)
+        return with_p
+
+    def schedule(self):
+        """
+        Returns the feed and product schedules of the tank (see Tank.data_preprocessing)
+        as a dictionary of arrays over the 5 minute intervals: Af, Bf, ATf, BTf, APf and BPf
+        (intervals x F), AZf and BZf (intervals x F x I), Ag and Bg (intervals x S).
+        """
+        if self._schedule is None:
+            tank, F, S, I = self.tank, self.F, self.S, self.I
+            feeds = [tank.Af_dict['Af({})'.format(i + 1)] for i in range(F)]
+            products = [tank.Ag_dict['Ag({})'.format(i + 1)] for i in range(S)]
+            tables = feeds + products
+            R = min(len(table) for table in tables) if tables else int(tank.numberofIterations / 5) + 1
+
+            def columns(tables, name):
+                return np.array([table['{}({})'.format(name, i + 1)].to_numpy(dtype=float)[:R]
+                                 for i, table in enumerate(tables)]).reshape(-1, R).T
+
+            schedule = {name: columns(feeds, name) for name in ["Af", "Bf", "ATf", "BTf", "APf", "BPf"]}
+            schedule["Ag"] = columns(products, "Ag")
+            schedule["Bg"] = columns(products, "Bg")
+            for name, tables in [("AZf", tank.AZ_dict), ("BZf", tank.BZ_dict)]:
+                schedule[name] = np.array([tables['{}({})'.format(name[:2], i + 1)].to_numpy(dtype=float)[:R]
+                                           for i in range(F)]).reshape(F, R, I).transpose(1, 0, 2)
+            self._schedule = schedule
+        return self._schedule
+
+    def set_interval(self, r):
+        """
+        Sets the forcing of the r-th 5 minute interval of the schedule.
+        """
+        schedule = self.schedule()
+        self.set_forcing(*[schedule[name][r] for name in FORCING])
+        self.t0 = INTERVAL * r
+        self._krylov_point = None
+
+    def hold_inputs(self, t, feed_inputs=None, product_inputs=None):
+        """
+        Holds the feeds and products from time t (s) on at their values at t, replaced by
+        the measured values of feed_inputs (dict of feed number to a dict of FEED_INPUTS:
+        flow (kg/s), temperature (K), pressure (kPa) and mass fractions (I)) and of
+        product_inputs (dict of product number to flow (kg/s)). Returns whether the
+        forcing changed.
+        """
+        s = t - self.t0
+        held = {A: getattr(self, A) + getattr(self, B) * s for A, B in zip(FORCING[::2], FORCING[1::2])}
+        for stream, inputs in (feed_inputs or {}).items():
+            if stream not in range(1, self.F + 1):
+                raise ValueError(f"Unknown feed {stream}. Choose from {list(range(1, self.F + 1))}.")
+            for key, value in inputs.items():
+                if key not in FEED_INPUTS:
+                    raise ValueError(f"Unknown feed input {key}. Choose from {list(FEED_INPUTS)}.")
+                if key == "composition" and np.shape(value) != (self.I,):
+                    raise ValueError(f"The composition of feed {stream} needs {self.I} mass fractions.")
+                held[FEED_INPUTS[key]][stream - 1] = value
+        for stream, value in (product_inputs or {}).items():
+            if stream not in range(1, self.S + 1):
+                raise ValueError(f"Unknown product {stream}. Choose from {list(range(1, self.S + 1))}.")
+            held["Ag"][stream - 1] = value
+        changed = any(np.any(getattr(self, B)) for B in FORCING[1::2]) or \
+            not all(np.array_equal(held[A], getattr(self, A) + getattr(self, B) * s, equal_nan=True)
+                    for A, B in zip(FORCING[::2], FORCING[1::2]))
+        self.set_forcing(*[x for A in FORCING[::2] for x in (held[A], np.zeros_like(held[A]))])
+        self.t0 = t
+        self._krylov_point = None
+        return changed
+
+    def breakpoints(self, n):
+        """
+        Returns the intervals (of the first n) at which a feed or product flow,
+        composition, temperature or pressure of the schedule is not the continuation of
+        the previous interval, starting with 0. Between breakpoints the forcing is one
+        straight line, so the integration does not have to be restarted.
+        """
+        schedule = self.schedule()
+        breakpoints = [0]
+        for r in range(1, n):
+            for A, B in zip(FORCING[::2], FORCING[1::2]):
+                A0, B0, A1, B1 = schedule[A][r - 1], schedule[B][r - 1], schedule[A][r], schedule[B][r]
+                if not (np.array_equal(B0, B1) and np.allclose(A0 + B0 * INTERVAL, A1, rtol=1e-10, atol=1e-12)):
+                    breakpoints.append(r)
+                    break
+        return breakpoints
+
+    def feed_conditions(self, t):
+        """
+        Returns the flow, temperature and pressure (len(t) x F) and composition
+        (len(t) x F x I) of the feeds at the times t (s). The end of an interval belongs
+        to that interval.
+        """
+        schedule = self.schedule()
+        t = np.asarray(t, dtype=float).reshape(-1)
+        r = np.clip(np.ceil(t / INTERVAL - 1e-9).astype(int) - 1, 0, len(schedule["Af"]) - 1)
+        s = (t - INTERVAL * r)[:, None]
+        Fi = schedule["Af"][r] + schedule["Bf"][r] * s
+        FT = schedule["ATf"][r] + schedule["BTf"][r] * s
+        FP = schedule["APf"][r] + schedule["BPf"][r] * s
+        Fz = schedule["AZf"][r] + schedule["BZf"][r] * s[:, :, None]
+        return Fi, FT, FP, Fz
+
+    def disk_conditions(self):
+        """
+        Returns the initial temperatures (N) and mole fractions (N x I) of the disks from
+        the disk initial conditions of the tank. A table for other numbers of disks is
+        interpolated over the height of each phase (rows named "Liquid ..." and
+        "Vapour ..."), so that a coarse table can start a high-resolution run.
+        """
+        table = self.tank.diskinitCombined
+        values = table.iloc[:, 1:].to_numpy(dtype=float)
+        if len(values) != self.N:
+            liquid = table.iloc[:, 0].astype(str).str.lower().str.startswith("liquid").to_numpy()
+            if liquid.all() or not liquid.any():
+                raise ValueError(f"The disk initial conditions have {len(values)} rows for {self.N} disks.")
+            values = np.concatenate((resample_disks(values[liquid], self.NL), resample_disks(values[~liquid], self.NV)))
+        return values[:, 0], values[:, 1:]
+
+    def differential_variables(self):
+        """
+        Returns the algvar flags of IDA (length NE): True for the temperatures and holdups,
+        False for the N - 2 algebraic inter-disk flows.
+        """
+        return np.arange(self.NE) < self.NC
+
+    def initial_state(self):
+        """
+        Returns the initial state u0 (NE x 1) from the initial liquid height, pressure and
+        disk temperatures and compositions of the tank. The inter-disk flows start at zero.
+        The compressibility factor of the top vapor disk is stored as Z0.
+        """
+        tank = self.tank
+        I, N, NL, NV, NE, NC = self.I, self.N, self.NL, self.NV, self.NE, self.NC
+        A, H, R = self.A, self.H, self.R
+        h0 = tank.initialLiquidHeight * H / 100  # liquid height (m) from a percentage of H
+        P0 = tank.initialPressure  # tank pressure (kPa)
+        T0, x0 = self.disk_conditions()
+        T0 = T0.reshape(-1, 1)
+        d0 = np.zeros((N, 1))  # disk density
+        Ei, Ci, Di = self.properties.liq_prop(T0[:NL])
+        d0[:NL, 0] = 1 / np.sum((x0[:NL, :] / Di), axis=1)
+        AN = np.concatenate((x0[N - 1, :], [P0], T0[N - 1])).reshape(1, -1)
+        Z = self.ModelZg.ModelZg(AN)[0][0]
+        self.Z0 = Z
+        d0[NL:N, 0] = P0 / (Z * R * T0[N - 1]) / np.sum(x0[N - 1, :] / self.MW)
+        W0 = np.zeros((I, N))
+        W0[:, :NL] = d0[:NL, 0] * np.transpose(x0[:NL, :]) * (A * h0 / NL / self.Lref)
+        W0[:, NL:N] = d0[NL:N, 0] * np.transpose(x0[NL:N, :]) * (A * (H - h0) / NV / self.Vref)
+        u0 = np.zeros((NE, 1))
+        u0[:N] = T0 / self.Tref
+        u0[N:NC] = np.reshape(np.transpose(W0), (-1, 1))
+        return u0
+
+    def context(self, u):
+        """
+        Evaluates the quantities of the state u shared by mass_terms and tankfunc, once
+        per residual: the disk temperatures T, holdups Wn and mass fractions x (I x N),
+        disk holdups sumw, the liquid and vapor properties of the disks (EL, CL, LD, EV,
+        CV) and of the interface (EL_I, EV_I at T_I, one property call per phase),
+        densities rho, liquid level h, molecular weights Mw, compressibility factors Z of
+        the vapor disks, vapor pressure PV and disk pressures P. Returns a dictionary.
+        """
+        I, N, NL, NV, NC = self.I, self.N, self.NL, self.NV, self.NC
+        Tref, Lref, Vref, A, H, R, g = self.Tref, self.Lref, self.Vref, self.A, self.H, self.R, self.g
+        MW = np.asarray(self.MW, dtype=float)
+        u = np.asarray(u, dtype=float).reshape(-1)
+        T = u[:N] * Tref
+        Wn = u[N:NC].reshape(N, I).T.copy()
+        Wn[:, :NL] *= Lref
+        Wn[:, NL:] *= Vref
+        sumw = Wn.sum(axis=0)
+        x = Wn / sumw
+        T_I = (self.Ul * T[NL - 1] + self.Uv * T[NL]) / (self.Ul + self.Uv)
+
+        ### Properties of the disks and the interface
+        EL, CL, LD = self.properties.liq_prop(np.append(T[:NL], T_I))
+        EV, CV = self.properties.vap_prop(np.append(T[NL:], T_I))
+
+        ### Density & Pressure
+        rho = np.zeros(N)
+        rho[:NL] = 1 / (x[:, :NL].T / LD[:NL]).sum(axis=1)
+        h = NL * sumw[0] / A / rho[0]  # liquid level
+        Mw = 1 / (x.T / MW).sum(axis=1)
+        factor = NV * R * T[N - 1] * sumw[N - 1] / (A * (H - h) * Mw[N - 1])
+        PV, Z = self.pressure(x[:, NL:].T[None], T[NL:][None], np.array([factor]))
+        PV, Z = PV[0], Z[0]
+        rho[NL:] = PV * Mw[NL:] / (Z * R * T[NL:])
+        P = np.full(N, PV)
+        # Hydrostatic pressure: half of the disk itself plus all liquid disks above it
+        above = np.cumsum(rho[:NL][::-1])[::-1] - rho[:NL]
+        P[:NL] = PV + (g * h / NL) * (0.5 * rho[:NL] + above) / 1000
+        return {"T": T, "Wn": Wn, "sumw": sumw, "x": x, "T_I": T_I,
+                "EL": EL[:NL], "CL": CL[:NL], "LD": LD[:NL], "EV": EV[:NV], "CV": CV[:NV],
+                "EL_I": EL[NL:], "EV_I": EV[NV:], "rho": rho, "h": h, "Mw": Mw, "Z": Z, "PV": PV, "P": P}
+
+    def pressure(self, zf, TV, factor):
+        """
+        Solves the vapor pressure PV = factor Z(PV) of the tank, with Z the compressibility
+        factor of the top vapor disk given by ModelZg, which itself takes the pressure as
+        input. zf (Q x NV x I) and TV (Q x NV) are the compositions and temperatures of the
+        vapor disks and factor (Q) = NV R T sumw / (A (H - h) Mw) of the top disk, for Q
+        states at once. The fixed point iteration starts from the ideal gas pressure
+        (Z = 1), so the pressure only depends on the state. Returns PV (Q) and the
+        compressibility factors Z (Q x NV) of all vapor disks at PV. States that have not
+        converged in pressure_maxiter iterations keep the last iterate; they are counted
+        in statistics["pressure failures"] with a warning.
+        """
+        Q, NV, I = zf.shape
+        PV = np.array(factor, dtype=float)
+        for k in range(self.pressure_maxiter):
+            AN = np.concatenate((zf[:, -1, :], PV.reshape(-1, 1), TV[:, -1:]), axis=1)
+            P_new = factor * np.maximum(self.ModelZg.ModelZg(AN), 0).reshape(-1)
+            change = np.abs(P_new - PV)
+            PV = P_new
+            if np.all(change <= self.pressure_rtol * np.abs(P_new)):
+                break
+        else:
+            failed = int(np.count_nonzero(~(change <= self.pressure_rtol * np.abs(PV))))
+            self.statistics["pressure failures"] += failed
+            warnings.warn(f"The vapor pressure iteration did not converge in {self.pressure_maxiter} iterations "
+                          f"for {failed} of {Q} states, largest relative change "
+                          f"{np.max(change / np.maximum(np.abs(PV), np.finfo(float).tiny)):.2e}.", RuntimeWarning)
+        self.statistics["pressure iterations"] += k + 1
+        AN = np.concatenate((zf.reshape(Q * NV, I), np.repeat(PV, NV).reshape(-1, 1), TV.reshape(-1, 1)), axis=1)
+        Z = np.maximum(self.ModelZg.ModelZg(AN), 0).reshape(Q, NV)
+        return PV, Z
+
+    def mass_terms(self, u, context=None):
+        """
+        Returns the non-zero entries of the mass matrix at u: the diagonal of the energy
+        balances (N) and the enthalpies multiplying the holdup derivatives of each disk
+        (N x I). The component balances have a unit diagonal and the inter-disk flow
+        equations are algebraic. context is the result of context(u), computed if None.
+        """
+        NL, Lref, Vref = self.NL, self.Lref, self.Vref
+        if context is None:
+            context = self.context(u)
+        Ei = np.concatenate((context["EL"], context["EV"]), axis=0)
+        CP = (context["x"].T * np.concatenate((context["CL"], context["CV"]), axis=0)).sum(axis=1)
+        diagonal = context["sumw"] * CP
+        diagonal[:NL] /= Lref
+        diagonal[NL:] /= Vref
+        return diagonal, Ei / self.Tref
+
+    def mass(self, u):
+        """
+        Returns the mass matrix (NE x NE) at u as a dense array.
+        """
+        N, NC, NE, I = self.N, self.NC, self.NE, self.I
+        diagonal, enthalpy = self.mass_terms(u)
+        Mass = np.zeros((NE, NE))
+        # Energy Balance
+        Mass[np.arange(N), np.arange(N)] = diagonal
+        Mass[np.repeat(np.arange(N), I), np.arange(N, NC)] = enthalpy.reshape(-1)
+        # Component Balance
+        Mass[np.arange(N, NC), np.arange(N, NC)] = 1
+        return Mass
+
+    def sparse_mass(self, u, context=None):
+        """
+        Returns the mass matrix (NE x NE) at u as a sparse CSC matrix.
+        """
+        N, NC, NE, I = self.N, self.NC, self.NE, self.I
+        diagonal, enthalpy = self.mass_terms(u, context)
+        rows = np.concatenate((np.arange(N), np.repeat(np.arange(N), I), np.arange(N, NC)))
+        columns = np.concatenate((np.arange(N), np.arange(N, NC), np.arange(N, NC)))
+        values = np.concatenate((diagonal, enthalpy.reshape(-1), np.ones(NC - N)))
+        return sparse.csc_matrix((values, (rows, columns)), shape=(NE, NE))
+
+    def mass_product(self, u, du, context=None):
+        """
+        Returns mass(u) du (length NE) from the structure of the mass matrix.
+        """
+        N, NC, I = self.N, self.NC, self.I
+        du = np.asarray(du, dtype=float).reshape(-1)
+        diagonal, enthalpy = self.mass_terms(u, context)
+        Mdu = np.zeros(self.NE)
+        Mdu[:N] = diagonal * du[:N] + (enthalpy * du[N:NC].reshape(N, I)).sum(axis=1)
+        Mdu[N:NC] = du[N:NC]
+        return Mdu
+
+    def residual(self, t, u, du):
+        """
+        Returns the DAE residual tankfunc(u, t) - mass(u) du (length NE).
+        """
+        self.statistics["residuals"] += 1
+        context = self.context(u)
+        return self.tankfunc(u, t, context).reshape(-1) - self.mass_product(u, du, context)
+
+    def consistent_derivative(self, u, t):
+        """
+        Returns the derivative du (length NE) that satisfies the differential equations
+        at (u, t): the holdup derivatives are the component balances, and the temperature
+        derivatives follow from the energy balances by back substitution. The derivatives
+        of the algebraic inter-disk flows are set to zero. This is the minimum norm least
+        squares solution of mass(u) du = tankfunc(u, t), i.e. pinv(mass(u)) tankfunc(u, t).
+        """
+        N, NC, I = self.N, self.NC, self.I
+        context = self.context(u)
+        f = self.tankfunc(u, t, context).reshape(-1)
+        diagonal, enthalpy = self.mass_terms(u, context)
+        du = np.zeros(self.NE)
+        du[N:NC] = f[N:NC]
+        du[:N] = (f[:N] - (enthalpy * du[N:NC].reshape(N, I)).sum(axis=1)) / diagonal
+        return du
+
+    def steady_targets(self, u):
+        """
+        Returns what the steady state keeps of the state u: the liquid level h, the vapor
+        holdup (kg) and the mass fractions x of the disks (I x N).
+        """
+        context = self.context(u)
+        return {"h": context["h"], "vapor": context["sumw"][self.NL:].sum(), "x": context["x"]}
+
+    def steady_residual(self, u, t, targets):
+        """
+        Returns the residual (length NE) of the steady state at (u, t) with the level,
+        vapor holdup and compositions of targets (steady_targets). The temperature rows
+        are du of the temperatures (consistent_derivative) over an INTERVAL, which is zero
+        at the steady state. In the rows of the inter-disk flows the holdup of every disk
+        changes at the same relative rate as the bottom liquid or top vapor disk, so that
+        the disks of a phase keep their volumes (the time derivative of the algebraic
+        equations at constant temperatures and compositions). The holdup rows are the
+        algebraic equations of tankfunc and the targets.
+        """
+        I, N, NL, NC, NE = self.I, self.N, self.NL, self.NC, self.NE
+        u = np.asarray(u, dtype=float).reshape(-1)
+        context = self.context(u)
+        f = self.tankfunc(u, t, context).reshape(-1)
+        diagonal, enthalpy = self.mass_terms(u, context)
+        dW = f[N:NC].reshape(N, I)
+        G = np.zeros(NE)
+        G[:N] = INTERVAL * (f[:N] - (enthalpy * dW).sum(axis=1)) / diagonal
+        rate = dW.sum(axis=1) / u[N:NC].reshape(N, I).sum(axis=1)  # relative rate of the disk holdups (1/s)
+        G[NC:NC + NL - 1] = INTERVAL * (rate[1:NL] - rate[0])
+        G[NC + NL - 1:NE] = INTERVAL * (rate[NL:N - 1] - rate[N - 1])
+        G[N:2 * N - 2] = f[NC:NE]
+        G[2 * N - 2] = (context["h"] - targets["h"]) / self.H
+        G[2 * N - 1] = (context["sumw"][NL:].sum() - targets["vapor"]) / targets["vapor"]
+        G[2 * N:NC] = (context["x"][:I - 1] - targets["x"][:I - 1]).T.reshape(-1)
+        return G
+
+    def steady_state(self, u0, t=0.0, tol=1e-9, maxiter=50):
+        """
+        Returns the steady state (length NE) at the level, vapor holdup and compositions
+        of the state u0 with the feeds and products at time t, and the number of Newton
+        iterations. Newton's method starts from u0, with a finite difference Jacobian of
+        steady_residual (as finite_difference_jacobian) and a backtracking line search on
+        the norm of the residual, until its largest element is below tol.
+        """
+        NE = self.NE
+        u = np.asarray(u0, dtype=float).reshape(-1).copy()
+        targets = self.steady_targets(u)
+        G = self.steady_residual(u, t, targets)
+        for k in range(1, maxiter + 1):
+            increments = np.sqrt(np.finfo(float).eps) * np.maximum(np.abs(u), self.jacobian_floor)
+            J = np.empty((NE, NE))
+            for column in range(NE):
+                v = u.copy()
+                v[column] += increments[column]
+                J[:, column] = (self.steady_residual(v, t, targets) - G) / increments[column]
+            step = np.linalg.solve(J, -G)
+            norm = np.linalg.norm(G)
+            alpha = 1.0
+            while True:
+                v = u + alpha * step
+                Gv = self.steady_residual(v, t, targets)
+                if np.all(np.isfinite(Gv)) and np.linalg.norm(Gv) <= (1 - 1e-4 * alpha) * norm:
+                    break
+                alpha /= 2
+                if alpha < 1e-8:
+                    raise RuntimeError(f"The steady state Newton iteration stalled at iteration {k} with a "
+                                       f"residual of {np.max(np.abs(G)):.2e}.")
+            u, G = v, Gv
+            if np.max(np.abs(G)) < tol:
+                return u, k
+        raise RuntimeError(f"The steady state Newton iteration did not converge in {maxiter} iterations, "
+                           f"the residual is {np.max(np.abs(G)):.2e}.")
+
+    def outputs(self, u):
+        """
+        Returns SENSITIVITY_OUTPUTS at the state u: the tank pressure PV, liquid level h
+        and evaporation rate wsqN (sum of the evaporation flux), as in Tank.generatefun.
+        """
+        NL = self.NL
+        MW = np.asarray(self.MW, dtype=float)
+        context = self.context(u)
+        x = context["x"]
+        X = x[:, NL - 1] / MW / (x[:, NL - 1] / MW).sum()
+        Y = x[:, NL] / MW / (x[:, NL] / MW).sum()
+        Ps = self.properties.vapor_pressure([context["T_I"]])[0]
+        J = self.evaporation_flux(Ps, context["PV"], X, Y)[0]
+        return np.array([context["PV"], context["h"], np.sum(J)])
+
+    def output_sensitivities(self, u, S, names):
+        """
+        Returns the derivatives (len(SENSITIVITY_OUTPUTS) x P) of outputs(u) to the
+        coefficients names, from the state sensitivities S (P x NE) of IDA. The outputs
+        depend on the coefficients through the state and directly (T_I on Ul and Uv, wsqN
+        on sigma), so each column is a central difference along (S[i], e_i).
+        """
+        u = np.asarray(u, dtype=float).reshape(-1)
+        p = self.parameters(names)
+        dg = np.zeros((len(SENSITIVITY_OUTPUTS), len(names)))
+        for i in range(len(names)):
+            delta = 1e-4 * (abs(p[i]) if p[i] != 0 else 1.0)
+            for sign in [1, -1]:
+                q = p.copy()
+                q[i] += sign * delta
+                self.set_parameters(names, q)
+                dg[:, i] += sign * self.outputs(u + sign * delta * S[i]) / (2 * delta)
+        self.set_parameters(names, p)
+        return dg
+
+    def global_disks(self, u):
+        """
+        Returns the disks whose temperature and holdups enter every equation: the bottom
+        disk (liquid level), the top disk (vapor pressure) and the liquid disks from a
+        liquid feed up to the interface (hydrostatic pressure of the feed flash).
+        """
+        I, N, NL = self.I, self.N, self.NL
+        u = np.asarray(u, dtype=float).reshape(-1)
+        W = u[N:N + I] * self.Lref
+        EL, CL, LD = self.properties.liq_prop(u[:1] * self.Tref)
+        h = NL * W.sum() / self.A * (W / W.sum() / LD[0]).sum()
+        disks = {0, N - 1}
+        if self.F > 0:
+            feed_disks = self.smooth_disks(self.nf, h)[0][0] if self.smooth else self.stream_disk(self.nf, h)
+            for m in feed_disks:
+                if m <= NL:
+                    disks.update(range(int(m) - 1, NL))
+        return sorted(disks)
+
+    def jacobian_structure(self, global_disks):
+        """
+        Returns the column groups of the Jacobian as a list of (columns, members), where
+        members lists (column, rows) with the rows that column can change. Columns of
+        one group change disjoint rows, so they are perturbed together. A disk changes
+        its own and its neighbours' balances and the inter-disk flow equation of the disk;
+        an inter-disk flow changes the balances of the two disks it connects; the columns
+        of the global disks change all rows.
+        """
+        key = tuple(global_disks)
+        if key in self._jacobian_structures:
+            return self._jacobian_structures[key]
+        I, N, NL, NC, NE = self.I, self.N, self.NL, self.NC, self.NE
+        disk_rows = [np.concatenate(([d], N + d * I + np.arange(I))) for d in range(N)]
+        # the inter-disk flow equation of disk d compares it with the bottom (liquid) or
+        # top (vapor) disk and is row NC + d - 1 in both phases
+        flow_rows = [[NC + d - 1] if 1 <= d <= N - 2 else [] for d in range(N)]
+        groups = {}
+        for d in range(N):
+            columns = np.concatenate(([d], N + d * I + np.arange(I)))
+            if d in global_disks:
+                for column in columns:
+                    groups[("global", column)] = [(column, np.arange(NE))]
+                continue
+            rows = np.concatenate([disk_rows[e] for e in range(max(d - 1, 0), min(d + 2, N))] + [flow_rows[d]])
+            rows = rows.astype(int)
+            for v, column in enumerate(columns):
+                groups.setdefault((d % 3, v), []).append((column, rows))
+        for column in range(NC, NE):
+            a = column - NC if column - NC < NL - 1 else column - NC + 1  # flow from disk a to a + 1
+            groups.setdefault(("flow", a % 2), []).append((column, np.concatenate((disk_rows[a], disk_rows[a + 1]))))
+        structure = [(np.array([column for column, rows in members]), members) for members in groups.values()]
+        self._jacobian_structures[key] = structure
+        return structure
+
+    def _jacobian_residual(self, t, u, du):
+        self.statistics["jacobian residuals"] += 1
+        context = self.context(u)
+        return self.tankfunc(u, t, context).reshape(-1) - self.mass_product(u, du, context)
+
+    def sparse_jacobian(self, c, t, u, du):
+        """
+        Returns the iteration matrix dF/du + c dF/d(du) (NE x NE) of the residual F as a
+        sparse CSC matrix. dF/d(du) = -mass(u) is exact. dF/du is computed by forward
+        differences, perturbing all columns of a group of jacobian_structure at once, so
+        that one residual evaluation gives many columns. The number of evaluations does
+        not grow with the number of disks.
+        """
+        u = np.asarray(u, dtype=float).reshape(-1)
+        du = np.asarray(du, dtype=float).reshape(-1)
+        NE = self.NE
+        self.statistics["jacobians"] += 1
+        F0 = self._jacobian_residual(t, u, du)
+        increments = np.sqrt(np.finfo(float).eps) * np.maximum(np.abs(u), self.jacobian_floor)
+        rows, columns, values = [], [], []
+        for group, members in self.jacobian_structure(self.global_disks(u)):
+            v = u.copy()
+            v[group] += increments[group]
+            dF = self._jacobian_residual(t, v, du) - F0
+            for column, column_rows in members:
+                rows.append(column_rows)
+                columns.append(np.full(len(column_rows), column))
+                values.append(dF[column_rows] / increments[column])
+        J = sparse.csc_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(columns))), shape=(NE, NE))
+        return J - c * self.sparse_mass(u)
+
+    def jacobian(self, c, t, u, du):
+        """
+        Returns sparse_jacobian as a dense array, as expected by the jac callback of IDA
+        with its dense linear solver. Only the assembly is structured: assimulo's IDA has
+        no sparse or banded direct solver, so it factorises this dense copy (O(NE^3)),
+        which dominates a Jacobian update from about 400 disks (benchmarks/bench_scaling.py).
+        """
+        return self.sparse_jacobian(c, t, u, du).toarray()
+
+    def finite_difference_jacobian(self, c, t, u, du):
+        """
+        Returns the iteration matrix of jacobian() with dF/du computed column by column
+        (NE residual evaluations), as IDA does without a jac callback.
+        """
+        u = np.asarray(u, dtype=float).reshape(-1)
+        du = np.asarray(du, dtype=float).reshape(-1)
+        F0 = self._jacobian_residual(t, u, du)
+        increments = np.sqrt(np.finfo(float).eps) * np.maximum(np.abs(u), self.jacobian_floor)
+        J = -c * self.mass(u)
+        for column in range(self.NE):
+            v = u.copy()
+            v[column] += increments[column]
+            J[:, column] += (self._jacobian_residual(t, v, du) - F0) / increments[column]
+        return J
+
+    def check_jacobian(self, c, t, u, du):
+        """
+        Compares jacobian() with finite_difference_jacobian() at (t, u, du). Returns the
+        largest difference relative to the largest entry of its row.
+        """
+        J = self.jacobian(c, t, u, du)
+        J_fd = self.finite_difference_jacobian(c, t, u, du)
+        scale = np.maximum(np.abs(J_fd).max(axis=1, keepdims=True), np.finfo(float).tiny)
+        return np.max(np.abs(J - J_fd) / scale)
+
+    def krylov_residual(self, t, u, du):
+        """
+        Experimental residual for the SPGMR linear solver of IDA (linearSolver
+        "spgmr-experimental"), left preconditioned: P^-1 F(t, u, du) with P the sparse LU
+        of the iteration matrix (sparse_jacobian, the block tridiagonal coupling of
+        neighbouring disks plus the global disks), first factorised at the first residual
+        with the c of IDA's first step. Assimulo's IDA has no preconditioner callbacks
+        (its SPGMR runs with PREC_NONE), so P is applied to the residual: P^-1 F = 0 has
+        the solutions of F = 0, and for a fixed P the Newton iterations take the same
+        steps as on F while the Krylov iterations on P^-1 J converge in a few iterations.
+        P is therefore frozen within a step: IDA evaluates all Newton iterations (and the
+        Jacobian-vector products) of a step at the same time t, and a flagged update of
+        krylov_jacobian_vector is only made at the first residual of the next step (or of
+        a retry with another step size). The error test of IDA still sees P^-1 F, which
+        changes with P, so runs are only reproducible up to the tolerances and the option
+        is experimental until it has been compared with the dense solver.
+        """
+        u = np.asarray(u, dtype=float).reshape(-1)
+        du = np.asarray(du, dtype=float).reshape(-1)
+        if self._preconditioner is None or (self._update_preconditioner and t != self._krylov_t):
+            if self._krylov_c is None:
+                # c = 1/h of IDA's first step, at most 0.001 of the first output interval and 0.5 / ||du||
+                weights = 1 / (self.tank.reltol * np.abs(u) + self.tank.abstol)
+                self._krylov_c = max(2 * np.sqrt(np.mean((weights * du) ** 2)), 1000 / INTERVAL)
+            self._preconditioner = splu(self.sparse_jacobian(self._krylov_c, t, u, du).tocsc())
+            self._preconditioner_c = self._krylov_c
+            self._update_preconditioner = False
+            self.statistics["preconditioner updates"] += 1
+        self._krylov_t = t
+        self._krylov_iterations = 0
+        F = self.residual(t, u, du)
+        self._krylov_point = (t, u.copy(), du.copy(), F)
+        return self._preconditioner.solve(F)
+
+    def jacobian_vector(self, t, u, du, res, v, c):
+        """
+        Returns (dF/du + c dF/d(du)) v of residual, as expected by the jacv callback of
+        IDA with the SPGMR linear solver: dF/du v by a forward difference along v from
+        res = F(t, u, du), dF/d(du) v = -mass(u) v.
+        """
+        self.statistics["jacobian-vector products"] += 1
+        return self._jacobian_product(t, u, du, np.asarray(res, dtype=float).reshape(-1), v, c)
+
+    def krylov_jacobian_vector(self, t, u, du, res, v, c):
+        """
+        Returns P^-1 (dF/du + c dF/d(du)) v for krylov_residual (res is P^-1 F, so F is
+        taken from the last krylov_residual or evaluated again). Flags a preconditioner
+        update (made by krylov_residual at the next step) when a linear solve needs more
+        than KRYLOV_ITERATIONS products or c has changed as much as IDA allows before
+        updating its own Jacobian.
+        """
+        u = np.asarray(u, dtype=float).reshape(-1)
+        du = np.asarray(du, dtype=float).reshape(-1)
+        self.statistics["jacobian-vector products"] += 1
+        self._krylov_iterations += 1
+        self._krylov_c = c
+        if self._preconditioner is None or self._krylov_iterations > KRYLOV_ITERATIONS or \
+                not 0.6 < c / self._preconditioner_c < 5 / 3:
+            self._update_preconditioner = True
+        point = self._krylov_point
+        if point is not None and point[0] == t and np.array_equal(point[1], u) and np.array_equal(point[2], du):
+            F0 = point[3]
+        else:
+            F0 = self.residual(t, u, du)
+        Jv = self._jacobian_product(t, u, du, F0, v, c)
+        return Jv if self._preconditioner is None else self._preconditioner.solve(Jv)
+
+    def _jacobian_product(self, t, u, du, F0, v, c):
+        u = np.asarray(u, dtype=float).reshape(-1)
+        du = np.asarray(du, dtype=float).reshape(-1)
+        v = np.asarray(v, dtype=float).reshape(-1)
+        norm = np.linalg.norm(v)
+        if norm == 0:
+            return np.zeros(self.NE)
+        sigma = np.sqrt(np.finfo(float).eps) * max(np.linalg.norm(u), self.jacobian_floor) / norm
+        return (self.residual(t, u + sigma * v, du) - F0) / sigma - c * self.mass_product(u, v)
+
+    def stream_disk(self, n, h):
+        """
+        Returns the (1-based) disk at the heights n (m) of the feeds, products or jacket
+        for the liquid level h (m).
+        """
+        NL, NV, H = self.NL, self.NV, self.H
+        n = np.asarray(n, dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vapor = np.round((n - h) / ((H - h) / NV)) + NL
+            liquid = np.maximum(np.round(n / (h / NL)), 1)
+        return np.where(n > h, vapor, liquid)
+
+    def smooth_disks(self, n, h):
+        """
+        Returns the disks (2 x len(n), 1-based) on either side of the heights n (m) for the
+        liquid level h (m), and the weights (2 x len(n)) with which they share a stream.
+        The weight moves from the lower to the upper disk over smoothWidth disks around
+        the boundary at which stream_disk switches.
+        """
+        NL, NV, N, H = self.NL, self.NV, self.N, self.H
+        n = np.asarray(n, dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            position = np.where(n > h, (n - h) / ((H - h) / NV) + NL, np.maximum(n / (h / NL), 1))
+        lower = np.minimum(np.floor(position), N)
+        upper = np.minimum(lower + 1, N)
+        width = min(self.smooth_widths["disk"], 1.0)
+        w = smoothstep((position - lower - 0.5) / width + 0.5)
+        return np.array([lower, upper]), np.array([1 - w, w])
+
+    def stream_distribution(self, kind, n, h):
+        """
+        Returns the distribution matrix (N x len(n)) of the feeds or products (kind) at the
+        heights n (m) for the liquid level h (m), and the disks and weights of the streams
+        (2 x len(n) each, see smooth_disks). Without smoothing each stream goes to
+        stream_disk with weight 1 (and weight 0 on the same disk).
+        """
+        NL, N = self.NL, self.N
+        if not self.smooth:
+            disks = self.stream_disk(n, h)
+            weights = np.array([np.ones(len(disks)), np.zeros(len(disks))])
+            return distribution_matrix(kind, disks, NL, N), np.array([disks, disks]), weights
+        disks, weights = self.smooth_disks(n, h)
+        matrix = weights[0] * distribution_matrix(kind, disks[0], NL, N) + \
+                 weights[1] * distribution_matrix(kind, disks[1], NL, N)
+        return matrix, disks, weights
+
+    def evaporation_flux(self, Ps, PV, X, Y):
+        """
+        Returns the evaporation flux J of each component (positive from the liquid to the
+        vapor) and its evaporating part e = max(J, 0), for the vapor pressures Ps at the
+        interface temperature, the tank pressure PV and the interface mole fractions X
+        (liquid) and Y (vapor). Components are on the last axis, so Ps, X and Y can also
+        hold one row per output time (with PV a column).
+        """
+        MW = np.asarray(self.MW, dtype=float)
+        if not self.smooth:
+            K = np.maximum(Ps / PV, 1 * 10 ** (-6))
+            J = self.sigma * self.A * PV * (np.minimum(K * X, 1) - Y) * np.sqrt(MW)
+            return J, np.maximum(J, 0)
+        widths = self.smooth_widths
+        K = 1e-6 + smooth_max(Ps / PV - 1e-6, widths["equilibrium"])
+        force = 1 - smooth_max(1 - K * X, widths["flux"]) - Y
+        coefficient = self.sigma * self.A * PV * np.sqrt(MW)
+        return coefficient * force, coefficient * smooth_max(force, widths["flux"])
+
+    def heat_leak(self, T, h, Ta):
+        """
+        Returns the heat leak (W) from the surroundings and the jacket into each disk.
+        """
+        NL, NV, H = self.NL, self.NV, self.H
+        ## Jacket Location
+        nJ = np.asarray(self.nJ, dtype=float)
+        if self.smooth:
+            # Blend of the heat leaks of the disks on either side of each jacket end
+            disks, weights = self.smooth_disks(nJ, h)
+            Q = 0
+            for a in range(2):
+                for b in range(2):
+                    if weights[a, 0] * weights[b, 1] > 0:
+                        mJ = np.array([disks[a, 0], disks[b, 1]])
+                        Q = Q + weights[a, 0] * weights[b, 1] * self.jacket_heat_leak(T, h, Ta, mJ)
+            return Q
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mJ = np.where(nJ > h - 1, np.round((nJ - h) / ((H - h) / NV)) + NL,
+                          np.maximum(np.round(nJ / (h / NL)), 1))
+        return self.jacket_heat_leak(T, h, Ta, mJ)
+
+    def jacket_heat_leak(self, T, h, Ta, mJ):
+        """
+        Returns the heat leak (W) into each disk for the jacket from disk mJ[0] to mJ[1].
+        """
+        N, NL, NV, H, D = self.N, self.NL, self.NV, self.H, self.D
+        i = np.arange(N)
+        liquid = i <= NL - 1
+        jacket = (i >= mJ[0] - 1) & (i <= mJ[1] - 1)
+        wall_liquid = self.Ulw * math.pi * D * h * (Ta - T) / NL
+        wall_vapor = self.Uvw * math.pi * D * (H - h) * (Ta - T) / NV
+        jacket_liquid = self.Ulr * math.pi * D * h * (self.Tj - T) / NL
+        jacket_vapor = self.Uvr * math.pi * D * (H - h) * (self.Tj - T) / NV
+        if mJ[0] < NL:
+            if mJ[1] + 1 <= NL:
+                return np.select([jacket, ~liquid], [jacket_liquid, wall_vapor], wall_liquid)
+            # Jacket across the interface; vapor disks above it exchange with the
+            # surroundings with the jacket-vapor coefficient
+            return np.select([i < mJ[0] - 1, liquid, i <= mJ[1] - 1],
+                             [wall_liquid, jacket_liquid, jacket_vapor],
+                             self.Uvr * math.pi * D * (H - h) * (Ta - T) / NV)
+        return np.select([jacket, liquid], [jacket_vapor, wall_liquid], wall_vapor)
+
+    def feed_pressure(self, h, P):
+        """
+        Returns the distribution of the feeds over the disks ff (N x F) for the liquid level
+        h (m) and the pressures P_mf (F) (kPa) the feeds enter at, interpolated from the disk
+        pressures P (N).
+        """
+        ff, mf, wf = self.stream_distribution("feed", self.nf, h)
+        P_mf = wf[0] * P[mf[0].astype(int) - 1] + wf[1] * P[mf[1].astype(int) - 1]
+        return ff, P_mf
+
+    def feed_vapor(self, Fi, zf, Pf, Tf, P_mf):
+        """
+        Returns the flash temperatures T2 (n) (K) and the vapor flows fv (n x I) (kg/s) of n
+        feeds of flows Fi (n) (kg/s), compositions zf (n x I), pressures Pf (n) (kPa) and
+        temperatures Tf (n) (K) entering the tank at the pressures P_mf (n) (kPa), from
+        ModelF. The liquid flows are Fi * zf - fv.
+        """
+        AN = np.concatenate((zf, Pf.reshape(-1, 1), P_mf.reshape(-1, 1), Tf.reshape(-1, 1)), axis=1)
+        BN = np.maximum(self.ModelF.ModelF(AN, **self.ModelF_options), 0)
+        vf = np.minimum(BN[:, 1:], zf)
+        return BN[:, 0], vf * (Fi.reshape(-1, 1) * zf)
+
+    def boil_off(self, wsqN, fv):
+        """
+        Returns the boil-off (kg/s): the evaporation rate wsqN plus the flashed vapor fv
+        (... x F x I) of all feeds, for one state or one row per output time.
+        """
+        return wsqN + fv.sum(axis=(-2, -1))
+
+    def feed_flash(self, t, h, P):
+        """
+        Returns the flash of the feeds at time t into the tank of liquid level h and disk
+        pressures P: the distribution of the feeds over the disks ff (N x F), the liquid
+        and vapor flows fl and fv (F x I) and their enthalpy flows fel and fev (F).
+        """
+        I, N, F = self.I, self.N, self.F
+        fel = np.zeros(F)
+        fev = np.zeros(F)
+        fl = np.zeros((F, I))
+        fv = np.zeros((F, I))
+        ff = np.zeros((N, F))
+        if F > 0:
+            ## Liquid and vapour distribution
+            ff, P_mf = self.feed_pressure(h, P)
+            ## Flowrate, Temperature and Vapor Fraction
+            Tf = self.ATf + self.BTf * (t - self.t0)
+            Pf = self.APf + self.BPf * (t - self.t0)
+            Fi = self.Af + self.Bf * (t - self.t0)
+            zf = self.AZf + self.BZf * (t - self.t0)
+            T2, fv = self.feed_vapor(Fi, zf, Pf, Tf, P_mf)
+            fl = Fi.reshape(-1, 1) * zf - fv
+            EL_F, CL_F, LD_F = self.properties.liq_prop(T2)
+            EV_F, CV_F = self.properties.vap_prop(T2)
+            fel = np.sum(fl * EL_F, axis=1)
+            fev = np.sum(fv * EV_F, axis=1)
+        return ff, fl, fv, fel, fev
+
+    def tankfunc(self, u, t, context=None):
+        """
+        Returns the right hand side (NE x 1) of the DAE at (u, t). context is the result of
+        context(u), computed if None.
+        """
+        I, N, NL, NE, NC = self.I, self.N, self.NL, self.NE, self.NC
+        Tref, Lref, Vref, A = self.Tref, self.Lref, self.Vref, self.A
+        S = self.S
+        MW = np.asarray(self.MW, dtype=float)
+        Ul, Uv, Ui = self.Ul, self.Uv, self.Ui
+        if context is None:
+            context = self.context(u)
+
+        u = np.asarray(u, dtype=float).reshape(-1)
+        dydt = np.zeros((NE, 1))
+        ## Ambient Temperature
+        t0 = (t / (24 * 3600)) % 24
+        Ta = self.Tamb[0] + self.Tamb[1] * t0 + self.Tamb[2] * t0 ** 2
+        # Model Variables
+        T, x, sumw = context["T"], context["x"], context["sumw"]
+        wsq = np.zeros(N - 1)
+        wsq[:NL - 1] = u[NC:NC + NL - 1] * 0.01 * Lref
+        wsq[NL:N - 1] = u[NC + NL - 1:NE] * 0.01 * Vref
+        rho, h, PV, P = context["rho"], context["h"], context["PV"], context["P"]
+
+        ## Enthalpy Calculations
+        Ei = np.concatenate((context["EL"], context["EV"]), axis=0)
+        E = (Ei * x.T).sum(axis=1)
+
+        ## Interface Calculations
+        T_I = context["T_I"]
+        X = x[:, NL - 1] / MW / (x[:, NL - 1] / MW).sum()
+        Y = x[:, NL] / MW / (x[:, NL] / MW).sum()
+        Ps = self.properties.vapor_pressure([T_I])[0]
+        ## Evaporation Flux Calculation
+        J, e = self.evaporation_flux(Ps, PV, X, Y)
+        c = e - J
+        sumc = c @ context["EL_I"][0]
+        sume = e @ context["EV_I"][0]
+        wsq[NL - 1] = np.sum(J)
+
+        ### Flash stream
+        ff, fl, fv, fel, fev = self.feed_flash(t, h, P)
+
+        ## Send Out Stream
+        sumg = np.zeros(N)
+        if S > 0:
+            Gi = self.Ag + self.Bg * (t - self.t0)
+            pf = self.stream_distribution("product", self.ng, h)[0]
+            sumg = pf @ Gi
+
+        ### Heat Transfer Calculations
+        Q = self.heat_leak(T, h, Ta)
+
+        # Heat Transfer across Disks
+        q = np.zeros(N)
+        q[0] = self.Ub * A * (self.Tb - T[0]) - Ul * A * (T[0] - T[1])
+        q[1:NL - 1] = Ul * A * (T[:NL - 2] - T[1:NL - 1]) - Ul * A * (T[1:NL - 1] - T[2:NL])
+        q[NL - 1] = Ul * A * (T[NL - 2] - T[NL - 1]) - Ui * A * (T[NL - 1] - T[NL])
+        q[NL] = Ui * A * (T[NL - 1] - T[NL]) - Uv * A * (T[NL] - T[NL + 1])
+        q[NL + 1:N - 1] = Uv * A * (T[NL:N - 2] - T[NL + 1:N - 1]) - Uv * A * (T[NL + 1:N - 1] - T[NL + 2:N])
+        q[N - 1] = Uv * A * (T[N - 2] - T[N - 1]) + self.Ur * A * (self.Tr - T[N - 1])
+
+        ## Upwind flows between neighbouring disks of the same phase; the flow across the
+        ## interface (wsq[NL - 1]) is the evaporation/condensation handled separately
+        if self.smooth:
+            scale = np.full(N - 1, 0.01 * Vref)
+            scale[:NL - 1] = 0.01 * Lref
+            up = scale * smooth_max(wsq / scale, self.smooth_widths["flow"])
+            down = up - wsq
+        else:
+            up = np.maximum(wsq, 0)
+            down = np.maximum(-wsq, 0)
+        up[NL - 1] = 0
+        down[NL - 1] = 0
+        flow_E = up * E[:-1] - down * E[1:]
+        flow_x = up * x[:, :-1] - down * x[:, 1:]
+        zero_x = np.zeros((I, 1))
+
+        ## Energy Balance
+        dE = np.concatenate(([0], flow_E)) - np.concatenate((flow_E, [0])) - sumg * E + q + Q
+        dE[:NL] += ff[:NL] @ fel
+        dE[NL:] += ff[NL:] @ fev
+        dE[NL - 1] += sumc - sume
+        dE[NL] += sume + sumc
+        dydt[:NL, 0] = dE[:NL] / (Lref * Tref)
+        dydt[NL:N, 0] = dE[NL:] / (Vref * Tref)
+
+        # Component Balance
+        dW = np.concatenate((zero_x, flow_x), axis=1) - np.concatenate((flow_x, zero_x), axis=1) - sumg * x
+        dW[:, :NL] += (ff[:NL] @ fl).T
+        dW[:, NL:] += (ff[NL:] @ fv).T
+        dW[:, NL - 1] += c - e
+        dW[:, NL] += e - c
+        dW[:, :NL] /= Lref
+        dW[:, NL:] /= Vref
+        dydt[N:NC, 0] = dW.T.reshape(-1)
+
+        ## Interdisk flows
+        dydt[NC:NC + NL - 1, 0] = sumw[1:NL] / sumw[0] - rho[1:NL] / rho[0]
+        dydt[NC + NL - 1:NE, 0] = sumw[NL:N - 1] / sumw[N - 1] - rho[NL:N - 1] / rho[N - 1]
+
+        return dydt
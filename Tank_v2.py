@@ -1,14 +1,21 @@
 import math
 import pandas as pd
 import numpy as np
-from scipy.stats import poisson
-import importlib
-from assimulo.problem import Implicit_Problem
-from assimulo.solvers import IDA
+import timeit
+try:
+    from assimulo.problem import Implicit_Problem
+    from assimulo.solvers import IDA
+except ImportError:  # TankModel and the data preprocessing do not need the solver
+    Implicit_Problem = IDA = None
 from datetime import datetime
 import matplotlib.pyplot as plt
 from matplotlib.ticker import FormatStrFormatter
 from io import BytesIO
+from PropertyPackage import PropertyPackage
+from Trajectory import Trajectory, output_grid
+from Checkpoint import CheckpointWriter, load_checkpoint
+from TankModel import TankModel, JACOBIAN_MODES, RESTART_MODES, RESIDUAL_MODES, LINEAR_SOLVERS, INTERVAL, \
+    SENSITIVITY_PARAMETERS, SENSITIVITY_OUTPUTS, INITIAL_CONDITIONS, FORCING, distribution_counters
 
 class Tank:
     def __init__(self, noFeedStreams, noProductStreams, tankDiameter, tankHeight, initialPressure, 
@@ -16,7 +23,10 @@ class Tank:
             noComponents, molecular_weights, componentList, ModelF, ModelZg,
             jacketStartValue, jacketEndValue, sigma, Ul,
             Uv, Uvw, Ulw, Ur, Ub, Uvr, Ulr, groundTemp, ambTemp, roofTemp, refridgeTemp, 
-            noLDisks, noVDisks, abstol, reltol, numberofIterations, diskinitCombined):
+            noLDisks, noVDisks, abstol, reltol, numberofIterations, diskinitCombined, propertyMode="network",
+            heatCapacity="network", backend="numpy", jacobian="structured", restarts="breakpoints",
+            residual="exact", smoothWidth=0.1, linearSolver="dense", outputGrid=0.5,
+            checkpointFile=None, checkpointInterval=60, sensitivities=None, initialConditions="table"):
         self.noFeedStreams = noFeedStreams
         self.noProductStreams = noProductStreams
         self.tankDiameter = tankDiameter  ## Tank Diameter (m)
@@ -53,6 +63,46 @@ class Tank:
         self.reltol = reltol
         self.numberofIterations = numberofIterations
         self.diskinitCombined = diskinitCombined
+        self.propertyMode = propertyMode  ## "network" or "tabulated" (spline tables of the ANNs)
+        self.heatCapacity = heatCapacity  ## "network" (Cp ANN) or "derivative" (dH/dT of the enthalpy ANN where valid)
+        self.properties = PropertyPackage(self.componentList, mode=propertyMode, heat_capacity=heatCapacity,
+                                          backend=backend)
+        self.backend = self.properties.backend  ## "numpy" or "numba" (compiled networks of this tank)
+        if jacobian not in JACOBIAN_MODES:
+            raise ValueError(f"Unknown Jacobian mode {jacobian}. Choose from {JACOBIAN_MODES}.")
+        self.jacobian = jacobian  ## "structured" (grouped finite differences), "finite-difference" (IDA) or "verify"
+        if restarts not in RESTART_MODES:
+            raise ValueError(f"Unknown restart mode {restarts}. Choose from {RESTART_MODES}.")
+        self.restarts = restarts  ## re-initialise IDA at schedule "breakpoints" or at all 5 minute "intervals"
+        if residual not in RESIDUAL_MODES:
+            raise ValueError(f"Unknown residual mode {residual}. Choose from {RESIDUAL_MODES}.")
+        if not smoothWidth > 0:
+            raise ValueError(f"smoothWidth must be positive, got {smoothWidth}.")
+        self.residual = residual  ## "exact" or "smooth" (continuous blends of the switches of the residual)
+        self.smoothWidth = smoothWidth
+        if linearSolver not in LINEAR_SOLVERS:
+            raise ValueError(f"Unknown linear solver {linearSolver}. Choose from {LINEAR_SOLVERS}.")
+        if linearSolver == "spgmr-experimental" and jacobian == "finite-difference":
+            raise ValueError("The experimental SPGMR preconditioner is built from the structured Jacobian. "
+                             "Choose jacobian=\"structured\" or \"verify\".")
+        self.linearSolver = linearSolver  ## IDA linear solver: "dense", "spgmr" or "spgmr-experimental" (preconditioned residual)
+        output_grid(outputGrid, 60 * numberofIterations)
+        self.outputGrid = outputGrid  ## output spacing (min), output times (min) or "steps" of the solver
+        if not (checkpointInterval > 0 and checkpointInterval % 5 == 0):
+            raise ValueError(f"checkpointInterval must be a positive multiple of 5 min, got {checkpointInterval}.")
+        self.checkpointFile = checkpointFile  ## checkpoint path ("{minutes}" for one file per checkpoint, outputs in Checkpoint.new_history) or None
+        self.checkpointInterval = checkpointInterval  ## simulated time between checkpoints (min)
+        sensitivities = list(sensitivities or [])
+        for name in sensitivities:
+            if name not in SENSITIVITY_PARAMETERS:
+                raise ValueError(f"Unknown sensitivity parameter {name}. Choose from {SENSITIVITY_PARAMETERS}.")
+        if len(set(sensitivities)) != len(sensitivities):
+            raise ValueError(f"Repeated sensitivity parameters in {sensitivities}.")
+        self.sensitivityParameters = sensitivities  ## coefficients of the IDA forward sensitivity analysis
+        if initialConditions not in INITIAL_CONDITIONS:
+            raise ValueError(f"Unknown initial conditions {initialConditions}. Choose from {INITIAL_CONDITIONS}.")
+        self.initialConditions = initialConditions  ## disk temperatures of the "table" or the "steady" state
+        self.twin = None  ## model, IDA and time of the stepwise digital twin (advance)
 
     def check_input(self):
         for i in range(1,self.noComponents+1):
@@ -183,855 +233,329 @@ class Tank:
             BZ_df.columns = componentName
             self.BZ_dict[BZ_keys[j]] = BZ_df
     
-    def run_simulation(self):
-        I = self.noComponents
+    def steady_state(self):
+        """
+        Solves the steady state of the tank directly (TankModel.steady_state) after
+        data_preprocessing: the disk temperatures and inter-disk flows that no longer
+        change at the initial liquid level, vapor holdup and disk compositions, with the
+        feeds and products at the start of the schedule. Returns a dict of the boil-off
+        (evaporation and flashed feed vapor) and evaporation rates, the pressure, level,
+        interface and disk temperatures, the disk conditions in the format of
+        diskinitCombined (to start other runs from) and the Newton iterations and wall
+        time.
+        """
+        start = timeit.default_timer()
+        tankModel = TankModel(self)
+        tankModel.set_interval(0)
+        u, iterations = tankModel.steady_state(tankModel.initial_state())
+        context = tankModel.context(u)
+        columns = self.diskinitCombined.columns
+        diskConditions = pd.DataFrame(np.column_stack((context["T"], context["x"].T)), columns=columns[1:])
+        diskConditions.insert(0, columns[0], [f"Liquid Disk {i + 1}" for i in range(tankModel.NL)] +
+                              [f"Vapour Disk {i + 1}" for i in range(tankModel.NV)])
+        self.steadyState = {**self._state(tankModel, u, 0.0), "disk conditions": diskConditions,
+                            "iterations": iterations, "wall time (s)": timeit.default_timer() - start}
+        return self.steadyState
+
+    def _state(self, tankModel, u, t):
+        """
+        Returns the boil-off (evaporation and flashed feed vapor) and evaporation rates,
+        the pressure, level, interface and disk temperatures of the state u at time t (s).
+        """
+        PV, h, wsqN = tankModel.outputs(u)
+        context = tankModel.context(u)
+        fv = tankModel.feed_flash(t, h, context["P"])[2]
+        return {"boil-off (kg/s)": tankModel.boil_off(wsqN, fv), "evaporation rate (kg/s)": wsqN, "pressure (kPa)": PV,
+                "liquid level (m)": h, "interface temperature (K)": context["T_I"],
+                "disk temperatures (K)": context["T"]}
+
+    def advance(self, dt, feed_inputs=None, product_inputs=None):
+        """
+        Advances the tank as a digital twin by dt seconds with the feeds and products
+        held at the measured values feed_inputs and product_inputs as they arrive (see
+        TankModel.hold_inputs), and returns its state at the end (as steady_state) with
+        the time (min), the IDA steps, whether the solver was restarted and the wall
+        time. The first call starts from the initial conditions and from the feeds and
+        products at the start of the schedule after data_preprocessing; without it the
+        inputs have to give every stream. The model, properties and IDA are kept between
+        the calls: IDA continues from its last state and step size while the inputs stay
+        the same, and restarts with a consistent derivative when they change. Set twin
+        to None to start again.
+        """
+        start = timeit.default_timer()
+        if not dt > 0:
+            raise ValueError(f"dt must be positive, got {dt}.")
+        if self.twin is None:
+            tankModel = TankModel(self)
+            if hasattr(self, "Af_dict"):
+                tankModel.set_interval(0)
+            else:
+                F, S, I = tankModel.F, tankModel.S, tankModel.I
+                tankModel.set_forcing(np.full(F, np.nan), np.zeros(F), np.full((F, I), np.nan), np.zeros((F, I)),
+                                      np.full(F, np.nan), np.zeros(F), np.full(F, np.nan), np.zeros(F),
+                                      np.full(S, np.nan), np.zeros(S))
+            tankModel.hold_inputs(0.0, feed_inputs, product_inputs)
+            if not all(np.isfinite(getattr(tankModel, name)).all() for name in FORCING[::2]):
+                raise ValueError("Without data_preprocessing the first step needs the flow, temperature, pressure "
+                                 "and composition of every feed and the flow of every product.")
+            u = tankModel.initial_state()
+            if self.initialConditions == "steady":
+                u = tankModel.steady_state(u)[0]
+            u = u.ravel()
+            sim = self._solver(tankModel, u, tankModel.consistent_derivative(u, 0.0), 0.0)
+            self.twin = {"model": tankModel, "solver": sim, "t": 0.0, "u": u, "step": 0.0}
+            restarted = True
+        else:
+            tankModel, sim, t, u = [self.twin[key] for key in ["model", "solver", "t", "u"]]
+            restarted = tankModel.hold_inputs(t, feed_inputs, product_inputs)
+            if restarted:
+                sim.re_init(t, u, tankModel.consistent_derivative(u, t))
+        twin = self.twin
+        # IDA restarts at order 1 in every simulate; from the last step size unless the inputs changed
+        sim.inith = 0.0 if restarted else twin["step"]
+        t2, y2, _ = sim.simulate(twin["t"] + dt, 0)
+        steps = np.diff(np.concatenate(([twin["t"]], np.ravel(t2))))
+        steps = steps[steps > 0]
+        if len(steps):
+            twin["step"] = float(steps[-2:].max())  # the last step may be cut short at t + dt
+        twin["t"] = float(np.ravel(t2)[-1])
+        twin["u"] = np.asarray(y2)[-1]
+        return {"time (min)": twin["t"] / 60, **self._state(tankModel, twin["u"], twin["t"]), "steps": len(steps),
+                "restarted": restarted, "wall time (s)": timeit.default_timer() - start}
+
+    def resume_from(self, checkpoint):
+        """
+        Continues the simulation from checkpoint (a file written by run_simulation with
+        checkpointFile, or its content from Checkpoint.load_checkpoint) up to the running
+        time of this tank, after data_preprocessing. The output before the checkpoint is
+        taken from its history files; the checkpoints of this run refer to them and
+        append the new output to a history file of their own. The checkpoint may come
+        from another scenario with the same disks
+        and components, e.g. other feeds or products after the checkpoint: the fork
+        does not simulate the common prefix again.
+        """
+        self.run_simulation(checkpoint=checkpoint)
+
+    def _solver(self, tankModel, y0, dy0, t0, names=()):
+        """
+        Returns IDA for the DAE residual tankfunc(u, t) - mass(u) du of tankModel from
+        (t0, y0, dy0) with the linear solver, Jacobian and tolerances of the tank, and
+        with forward sensitivities to the coefficients names.
+        """
+        if IDA is None:
+            raise ImportError("Simulating the tank needs assimulo (IDA), which is not installed.")
+        experimental = self.linearSolver == "spgmr-experimental"
+        residual = tankModel.krylov_residual if experimental else tankModel.residual
+        jac = tankModel.jacobian
+        jacv = tankModel.krylov_jacobian_vector if experimental else tankModel.jacobian_vector
+        if names:
+            # IDA passes the (perturbed) coefficients p to the residual and Jacobians
+            residual, jac, jacv = [tankModel.with_parameters(func, names) for func in [residual, jac, jacv]]
+            model = Implicit_Problem(residual, y0, dy0, t0, p0=tankModel.parameters(names))
+        else:
+            model = Implicit_Problem(residual, y0, dy0, t0)
+        if self.linearSolver != "dense":
+            model.jacv = jacv
+        elif self.jacobian != "finite-difference":
+            model.jac = jac
+        sim = IDA(model)
+        if names:
+            sim.report_continuously = True  # sensitivities are only stored in one step mode
+        if self.linearSolver != "dense":
+            sim.linear_solver = "SPGMR"
+        sim.atol = self.abstol
+        sim.rtol = self.reltol
+        sim.algvar = list(tankModel.differential_variables())  # the N - 2 inter-disk flows are algebraic
+        sim.usejac = self.jacobian != "finite-difference"
+        return sim
+
+    def run_simulation(self, checkpoint=None):
+        tankModel = TankModel(self)
+        counters = dict(distribution_counters)
+        self.tankModel = tankModel
+        I = tankModel.I
 
         ## Fluid Properties and Constants
-        g = 9.81  ## gravitational acceleration (m2/s)
-        R = 8.314  ## gas constant
-        # Z = float(self.compressFactortext.text())  # Compressibility Factor
-
-        ## Fixed DAE model parameters, scale factors, and reference
-        N = self.noLDisks + self.noVDisks
-        F = self.noFeedStreams
-        S = self.noProductStreams
-        Tref = 100  # Scale factor for temperature
-        LDref = 400  # Reference liquid density (kg/m3)
-        VDref = 2  # Reference vapor density (kg/m3)
-        A = self.tankArea
-        H = self.tankHeight
-        D = self.tankDiameter
-        Lref = A * H * LDref / N
-        Vref = A * H * VDref / N
-        NL = self.noLDisks
-        NV = N - NL  # number of vapor disks
-        NC = N + N * I
-        NE = NC + N - 2
-        sigma = self.sigma * 1000  # evaporation model coefficient (2E-5,5E-5,1E-4)
-
-        MW = [self.molecular_weights[x] for x in range(1,self.noComponents+1)]  # component molecular weights (kg/kmol)
-        nf = [self.feeds[x] * H/100 for x in range(1,self.noFeedStreams+1)]
-        ng = [self.products[x] * H/100 for x in range(1,self.noProductStreams+1)]
-
-        ## Temperatures, heat transfer coefficients, and other parameters
-        # global Tamb, Tb, Tj, Tr, Ul, Uv, Ur, Ui, Uvw, Ulw, Ub, Uvr, Ulr, nJ
-        Tb = self.groundTemp  # Ground temperature (K)
-        Tamb = [self.ambTemp, 0, 0]  # ambient temperature as a function of t (K)
-        Tr = self.roofTemp  # roof temperature (K)
-        Ul = self.Ul  # liquid phase film heat transfer coefficient (W/m2 K)
-        Uv = self.Uv  # vapor phase film heat transfer coefficient (W/m2 K)
-        Ui = (Ul * Uv) / (Ul + Uv)  # interface heat transfer coefficient (W/m2 K)
-        Uvw = self.Uvw  # wall-vapor heat transfer coefficient (W/m2 K)
-        Ulw = self.Ulw  # wall-liquid heat transfer coefficient (W/m2 K)
-        Ur = self.Ur  # tank roof-vapor heat transfer coefficient (W/m2 K)
-        Ub = self.Ub  # tank bottom-liquid heat transfer coefficient (W/m2 K)
-        ## Optional
-        nJ = [self.jacketStartValue/100, self.jacketEndValue/100]  # jacket location
-        Uvr = self.Uvr  # jacket-vapor heat transfer coefficient (W/m2 K)
-        Ulr = self.Ulr  # jacket-liquid side heat transfer coefficient (W/m2 K)
-        Tj = self.refridgeTemp  # refrigerant temperature (K)
-        ModelF = importlib.import_module(self.ModelF)
-        ModelZg = importlib.import_module(self.ModelZg)
-
-        def liq_prop(T):
-            E = np.zeros((len(T), I))
-            C = np.zeros((len(T), I))
-            LD = np.zeros((len(T), I))
-            for j in range(len(T)):
-                for i in range(I):
-                    component = importlib.import_module(self.componentList[i])
-                    if len(T) > 1:
-                        E[j, i] = component.liq_enthalpy(np.atleast_2d(T[j]).T)[0]
-                        C[j, i] = component.liq_heat_capacity(np.atleast_2d(T[j]).T)[0]
-                        LD[j, i] = component.density(T[j][0])
-                    elif len(T) == 1:
-                        E[j, i] = component.liq_enthalpy([T])[0]
-                        C[j, i] = component.liq_heat_capacity([T])[0]
-                        LD[j, i] = component.density(T[j])
-            return E, C, LD
-
-        def vap_prop(T):
-            Ei = np.zeros((len(T), I))
-            Ci = np.zeros((len(T), I))
-            for j in range(len(T)):
-                for i in range(I):
-                    component = importlib.import_module(self.componentList[i])
-                    if len(T) > 1:
-                        Ei[j, i] = component.vap_enthalpy(np.atleast_2d(T[j]).T)[0]
-                        Ci[j, i] = component.vap_heat_capacity(np.atleast_2d(T[j]).T)[0]
-                    elif len(T) == 1:
-                        Ei[j, i] = component.vap_enthalpy([T])[0]
-                        Ci[j, i] = component.vap_heat_capacity([T])[0]
-            return Ei, Ci
-
-        def Vap_Pressure(T):
-            P_s = np.zeros((len(T), I))
-            for j in range(len(T)):
-                for i in range(I):
-                    component = importlib.import_module(self.componentList[i])
-                    P_s[j, i] = component.vapor_pressure(T[j])
-            return P_s
+        g = tankModel.g  ## gravitational acceleration (m2/s)
+        R = tankModel.R  ## gas constant
+
+        ## Fixed DAE model parameters, scale factors, and reference (see TankModel)
+        N = tankModel.N
+        F = tankModel.F
+        S = tankModel.S
+        Tref = tankModel.Tref
+        A = tankModel.A
+        H = tankModel.H
+        Lref = tankModel.Lref
+        Vref = tankModel.Vref
+        NL = tankModel.NL
+        NV = tankModel.NV
+        NC = tankModel.NC
+        NE = tankModel.NE
+        MW = tankModel.MW
+        ng = tankModel.ng
+        Ul = tankModel.Ul
+        Uv = tankModel.Uv
 
         ## Initial conditions in the tank
-        h0 = self.initialLiquidHeight * H/100  # liquid height (m) from a percentage of H
-        P0 = self.initialPressure # tank pressure (kPa)
         self.noDisks = self.noLDisks + self.noVDisks
-        T0 = self.diskinitCombined.iloc[:,1].to_numpy(dtype=float).reshape(-1,1)
-        x0 = self.diskinitCombined.iloc[:, 2:].to_numpy(dtype=float)
-        d0 = np.zeros((N, 1))  # disk density
-        Ei, Ci, Di = liq_prop(T0[:NL])
-        d0[:NL, 0] = 1 / np.sum((x0[:NL, :] / Di), axis=1)
-        Pg = P0
-        self.Pg = Pg
-        AN1 = [x for x in x0[N-1,:]]
-        AN2 = [Pg]
-        AN3 = T0[N-1].tolist()
-        AN = AN1 + AN2 + AN3
-        AN = np.array(AN).reshape(1,-1)
-        Z1 = ModelZg.ModelZg(AN)
-        Z = Z1[0][0]
-        d0[NL:N, 0] = P0 / (Z * R * T0[N - 1]) / np.sum(x0[N - 1, :] / MW)
-        W0 = np.zeros((I, N))
-        W0[:, :NL] = d0[:NL, 0] * np.transpose(x0[:NL, :]) * (A * h0 / NL / Lref)
-        W0[:, NL:N] = d0[NL:N, 0] * np.transpose(x0[NL:N, :]) * (A * (H - h0) / NV / Vref)
-        y0 = np.zeros((NE, 1))
-        y0[:N] = (T0 / Tref).tolist()
-        y0[N:NC] = np.reshape(np.transpose(W0), (len(W0) * len(W0[0]), 1))
+        y0 = tankModel.initial_state()
+        Z = tankModel.Z0
+        if self.initialConditions == "steady" and checkpoint is None:
+            # start from the steady state at the level and compositions of the table
+            tankModel.set_interval(0)
+            y0 = tankModel.steady_state(y0)[0].reshape(-1, 1)
 
         ## Main Program
-        t = [0]
-        y = y0.reshape(1, -1)[0]  # horizontal list
-
-        if F > 0:
-            Fi = [self.Af_dict[key].iloc[0, 1] for key in self.Af_dict]
-            FT = [self.Af_dict[key].iloc[0, 3] for key in self.Af_dict]
-            FP = [self.Af_dict[key].iloc[0, 5] for key in self.Af_dict]
-            Fz = []
-
-        def mass(u):
-            # global H, A, R, g, Z, MW, I, N, NL, NV, NE, NC, Tref, Vref, Lref, Ad, Bd, Cd, bi, Sp, Tmin, Tmax
-            ### Model Variables
-            u = np.array(u)
-            u = u.reshape(-1, 1)
-            T = u[0:N] * Tref
-            Wn = np.transpose(np.reshape(u[N:NC], (int((NC - N) / I), I)))
-            Wn[:, :NL] = Wn[:, :NL] * Lref
-            Wn[:, NL:N] = Wn[:, NL:N] * Vref
-            sumw = Wn.sum(axis=0)
-            x = Wn / sumw
-
-            ### Enthalpy calculations
-            Ei = np.zeros((N, I))
-            Ci = np.zeros((N, I))
-            EL, CL, LD = liq_prop(T[:NL])
-            EV, CV = vap_prop(T[NL:N])
-            Ei[:NL, :] = EL
-            Ei[NL:N, :] = EV
-            Ei = Ei.T
-            Ci[:NL, :] = CL
-            Ci[NL:N, :] = CV
-
-            CP = np.zeros((1, N))
-            CP[0, 0:NL] = (x[:, :NL] * np.transpose(Ci[:NL, :])).sum(axis=0)
-            CP[0, NL:N] = (x[:, NL:N] * np.transpose(Ci[NL:N, :])).sum(axis=0)
-
-            ## Mass Matrix
-            Mass = np.zeros((NE, NE))
-            # Energy Balance
-            for i in range(N):
-                if i <= NL - 1:
-                    Mass[i, i] = sumw[i] * CP[0, i] / Lref
-                else:
-                    Mass[i, i] = sumw[i] * CP[0, i] / Vref
-                p = i + 1
-                lowerlimit = N + (p - 1) * I
-                upperlimit = N + (p) * I
-                for j in range(lowerlimit, upperlimit):
-                    k = j - (N + i * I)
-                    Mass[i, j] = Ei[k, i] / Tref
-
-            # Component Balance
-            for i in range(N, NC):
-                Mass[i, i] = 1
-
-            return Mass
-
-        def tankfunc(u, t):
-            global ai
-            u = np.array(u)
-            # u = np.atleast_2d(u)
-            u = u.reshape(-1, 1)
-            dydt = np.zeros((NE, 1))
-            ## Ambient Temperature
-            t0 = (t / (24 * 3600)) % 24
-            Ta = Tamb[0] + Tamb[1] * t0 + Tamb[2] * t0 ** 2
-            # Model Variables
-            T = u[0:N] * Tref
-            Wn = np.transpose(np.reshape(u[N:NC], (int((NC - N) / I), I)))
-            Wn[:, :NL] = Wn[:, :NL] * Lref
-            Wn[:, NL:N] = Wn[:, NL:N] * Vref
-            sumw = Wn.sum(axis=0)
-            x = Wn / sumw
-            wsq = np.zeros((N - 1, 1))
-            wsq[:NL - 1] = u[NC:NC + NL - 1] * 0.01 * Lref
-            wsq[NL:N - 1] = u[NC + NL - 1:NE] * 0.01 * Vref
-
-            ### Density & Pressure
-            rho = np.zeros((N, 1))
-            P = np.zeros((N, 1))
-            Mw = np.zeros((N, 1))
-            EL, CL, LD = liq_prop(T[:NL])
-            rho[:NL, 0] = 1 / (np.transpose(x[:, :NL]) / LD).sum(axis=1)
-            h = NL * sumw[0] / A / rho[0, 0]  # liquid level
-            Mw[:, 0] = 1 / (np.transpose(x[:, :N]) / MW).sum(axis=1)
-
-            P1 = np.zeros((N-NL, 1))
-            P1[:] = self.Pg
-            zf = np.transpose(x[:, NL:N])
-            AN = np.concatenate((zf, P1, T[NL:N].reshape(-1,1)), axis=1)
-            BN = ModelZg.ModelZg(AN)
-            BN = np.maximum(BN, 0)
-            BN_list = BN.reshape(1, -1).tolist()[0]
-            Z = np.zeros((N,1))
-            Z[NL:N, 0] = BN_list
-            PV = (NV * Z[N-1] * R * T[N - 1, 0] * sumw[N - 1]) / (A * (H - h) * Mw[N - 1, 0])
-            self.Pg = PV
-            rho1 = PV * Mw[NL:N, 0]
-            rho2 = (Z[NL:N, 0] * R * T[NL:N, 0])
-            rho[NL:N, 0] = rho1/rho2
-            P[NL:N, 0] = PV
-            for i in range(NL):
-                P[i] = PV + (g * h / NL) * (0.5 * rho[i] + rho[i + 1:NL].sum()) / 1000
-            ## Enthalpy Calculations
-            Ei = np.zeros((N, I))
-            EL, CL, LD = liq_prop(T[:NL])
-            EV, CV = vap_prop(T[NL:N])
-            Ei[:NL, :] = EL
-            Ei[NL:N, :] = EV
-            E = np.zeros((1, N))
-            E[0, 0:NL] = (Ei[:NL, :] * np.transpose(x[:, :NL])).sum(axis=1)
-            E[0, NL:N] = (Ei[NL:N, :] * np.transpose(x[:, NL:N])).sum(axis=1)
-            ## Interface Calculations
-            T_I = (Ul * T[NL - 1, 0] + Uv * T[NL, 0]) / (Ul + Uv)
-            X = np.transpose(x[:, NL - 1]) / MW / (np.transpose(x[:, NL - 1]) / MW).sum(axis=0)
-            Y = np.transpose(x[:, NL]) / MW / (np.transpose(x[:, NL]) / MW).sum(axis=0)
-            Ps = Vap_Pressure([T_I])
-            K = np.maximum(Ps / PV, 1 * 10 ** (-6))
-            ## Evaporation Flux Calculation
-            J = sigma * A * PV * (np.minimum(K * X, 1) - Y) * np.sqrt(MW)
-            e = np.maximum(J, 0)
-            c = np.maximum(J * (-1), 0)
-            TI_A = np.array([T_I])
-            EL, CL, LD = liq_prop(TI_A)
-            EV, CV = vap_prop(TI_A)
-            sumc = np.matmul(c, np.transpose(EL))[0][0]
-            sume = np.matmul(e, np.transpose(EV))[0][0]
-            wsq[NL - 1] = np.sum(J)
-
-            ### Flash stream
-            ## Liquid and vapour distribution
-            mf = np.zeros((F, 1))
-            for r in range(F):
-                if nf[r] > h:
-                    mf[r, 0] = np.round((nf[r] - h) / ((H - h) / NV)) + NL
-                else:
-                    mf[r, 0] = np.maximum(np.round(nf[r] / (h / NL)), 1)
-
-            ## Flowrate, Temperature and Vapor Fraction
-            if F > 0:
-                Tf = np.array([np.array(ATf), np.array(BTf) * t]).sum(axis=0)
-                Pf = np.array([np.array(APf), np.array(BPf) * t]).sum(axis=0)
-                Fi = np.array([np.array(Af), np.array(Bf) * t]).sum(axis=0)
-                zf = np.array([np.array(AZf), np.array(BZf) * t]).sum(axis=0)
-                Ff = np.transpose(np.reshape(Fi, (-1, len(Fi)))) * zf
-                Pf = Pf.reshape(-1, 1)
-                mf_1 = mf.reshape(1, -1)[0].tolist()
-                mf_1 = [int(i)-1 for i in mf_1]
-                P_mf = P[mf_1]
-                Tf = Tf.reshape(-1, 1)
-                AN = np.concatenate((zf, Pf, P_mf, Tf), axis=1)
-                BN = np.maximum(ModelF.ModelF(AN), 0)
-                T2 = BN[:, 0]
-                vf = np.minimum(BN[:, 1:], zf)
-                fv = vf * Ff
-                fl = Ff - fv
-                T2_1 = T2.reshape(-1, 1)
-                EL, Ci, Di = liq_prop(T2_1)
-                EV, Ci = vap_prop(T2_1)
-                fel = np.sum((fl * EL), axis=1)
-                fev = np.sum((fv * EV), axis=1)
-                fel = fel.reshape(-1, 1)  # column vector
-                fev = fev.reshape(-1, 1)  # column vector
-
-            ## Liquid and Vapour Distributions
-            ff = np.zeros((N, F))
-            for r in range(F):
-                if mf[r, 0] > NL:
-                    xp = [i for i in range(NL)]
-                    ldf = poisson.pmf(xp, mu=1)
-                    yp = [i for i in range(N - int(mf[r, 0]) + 1)]
-                    vdf = poisson.pmf(yp, mu=1)
-                    xp = [i for i in range(int(mf[r, 0]) - NL)]
-                    xpf = poisson.pmf(xp, mu=1)
-                    for i in range(N):
-                        if i <= NL - 1:
-                            ff[i, r] = ldf[NL - i - 1]
-                        elif i > NL - 1 and i < int(mf[r, 0]) - 1:
-                            ff[i, r] = xpf[int(mf[r, 0]) - i - 2]
-                        else:
-                            # print(i, vdf[i-int(mf.iloc[r, 0])])
-                            ff[i, r] = vdf[i - int(mf[r, 0]) + 1]
-
-                elif mf[r, 0] == NL:
-                    xp = [i for i in range(NL)]
-                    ldf = poisson.pmf(xp, mu=1)
-                    yp = [i for i in range(N - NL)]
-                    vdf = poisson.pmf(yp, mu=1)
-                    for i in range(N):
-                        if i <= NL - 1:
-                            ff[i, r] = ldf[NL - i - 1]
-                        else:
-                            ff[i, r] = vdf[i - NL]
-
-                else:
-                    xp = [i for i in range(int(mf[r, 0]))]
-                    ldf = poisson.pmf(xp, mu=1)
-                    xp = [i for i in range(NL - int(mf[r, 0]))]
-                    vdf = poisson.pmf(xp, mu=1)
-                    for i in range(N):
-                        if i <= int(mf[r, 0]) - 1:
-                            ff[i, r] = ldf[int(mf[r, 0]) - i - 1]
-                        elif i > int(mf[r, 0]) - 1 and i <= NL - 1:
-                            ff[i, r] = vdf[i - int(mf[r, 0])]
-                        else:
-                            ff[i, r] = 0
-
-            ff[:NL, :] = ff[:NL, :] / ff[:NL, :].sum(axis=0)
-            ff[NL:N, :] = ff[NL:N, :] / ff[NL:N, :].sum(axis=0)
-            ff = np.maximum(ff, 0)
-            ff = np.nan_to_num(ff)
-
-            # ## Send Out Stream
-            if S > 0:
-                Gi = np.array(Ag) + np.array(Bg) * t
-                mg = np.zeros((S, 1))
-                for s in range(S):
-                    if ng[s] > h:
-                        mg[s, 0] = np.round((ng[s] - h) / ((H - h) / NV)) + NL
-                    else:
-                        mg[s, 0] = np.maximum(np.round(ng[s] / (h / NL)), 1)
-
-                pf = np.zeros((N, S))
-                for s in range(S):
-                    if mg[s, 0] <= NL:
-                        xp = [i for i in range(int(mg[s, 0]))]
-                        ldf = poisson.pmf(xp, mu=1)
-                        xp = [i for i in range(NL - int(mg[s, 0]))]
-                        vdf = poisson.pmf(xp, mu=1)
-                        for i in range(N):
-                            if i <= mg[s, 0] - 1:
-                                pf[i, s] = ldf[int(mg[s, 0]) - i - 1]
-                            elif i > mg[s, 0] - 1 and i <= NL - 1:
-                                pf[i, s] = vdf[i - int(mg[s, 0])]
-                            else:
-                                pf[i, s] = 0
-
-                    else:
-                        xp = [i for i in range(int(mg[s, 0]) - NL)]
-                        ldf = poisson.pmf(xp, mu=1)
-                        xp = [i for i in range(N - int(mg[s, 0] + 1))]
-                        vdf = poisson.pmf(xp, mu=1)
-                        for i in range(N):
-                            if i <= NL - 1:
-                                pf[i, s] = 0
-                            elif i > NL - 1 and i <= mg[s, 0] - 1:
-                                pf[i, s] = ldf[int(mg[s, 0]) - i - 1]
-                            else:
-                                pf[i, s] = vdf[i - int(mg[s, 0])]
-
-                pf[:NL, :] = pf[:NL, :] / pf[:NL, :].sum(axis=0)
-                pf[NL:N, :] = pf[NL:N, :] / pf[NL:N, :].sum(axis=0)
-                pf = np.maximum(pf, 0)
-                pf = np.nan_to_num(pf)
-                sumg = np.matmul(pf, np.transpose(Gi))
-
-            ### Heat Transfer Calculations
-            ## Jacket Location
-            mJ = np.zeros((2, 1))
-            for l in range(2):
-                if nJ[l] > h - 1:
-                    mJ[l, 0] = np.round((nJ[l] - h) / ((H - h) / NV)) + NL
-                else:
-                    mJ[l, 0] = np.maximum(np.round(nJ[l] / (h / NL)), 1)
-
-            ## Heat leak from surrounding
-            Q = np.zeros((N, 1))
-            q = np.zeros((N, 1))
-            for i in range(N):
-                if mJ[0, 0] < NL:
-                    if mJ[1, 0] + 1 <= NL:
-                        if i >= mJ[0, 0]-1 and i <= mJ[1, 0]-1:
-                            Q[i, 0] = Ulr * math.pi * D * h * (Tj - T[i, 0]) / NL
-                        elif i > NL - 1:
-                            Q[i, 0] = Uvw * math.pi * D * (H - h) * (Ta - T[i, 0]) / NV
-                        else:
-                            Q[i, 0] = Ulw * math.pi * D * h * (Ta - T[i, 0]) / NL
-
-                    else:
-                        if i < mJ[0, 0] - 1:
-                            Q[i, 0] = Ulw * math.pi * D * h * (Ta - T[i, 0]) / NL
-                        elif i >= mJ[0, 0] - 1 and i <= NL - 1:
-                            Q[i, 0] = Ulr * math.pi * D * h * (Tj - T[i, 0]) / NL
-                        elif i > NL - 1 and i <= mJ[1, 0] - 1:
-                            Q[i, 0] = Uvr * math.pi * D * (H - h) * (Tj - T[i, 0]) / NV
-                        else:
-                            Q[i, 0] = Uvr * math.pi * D * (H - h) * (Ta - T[i, 0]) / NV
-                else:
-                    if i >= mJ[0, 0] - 1 and i <= mJ[1, 0] - 1:
-                        Q[i, 0] = Uvr * math.pi * D * (H - h) * (Tj - T[i, 0]) / NV
-                    elif i <= NL - 1:
-                        Q[i, 0] = Ulw * math.pi * D * h * (Ta - T[i, 0]) / NL
-                    else:
-                        Q[i, 0] = Uvw * math.pi * D * (H - h) * (Ta - T[i, 0]) / NV
-
-            # Heat Transfer across Disks
-            q[0, 0] = Ub * A * (Tb - T[0, 0]) - Ul * A * (T[0, 0] - T[1, 0])
-            q[1:NL - 1, 0] = Ul * A * (T[:NL - 2, 0] - T[1:NL - 1, 0]) - Ul * A * (T[1:NL - 1, 0] - T[2:NL, 0])
-            q[NL - 1, 0] = Ul * A * (T[NL - 2, 0] - T[NL - 1, 0]) - Ui * A * (T[NL - 1, 0] - T[NL, 0])
-            q[NL, 0] = Ui * A * (T[NL - 1, 0] - T[NL, 0]) - Uv * A * (T[NL, 0] - T[NL + 1, 0])
-            q[NL + 1:N - 1, 0] = Uv * A * (T[NL:N - 2, 0] - T[NL + 1:N - 1, 0]) - Uv * A * (
-                    T[NL + 1:N - 1, 0] - T[NL + 2:N, 0])
-            q[N - 1, 0] = Uv * A * (T[N - 2, 0] - T[N - 1, 0]) + Ur * A * (Tr - T[N - 1, 0])
-
-            ## Energy Balance
-            if F > 0 and S > 0:
-                for i in range(NL):
-                    if i == 0:
-                        dydt[i] = np.matmul(ff[i, :], fel[:, 0]) - sumg[i] * E[0, i] - np.maximum(wsq[i, 0], 0) * E[
-                            0, i] + \
-                                    np.maximum(wsq[i, 0] * -1, 0) * E[0, i + 1] + q[i, 0] + Q[i, 0]
-                    elif i == NL - 1:
-                        dydt[i] = np.matmul(ff[i, :], fel[:, 0]) - sumg[i] * E[0, i] + np.maximum(wsq[i - 1, 0], 0) * E[
-                            0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * -1, 0) * E[0, i] + sumc - sume + q[i, 0] + Q[i, 0]
-                    else:
-                        dydt[i] = np.matmul(ff[i, :], fel[:, 0]) - sumg[i] * E[0, i] + np.maximum(wsq[i - 1, 0], 0) * E[
-                            0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * -1, 0) * E[0, i] - np.maximum(wsq[i, 0], 0) * E[
-                                        0, i] + np.maximum(wsq[i, 0] * (-1), 0) * E[0, i + 1] + \
-                                    q[i, 0] + Q[i, 0]
-
-            elif F == 0 and S > 0:
-                for i in range(NL):
-                    if i == 0:
-                        dydt[i] = -sumg[i] * E[0, i] - np.maximum(wsq[i, 0], 0) * E[0, i] + \
-                                    np.maximum(wsq[i, 0] * -1, 0) * E[0, i + 1] + q[i, 0] + Q[i, 0]
-                    elif i == NL - 1:
-                        dydt[i] = -sumg[i] * E[0, i] + np.maximum(wsq[i - 1, 0], 0) * E[0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * -1, 0) * E[0, i] + sumc - sume + q[i, 0] + Q[i, 0]
-                    else:
-                        dydt[i] = -sumg[i] * E[0, i] + np.maximum(wsq[i - 1, 0], 0) * E[0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * -1, 0) * E[0, i] - np.maximum(wsq[i, 0], 0) * E[0, i] \
-                                    + np.maximum(wsq[i, 0] * (-1), 0) * E[0, i + 1] + q[i, 0] + Q[i, 0]
-
-            elif F > 0 and S == 0:
-                for i in range(NL):
-                    if i == 0:
-                        dydt[i] = np.matmul(ff[i, :], fel[:, 0]) - np.maximum(wsq[i, 0], 0) * E[0, i] + \
-                                    np.maximum(wsq[i, 0] * -1, 0) * E[0, i + 1] + q[i, 0] + Q[i, 0]
-                    elif i == NL - 1:
-                        dydt[i] = np.matmul(ff[i, :], fel[:, 0]) + np.maximum(wsq[i - 1, 0], 0) * E[0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * -1, 0) * E[0, i] + sumc - sume + q[i, 0] + Q[i, 0]
-                    else:
-                        dydt[i] = np.matmul(ff[i, :], fel[:, 0]) + np.maximum(wsq[i - 1, 0], 0) * E[0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * -1, 0) * E[0, i] - np.maximum(wsq[i, 0], 0) * E[0, i] \
-                                    + np.maximum(wsq[i, 0] * (-1), 0) * E[0, i + 1] + q[i, 0] + Q[i, 0]
-
-            elif F == 0 and S == 0:
-                for i in range(NL):
-                    if i == 0:
-                        dydt[i] = - np.maximum(wsq[i, 0], 0) * E[0, i] + np.maximum(wsq[i, 0] * -1, 0) * E[0, i + 1]\
-                                    + q[i, 0] + Q[i, 0]
-                    elif i == NL - 1:
-                        dydt[i] = np.maximum(wsq[i - 1, 0], 0) * E[0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * -1, 0) * E[0, i] + sumc - sume + q[i, 0] + Q[i, 0]
-                    else:
-                        dydt[i] = np.maximum(wsq[i - 1, 0], 0) * E[0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * -1, 0) * E[0, i] - np.maximum(wsq[i, 0], 0) * E[0, i] \
-                                    + np.maximum(wsq[i, 0] * (-1), 0) * E[0, i + 1] + q[i, 0] + Q[i, 0]
-
-            dydt[:NL] = dydt[:NL] / (Lref * Tref)
-
-            if F > 0 and S > 0:
-                for i in range(NL, N):
-                    if i == NL:
-                        dydt[i] = np.matmul(ff[i, :], fev[:, 0]) - sumg[i] * E[0, i] - np.maximum(wsq[i, 0], 0) * E[
-                            0, i] + \
-                                    np.maximum(wsq[i, 0] * (-1), 0) * E[0, i + 1] + sume + sumc + q[i, 0] + Q[i, 0]
-                    elif i == N - 1:
-                        dydt[i] = np.matmul(ff[i, :], fev[:, 0]) - sumg[i] * E[0, i] + np.maximum(wsq[i - 1, 0], 0) * E[
-                            0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * (-1), 0) * E[0, i] + q[i, 0] + Q[i, 0]
-                    else:
-                        dydt[i] = np.matmul(ff[i, :], fev[:, 0]) - sumg[i] * E[0, i] + np.maximum(wsq[i - 1, 0], 0) * E[
-                            0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * (-1), 0) * E[0, i] - np.maximum(wsq[i, 0], 0) * E[0, i] + \
-                                    np.maximum(wsq[i, 0] * (-1), 0) * E[0, i + 1] + q[i, 0] + Q[i, 0]
-
-            elif F > 0 and S == 0:
-                for i in range(NL, N):
-                    if i == NL:
-                        dydt[i] = np.matmul(ff[i, :], fev[:, 0]) - np.maximum(wsq[i, 0], 0) * E[0, i] + \
-                                    np.maximum(wsq[i, 0] * (-1), 0) * E[0, i + 1] + sume + sumc + q[i, 0] + Q[i, 0]
-                    elif i == N - 1:
-                        dydt[i] = np.matmul(ff[i, :], fev[:, 0]) + np.maximum(wsq[i - 1, 0], 0) * E[0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * (-1), 0) * E[0, i] + q[i, 0] + Q[i, 0]
-                    else:
-                        dydt[i] = np.matmul(ff[i, :], fev[:, 0]) + np.maximum(wsq[i - 1, 0], 0) * E[0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * (-1), 0) * E[0, i] - np.maximum(wsq[i, 0], 0) * E[0, i] + \
-                                    np.maximum(wsq[i, 0] * (-1), 0) * E[0, i + 1] + q[i, 0] + Q[i, 0]
-
-            elif F == 0 and S > 0:
-                for i in range(NL, N):
-                    if i == NL:
-                        dydt[i] = -sumg[i] * E[0, i] - np.maximum(wsq[i, 0], 0) * E[0, i] + \
-                                    np.maximum(wsq[i, 0] * (-1), 0) * E[0, i + 1] + sume + sumc + q[i, 0] + Q[i, 0]
-                    elif i == N - 1:
-                        dydt[i] = -sumg[i] * E[0, i] + np.maximum(wsq[i - 1, 0], 0) * E[0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * (-1), 0) * E[0, i] + q[i, 0] + Q[i, 0]
-                    else:
-                        dydt[i] = -sumg[i] * E[0, i] + np.maximum(wsq[i - 1, 0], 0) * E[0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * (-1), 0) * E[0, i] - np.maximum(wsq[i, 0], 0) * E[0, i] + \
-                                    np.maximum(wsq[i, 0] * (-1), 0) * E[0, i + 1] + q[i, 0] + Q[i, 0]
-
-            elif F == 0 and S == 0:
-                for i in range(NL, N):
-                    if i == NL:
-                        dydt[i] = -np.maximum(wsq[i, 0], 0) * E[0, i] + \
-                                    np.maximum(wsq[i, 0] * (-1), 0) * E[0, i + 1] + sume + sumc + q[i, 0] + Q[i, 0]
-                    elif i == N - 1:
-                        dydt[i] = np.maximum(wsq[i - 1, 0], 0) * E[0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * (-1), 0) * E[0, i] + q[i, 0] + Q[i, 0]
-                    else:
-                        dydt[i] = np.maximum(wsq[i - 1, 0], 0) * E[0, i - 1] - \
-                                    np.maximum(wsq[i - 1, 0] * (-1), 0) * E[0, i] - np.maximum(wsq[i, 0], 0) * E[0, i] + \
-                                    np.maximum(wsq[i, 0] * (-1), 0) * E[0, i + 1] + q[i, 0] + Q[i, 0]
-
-            dydt[NL:N] = dydt[NL:N] / (Vref * Tref)
-
-            # Component Balance
-            num1 = int(N + (NL * I))
-            if F > 0 and S > 0:
-                for i in range(N, num1):
-                    i2 = i + 1
-                    n = int(1 + np.floor((i2 - 1 - N) / I))
-                    j = int(i2 - N - (n - 1) * I)
-                    if n == 1:
-                        dydt[i] = np.matmul(ff[n - 1, :], fl[:, j - 1]) - sumg[n - 1] * x[j - 1, n - 1] - np.maximum(
-                            wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n]
-                    elif n == NL:
-                        dydt[i] = np.matmul(ff[n - 1, :], fl[:, j - 1]) - sumg[n - 1] * x[j - 1, n - 1] - e[0][j - 1] + \
-                                    c[0][j - 1] + np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-                    else:
-                        dydt[i] = np.matmul(ff[n - 1, :], fl[:, j - 1]) - sumg[n - 1] * x[j - 1, n - 1] - np.maximum(
-                            wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n] + np.maximum(wsq[n - 2, 0], 0) * x[
-                                        j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-
-            elif F > 0 and S == 0:
-                for i in range(N, num1):
-                    i2 = i + 1
-                    n = int(1 + np.floor((i2 - 1 - N) / I))
-                    j = int(i2 - N - (n - 1) * I)
-                    if n == 1:
-                        dydt[i] = np.matmul(ff[n - 1, :], fl[:, j - 1]) - np.maximum(wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n]
-                    elif n == NL:
-                        dydt[i] = np.matmul(ff[n - 1, :], fl[:, j - 1]) - e[0][j - 1] + \
-                                    c[0][j - 1] + np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-                    else:
-                        dydt[i] = np.matmul(ff[n - 1, :], fl[:, j - 1]) - np.maximum(wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n] + \
-                                    np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-
-            elif F == 0 and S > 0:
-                for i in range(N, num1):
-                    i2 = i + 1
-                    n = int(1 + np.floor((i2 - 1 - N) / I))
-                    j = int(i2 - N - (n - 1) * I)
-                    if n == 1:
-                        dydt[i] = -sumg[n - 1] * x[j - 1, n - 1] - np.maximum(wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n]
-                    elif n == NL:
-                        dydt[i] = -sumg[n - 1] * x[j - 1, n - 1] - e[0][j - 1] + c[0][j - 1] + \
-                                    np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-                    else:
-                        dydt[i] = -sumg[n - 1] * x[j - 1, n - 1] - np.maximum(wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n] + \
-                                    np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-
-            elif F == 0 and S == 0:
-                for i in range(N, num1):
-                    i2 = i + 1
-                    n = int(1 + np.floor((i2 - 1 - N) / I))
-                    j = int(i2 - N - (n - 1) * I)
-                    if n == 1:
-                        dydt[i] = -np.maximum(wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n]
-                    elif n == NL:
-                        dydt[i] = -e[0][j - 1] + c[0][j - 1] + np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-                    else:
-                        dydt[i] = -np.maximum(wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n] + \
-                                    np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-
-            dydt[N:num1] = dydt[N:num1] / Lref
-
-            if F > 0 and S > 0:
-                for i in range(num1, NC):
-                    i2 = i + 1
-                    n = int(1 + np.floor((i2 - 1 - N) / I))
-                    j = int(i2 - N - (n - 1) * I)
-                    if n == NL + 1:
-                        dydt[i] = np.matmul(ff[n - 1, :], fv[:, j - 1]) - sumg[n - 1] * x[j - 1, n - 1] - np.maximum(
-                            wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n] + e[0][j - 1] - c[0][j - 1]
-                    elif n == N:
-                        dydt[i] = np.matmul(ff[n - 1, :], fv[:, j - 1]) - sumg[n - 1] * x[j - 1, n - 1] + np.maximum(
-                            wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-                    else:
-                        dydt[i] = np.matmul(ff[n - 1, :], fv[:, j - 1]) - sumg[n - 1] * x[j - 1, n - 1] - np.maximum(
-                            wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n] + np.maximum(wsq[n - 2, 0], 0) * x[
-                                        j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-
-            elif F > 0 and S == 0:
-                for i in range(num1, NC):
-                    i2 = i + 1
-                    n = int(1 + np.floor((i2 - 1 - N) / I))
-                    j = int(i2 - N - (n - 1) * I)
-                    if n == NL + 1:
-                        dydt[i] = np.matmul(ff[n - 1, :], fv[:, j - 1]) - np.maximum(wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n] + e[0][j - 1] - c[0][j - 1]
-                    elif n == N:
-                        dydt[i] = np.matmul(ff[n - 1, :], fv[:, j - 1]) + np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-                    else:
-                        dydt[i] = np.matmul(ff[n - 1, :], fv[:, j - 1]) - np.maximum(wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n] + \
-                                    np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-
-            elif F == 0 and S > 0:
-                for i in range(num1, NC):
-                    i2 = i + 1
-                    n = int(1 + np.floor((i2 - 1 - N) / I))
-                    j = int(i2 - N - (n - 1) * I)
-                    if n == NL + 1:
-                        dydt[i] = -sumg[n - 1] * x[j - 1, n - 1] - np.maximum(wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n] + e[0][j - 1] - c[0][j - 1]
-                    elif n == N:
-                        dydt[i] = -sumg[n - 1] * x[j - 1, n - 1] + np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-                    else:
-                        dydt[i] = -sumg[n - 1] * x[j - 1, n - 1] - np.maximum(wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n] + \
-                                    np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-
-            elif F == 0 and S == 0:
-                for i in range(num1, NC):
-                    i2 = i + 1
-                    n = int(1 + np.floor((i2 - 1 - N) / I))
-                    j = int(i2 - N - (n - 1) * I)
-                    if n == NL + 1:
-                        dydt[i] = -np.maximum(wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n] + e[0][j - 1] - c[0][j - 1]
-                    elif n == N:
-                        dydt[i] = np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-                    else:
-                        dydt[i] = -np.maximum(wsq[n - 1, 0], 0) * x[j - 1, n - 1] + \
-                                    np.maximum(wsq[n - 1, 0] * (-1), 0) * x[j - 1, n] + \
-                                    np.maximum(wsq[n - 2, 0], 0) * x[j - 1, n - 2] - \
-                                    np.maximum(wsq[n - 2, 0] * (-1), 0) * x[j - 1, n - 1]
-
-            dydt[num1:NC] = dydt[num1:NC] / Vref
-
-            ## Interdisk flows
-            dydt[NC:NC + NL - 1] = np.transpose(sumw[1:NL][np.newaxis]) / sumw[0] - rho[1:NL] / rho[0, 0]
-            dydt[NC + NL - 1:NE] = np.transpose(sumw[NL:N - 1][np.newaxis]) / sumw[N - 1] - rho[NL:N - 1] / rho[
-                N - 1, 0]
-
-            # ai = ai + 1
-            TE = np.matmul(sumw, np.transpose(E))[0]
-
-            return dydt
-
-        def f(t, u, du):
-            du_array = np.atleast_2d(du).T
-            M = mass(u)
-            rhs_du = tankfunc(u, t)
-            lhs_du = np.matmul(M, du_array)
-            resid = rhs_du - lhs_du
-            resid = resid.tolist()
-            resid = [x[0] for x in resid]
-            resid = np.array(resid)
-            return resid
-
+        ## One IDA run over the whole horizon. The solver is only re-initialised at the
+        ## intervals where the feed and product schedules change slope (or at every 5
+        ## minute interval with restarts="intervals").
         numberofIterations = int(self.numberofIterations/5)
-        for r in range(numberofIterations):
+        if self.restarts == "intervals":
+            breakpoints = list(range(numberofIterations))
+        else:
+            breakpoints = tankModel.breakpoints(numberofIterations)
+        if self.checkpointFile is not None:
+            # checkpoints are written at the end of a segment, so restart at each of them
+            every = self.checkpointInterval // 5
+            breakpoints = sorted(set(breakpoints) | set(range(0, numberofIterations, every)))
+        self.solverStatistics = {}  # IDA statistics summed over the restarts
+        self.jacobianErrors = []
+        if checkpoint is not None:
+            if not isinstance(checkpoint, dict):
+                checkpoint = load_checkpoint(checkpoint)
+            if checkpoint["u"].shape != (NE,):
+                raise ValueError(f"The checkpoint has {checkpoint['u'].shape[0]} variables, this tank {NE}. "
+                                 "Resume with the same numbers of disks and components.")
+            if self.sensitivityParameters:
+                raise ValueError("Sensitivities cannot be resumed from a checkpoint, they start at time 0.")
+            start = checkpoint["interval"]
+            if start > numberofIterations:
+                raise ValueError(f"The checkpoint is at {5 * start} min, after the running time of this tank.")
+            breakpoints = [start] * (start < numberofIterations) + [r for r in breakpoints if r > start]
+            self.solverStatistics = dict(checkpoint["statistics"])
+            self.jacobianErrors = list(checkpoint["jacobianErrors"])
+        self.breakpoints = breakpoints
+
+        # output times of self.outputGrid, interpolated by IDA (None: the solver steps)
+        times = output_grid(self.outputGrid, INTERVAL * numberofIterations)
+        capacity = 10 * numberofIterations if times is None else len(times)
+        trajectory = Trajectory(NE, capacity=capacity + 1)
+        if checkpoint is None:
+            trajectory.append([0.0], y0.reshape(1, -1))
+            yend = trajectory.y[-1]
+        else:
+            trajectory.append(checkpoint["t"], checkpoint["y"])
+            yend = checkpoint["u"]
+        if self.checkpointFile is not None:
+            writer = CheckpointWriter(self.checkpointFile, checkpoint)
+        # forward sensitivities (P x NE) of the state to the coefficients, zero at t = 0
+        names = self.sensitivityParameters
+        P = len(names)
+        if P:
+            p0 = tankModel.parameters(names)
+            sensitivities = Trajectory(P * NE, capacity=capacity + 1)
+            sensitivities.append([0.0], np.zeros((1, P * NE)))
+            Send = np.zeros((P, NE))
+        sim = None
+        for r, r_end in zip(breakpoints, breakpoints[1:] + [numberofIterations]):
             print(r+1)
-            Af = []
-            Bf = []
-            AZf = []
-            BZf = []
-            ATf = []
-            BTf = []
-            APf = []
-            BPf = []
-            if F > 0:
-                for i in range(F):
-                    Af.append(self.Af_dict['Af({})'.format(str(i + 1))]['Af({})'.format(str(i + 1))][r])
-                    Bf.append(self.Af_dict['Af({})'.format(str(i + 1))]['Bf({})'.format(str(i + 1))][r])
-                    AZ_df = self.AZ_dict['AZ({})'.format(str(i + 1))]
-                    AZf.append(AZ_df.iloc[r, :].values.tolist())
-                    BZ_df = self.BZ_dict['BZ({})'.format(str(i + 1))]
-                    BZf.append(BZ_df.iloc[r, :].values.tolist())
-                    ATf.append(self.Af_dict['Af({})'.format(str(i + 1))]['ATf({})'.format(str(i + 1))][r])
-                    BTf.append(self.Af_dict['Af({})'.format(str(i + 1))]['BTf({})'.format(str(i + 1))][r])
-                    APf.append(self.Af_dict['Af({})'.format(str(i + 1))]['APf({})'.format(str(i + 1))][r])
-                    BPf.append(self.Af_dict['Af({})'.format(str(i + 1))]['BPf({})'.format(str(i + 1))][r])
-
-            Ag = []
-            Bg = []
-            if S > 0:
-                for i in range(S):
-                    Ag.append(self.Ag_dict['Ag({})'.format(str(i + 1))]['Ag({})'.format(str(i + 1))][r])
-                    Bg.append(self.Ag_dict['Ag({})'.format(str(i + 1))]['Bg({})'.format(str(i + 1))][r])
-                    # Ag.append(self.Ag_dict['Ag({})'.format(str(i + 1))]['Ag({})'.format(str(i + 1))][0])
-                    # Bg.append(self.Ag_dict['Ag({})'.format(str(i + 1))]['Bg({})'.format(str(i + 1))][0])
-            p = np.ones((1, NE))
-            tspan = (0.0, 300.0)
-
-            if r == 0:
-                y0 = [y0[i, 0] for i in range(len(y0))]
+            tankModel.set_interval(r)
+            tstart = INTERVAL * r
+            dy0 = tankModel.consistent_derivative(yend, tstart)
+            if self.jacobian == "verify":
+                self.jacobianErrors.append(tankModel.check_jacobian(1.0, tstart, yend, dy0))
+
+            if sim is None:
+                sim = self._solver(tankModel, yend, dy0, tstart, names)
             else:
-                y0 = y[-1, :].reshape(1, -1)[0]
-
-            dy0 = np.matmul(np.linalg.pinv(mass(y0)), tankfunc(y0, 0))
-            dy0 = [dy0[i, 0] for i in range(len(dy0))]
-
-            nondiffEq = NE-8
-            abstol = self.abstol
-            reltol = self.reltol
-            differential_vars = np.append(np.ones((1, nondiffEq), dtype=bool), np.zeros((1, 8), dtype=bool))
-            differential_vars = [x for x in differential_vars]
-
-            model = Implicit_Problem(f, y0, dy0, 0)
-            sim = IDA(model)
-            sim.atol = abstol
-            sim.rtol = reltol
-            sim.algvar = differential_vars
-            tfinal = 300.0
-            ncp = 10
-            t2, y2, yd = sim.simulate(tfinal, ncp)
-
-            t2 = np.atleast_2d(t2).T
-
-            ## Feed Flash Calculations
-            if F > 0:
-                if r == 0:
-                    Fi = np.array(Fi).reshape(1, -1)
-                Af_term = Af + Bf * t2[1:]
-                Fi = np.append(Fi, Af_term, axis=0)
-
-                if r == 0:
-                    FT = np.array(FT).reshape(1, -1)
-                ATf_term = ATf + BTf * t2[1:]
-                FT = np.append(FT, ATf_term, axis=0)
-
-                if r == 0:
-                    FP = np.array(FP).reshape(1, -1)
-                APf_term = APf + BPf * t2[1:]
-                FP = np.append(FP, APf_term, axis=0)
-
-                if r == 0:
-                    dFz = np.zeros((F, len(t2), I))
-                    for j in range(F):
-                        for p in range(len(t2)):
-                            dFz[j, p, :] = AZf[j] + BZf[j] * t2[p]
-                else:
-                    dFz = np.zeros((F, len(t2) - 1, I))
-                    for j in range(F):
-                        for p in range(len(t2) - 1):
-                            dFz[j, p, :] = AZf[j] + BZf[j] * t2[p + 1]
-
-                dFz = np.transpose(dFz, (1, 0, 2))
-                if r == 0:
-                    Fz = dFz
-                else:
-                    Fz = np.append(Fz, dFz, axis=0)
-
-            if r == 0:
-                t = t2
-                y = y2
+                sim.re_init(tstart, yend, dy0)
+            tfinal = INTERVAL * r_end
+            if P:
+                sim.yS0 = Send  # IDA restarts the sensitivities from yS0 in every simulate
+            if times is None:
+                t2, y2, _ = sim.simulate(tfinal, 0)
             else:
-                t2 = t2[1:] + t[-1]
-                y2 = y2[1:, :]
-                t = np.append(t, t2, axis=0)
-                y = np.append(y, y2, axis=0)
-
-        try:
-            now2 = datetime.now()
-            current_time = now2.strftime("%H:%M:%S")
-            print("Done at", current_time)
-            ### for generatefun
-            self.t = t
-            self.y = y
-            self.N = N
-            self.Tref = Tref
-            self.NL = NL
-            self.NC = NC
-            self.NE = NE
-            self.Lref = Lref
-            self.Vref = Vref
-            self.I = I
-            self.A = A
-            self.MW = MW
-            self.NV = NV
-            self.Z = Z
-            self.R = R
-            self.g = g
-            self.Ul = Ul
-            self.Uv = Uv
-            self.sigma = sigma
-            if F > 0:
-                self.F = F
-                self.Fz = Fz
-                self.FP = FP
-                self.FT = FT
-                self.Fi = Fi
-            else:
-                self.F = 0
-            self.H = H
-            self.P0 = P0
-            self.S = S
-            self.ng = ng
-            self.generatefun()
-        except:
-            pass
+                # IDA appends tfinal, where the next segment restarts
+                segment = times[np.searchsorted(times, tstart + 1e-6, side="right"):
+                                np.searchsorted(times, tfinal - 1e-6)]
+                t2, y2, _ = sim.simulate(tfinal, ncp_list=list(segment) + [tfinal])
+            for key in sim.statistics.keys():
+                self.solverStatistics[key] = self.solverStatistics.get(key, 0) + sim.statistics[key]
+
+            # keep the requested output points after the ones already stored
+            t2 = np.asarray(t2, dtype=float).reshape(-1, 1)
+            y2 = np.asarray(y2)
+            yend = y2[-1]
+            new = t2[:, 0] > trajectory.t[-1, 0] + 1e-6
+            if times is not None:
+                k = np.minimum(np.searchsorted(times, t2[:, 0] - 1e-6), len(times) - 1)
+                new &= np.abs(times[k] - t2[:, 0]) < 1e-6
+            trajectory.append(t2[new], y2[new])
+            if P:
+                S2 = np.transpose(np.array(sim.p_sol), (1, 0, 2))  # times x P x NE
+                Send = S2[-1]
+                sensitivities.append(t2[new], S2[new].reshape(-1, P * NE))
+            if self.checkpointFile is not None and (r_end % every == 0 or r_end == numberofIterations):
+                writer.write(r_end, yend, trajectory.t, trajectory.y, self.solverStatistics, self.jacobianErrors)
+        t, y = trajectory.t, trajectory.y
+        if P:
+            tankModel.set_parameters(names, p0)
+            dg = np.array([tankModel.output_sensitivities(y[k], S.reshape(P, NE), names)
+                           for k, S in enumerate(sensitivities.y)])
+            ## d(output)/d(coefficient) at the output times (len(t) x P for each of SENSITIVITY_OUTPUTS)
+            self.sensitivities = {name: dg[:, j, :] for j, name in enumerate(SENSITIVITY_OUTPUTS)}
+            self.sensitivities["parameters"] = p0  # nominal values of the coefficients (units of the inputs)
+        else:
+            self.sensitivities = {}
+
+        ## Feed Flash Calculations
+        if F > 0:
+            Fi, FT, FP, Fz = tankModel.feed_conditions(t)
+
+        self.solverStatistics.update(tankModel.statistics)
+        if self.solverStatistics.get("nsteps"):
+            # one Jacobian-vector product per Krylov iteration
+            self.solverStatistics["linear iterations per step"] = \
+                self.solverStatistics.get("njacvecs", 0) / self.solverStatistics["nsteps"]
+        if self.jacobianErrors:
+            self.solverStatistics["Jacobian deviation"] = max(self.jacobianErrors)  # largest, jacobian="verify"
+        now2 = datetime.now()
+        current_time = now2.strftime("%H:%M:%S")
+        print("Done at", current_time)
+        ### for generatefun
+        self.t = t
+        self.y = y
+        self.N = N
+        self.Tref = Tref
+        self.NL = NL
+        self.NC = NC
+        self.NE = NE
+        self.Lref = Lref
+        self.Vref = Vref
+        self.I = I
+        self.A = A
+        self.MW = MW
+        self.NV = NV
+        self.Z = Z
+        self.R = R
+        self.g = g
+        self.Ul = Ul
+        self.Uv = Uv
+        if F > 0:
+            self.F = F
+            self.Fz = Fz
+            self.FP = FP
+            self.FT = FT
+            self.Fi = Fi
+        else:
+            self.F = 0
+        self.H = H
+        self.S = S
+        self.ng = ng
+        self.generatefun()
+        for key in counters:
+            self.solverStatistics[f"distribution {key}"] = distribution_counters[key] - counters[key]
 
     def generatefun(self):
         ### from analyse
@@ -1057,48 +581,21 @@ class Tank:
         g = self.g
         Ul = self.Ul
         Uv = self.Uv
-        sigma = self.sigma
         if F > 0:
             Fz = self.Fz
             FP = self.FP
             FT = self.FT
             Fi = self.Fi
         H = self.H
-        P0 = self.P0
         S = self.S
         ng = self.ng
 
-        def liq_prop(T):
-            E = np.zeros((len(T), I))
-            C = np.zeros((len(T), I))
-            LD = np.zeros((len(T), I))
-            for j in range(len(T)):
-                for i in range(I):
-                    component = importlib.import_module(self.componentList[i])
-                    if len(T) > 1:
-                        E[j, i] = component.liq_enthalpy(np.atleast_2d(T[j]).T)[0]
-                        C[j, i] = component.liq_heat_capacity(np.atleast_2d(T[j]).T)[0]
-                        LD[j, i] = component.density(T[j][0])
-                    elif len(T) == 1:
-                        E[j, i] = component.liq_enthalpy([T])[0]
-                        C[j, i] = component.liq_heat_capacity([T])[0]
-                        LD[j, i] = component.density(T[j])
-            return E, C, LD
-
-        def Vap_Pressure(T):
-            P_s = np.zeros((len(T), I))
-            for j in range(len(T)):
-                for i in range(I):
-                    component = importlib.import_module(self.componentList[i])
-                    P_s[j, i] = component.vapor_pressure(T[j])
-            return P_s
-        ModelF = importlib.import_module(self.ModelF)
-        ModelZg = importlib.import_module(self.ModelZg)
+        liq_prop = self.properties.liq_prop
+        Vap_Pressure = self.properties.vapor_pressure
         
         ## Results
         t = t / (24 * 3600)
         sy_m = len(y)
-        sy_n = len(y[0])
         T = y[:, :N] * Tref
         wsq = np.zeros((sy_m, N - 1))
         wsq[:, :NL - 1] = y[:, NC:NC + NL - 1] * 0.01 * Lref
@@ -1129,21 +626,10 @@ class Tank:
                 if i == 0:
                     h = (NL * sumw[:, i]) / A / rho[:, i]  # liquid level
                     Mw = 1 / np.sum(x[:, :, N - 1] / MW, axis=1)
-                    ## Zg and PV calculation
-                    Pg = P0
-                    for sy in range(sy_m):
-                        P1 = np.zeros((N - NL, 1))
-                        P1[:] = Pg
-                        T1 = np.array(T[sy, NL:N]).reshape(-1, 1)
-                        zf = x[sy, :, NL:N]  # 4 by 5 array
-                        zf = np.transpose(zf)  # 5 by 4 array
-                        AN = np.concatenate((zf, P1, T1), axis=1)
-                        BN = ModelZg.ModelZg(AN)
-                        BN = np.maximum(BN, 0)
-                        BN_list = BN.reshape(1, -1).tolist()[0]
-                        Z[sy, NL:N] = BN_list
-                        PV[sy] = (NV * Z[sy, N - 1] * R * T[sy, N - 1] * sumw[sy, N - 1]) / (A * (H - h[sy]) * Mw[sy])
-                        Pg = PV[sy]
+                    ## Zg and PV calculation, as in the residual of the model
+                    factor = NV * R * T[:, N - 1] * sumw[:, N - 1] / (A * (H - h) * Mw)
+                    zf = np.transpose(x[:, :, NL:N], (0, 2, 1))
+                    PV[:, 0], Z[:, NL:N] = self.tankModel.pressure(zf, T[:, NL:N], factor)
 
             else:
                 Mw = 1 / np.sum(x[:, :, i] / MW, axis=1)
@@ -1168,44 +654,23 @@ class Tank:
         X = (x[:, :, NL - 1] / MW) / (np.sum(x[:, :, NL - 1] / MW, axis=1).reshape(-1, 1))
         Y = (x[:, :, NL] / MW) / (np.sum(x[:, :, NL] / MW, axis=1).reshape(-1, 1))
         Ps = np.maximum(Vap_Pressure(T_I), 0)
-        K = np.maximum(Ps / PV.reshape(-1, 1), 1 * 10 ** (-6))
-        J = sigma * A * PV.reshape(-1, 1) * (np.minimum(K * X, 1) - Y) * np.sqrt(MW)
+        J = self.tankModel.evaporation_flux(Ps, PV.reshape(-1, 1), X, Y)[0]
         wsq[:, NL - 1] = np.sum(J, axis=1)
 
-        P2 = np.zeros((F, 1))
         if F > 0:
-            Fz = np.transpose(Fz, (1, 2, 0))
-            for i in range(sy_m):
-                P2[:, 0] = PV[i]
-                AN = np.concatenate((Fz[:, :, i], FP[i, :].reshape(-1, 1), P2, FT[i, :].reshape(-1, 1)), axis=1)
-                BN = np.maximum(ModelF.ModelF(AN), 0)
-                T2 = BN[:, 0]
-                vf = np.minimum(BN[:, 1:], Fz[:, :, i])
-                fv = vf * Fi[i, 0]
-                fl = Fi[i, 0] - fv
-                if i == 0:
-                    VFL = np.array([np.sum(fl, axis=0).sum()]).reshape(-1, 1)
-                    VFV = np.array([np.sum(fv, axis=0).sum()]).reshape(-1, 1)
-                    TF = T2.reshape(1, -1)
-                else:
-                    VFL = np.append(VFL, np.array([np.sum(fl, axis=0).sum()]).reshape(-1, 1), axis=0)
-                    VFV = np.append(VFV, np.array([np.sum(fv, axis=0).sum()]).reshape(-1, 1), axis=0)
-                    TF = np.append(TF, T2.reshape(1, -1), axis=0)
-
-            VF = VFV + wsq[:, NL - 1].reshape(-1,1)
+            # Feed flash at all output times at once, as in the residual (TankModel.feed_flash)
+            P_mf = np.array([self.tankModel.feed_pressure(h[j], P[j])[1] for j in range(sy_m)])
+            fv = self.tankModel.feed_vapor(Fi.reshape(-1), Fz.reshape(-1, I), FP.reshape(-1), FT.reshape(-1),
+                                           P_mf.reshape(-1))[1].reshape(sy_m, F, I)
+            VFV = fv.sum(axis=(1, 2)).reshape(-1, 1)
+            VF = self.tankModel.boil_off(wsq[:, NL - 1], fv).reshape(-1, 1)
 
         elif F == 0:
             VF = wsq[:, NL - 1].reshape(-1,1)
 
 
         ### Compositions for Plotting
-        for i in range(N):
-            if i == 0:
-                xc = x[:, :, i]
-                Wni = Wn[:, :, i]
-            else:
-                xc = np.append(xc, x[:, :, i], axis=1)
-                Wni = np.append(Wni, Wn[:, :, i], axis=1)
+        xc = np.transpose(x, (0, 2, 1)).reshape(sy_m, N * I)  # disk by disk
 
         Tl_avg = (T[:, :NL].sum(axis=1))/NL  # Average liquid temperature
         Tv_avg = (T[:, NL:N]).sum(axis=1)/NV  # Average vapour temperature
@@ -1220,45 +685,7 @@ class Tank:
         Ps = np.zeros((sy_m, S))
         xs = np.zeros((sy_m, I, S))
         for j in range(sy_m):
-            mg = np.zeros((S, 1))
-            for s in range(S):
-                if ng[s] > h[j]:
-                    mg[s] = np.round((ng[s]-h[j])/((H-h[j])/NV))+NL
-                else:
-                    mg[s] = np.maximum(np.round(ng[s]/(h[j]/NL)), 1)
-
-            pf = np.zeros((N, S))
-            for s in range(S):
-                if mg[s, 0] <= NL:
-                    xp = [i for i in range(int(mg[s, 0]))]
-                    ldf = poisson.pmf(xp, mu=1)
-                    xp = [i for i in range(NL - int(mg[s, 0]))]
-                    vdf = poisson.pmf(xp, mu=1)
-                    for i in range(N):
-                        if i <= mg[s, 0] - 1:
-                            pf[i, s] = ldf[int(mg[s, 0]) - i - 1]
-                        elif i > mg[s, 0] - 1 and i <= NL - 1:
-                            pf[i, s] = vdf[i - int(mg[s, 0])]
-                        else:
-                            pf[i, s] = 0
-
-                else:
-                    xp = [i for i in range(int(mg[s, 0]) - NL)]
-                    ldf = poisson.pmf(xp, mu=1)
-                    xp = [i for i in range(N - int(mg[s, 0] + 1))]
-                    vdf = poisson.pmf(xp, mu=1)
-                    for i in range(N):
-                        if i <= NL - 1:
-                            pf[i, s] = 0
-                        elif i > NL - 1 and i <= mg[s, 0] - 1:
-                            pf[i, s] = ldf[int(mg[s, 0]) - i - 1]
-                        else:
-                            pf[i, s] = vdf[i - int(mg[s, 0])]
-
-            pf[:NL, :] = pf[:NL, :] / pf[:NL, :].sum(axis=0)
-            pf[NL:N, :] = pf[NL:N, :] / pf[NL:N, :].sum(axis=0)
-            pf = np.maximum(pf, 0)
-            pf = np.nan_to_num(pf)
+            pf = self.tankModel.stream_distribution("product", ng, h[j])[0]
 
             Ts[j, :] = np.matmul(T[j, :], pf)
             Ps[j, :] = np.matmul(P[j, :], pf)
@@ -1309,6 +736,20 @@ class Tank:
             tick.set_fontsize(12)
         return fig
     
+    def plot_sensitivities(self, output):
+        # relative sensitivities p * d(output)/dp, comparable between the coefficients
+        fig, ax = plt.subplots(1, 1, dpi=100)
+        t = self.t * 24 * 60
+        for j, name in enumerate(self.sensitivityParameters):
+            ax.plot(t, self.sensitivities[output][:, j] * self.sensitivities["parameters"][j], label=name)
+        ax.minorticks_on()
+        ax.set_xlim(xmin=0)
+        ax.set_xlabel('Time (min)', fontsize=14)
+        ax.set_ylabel({"PV": "p dPV/dp (kPa)", "h": "p dh/dp (m)", "wsqN": "p dwsq/dp (kg/s)"}[output], fontsize=14)
+        ax.set_title(f'Sensitivity of {output}', fontsize=16)
+        ax.legend()
+        return fig
+
     def plot_liquid_level(self):
         t = self.t * 24 * 60
         fig, ax = plt.subplots(1, 1, dpi=100)
@@ -1499,6 +940,12 @@ class Tank:
         xs_data = np.hstack([self.xs[:,:,i] for i in range(self.S)])
         df = pd.DataFrame(columns=columnName, data=np.hstack([time,xs_data]))
         df.to_excel(writer, sheet_name="Product Composition",index=False)
+
+        if self.sensitivities:
+            columnName = ["Time (min)"] + [f"d({output})/d({name})" for output in SENSITIVITY_OUTPUTS for name in self.sensitivityParameters]
+            data = np.hstack([time] + [self.sensitivities[output] for output in SENSITIVITY_OUTPUTS])
+            df = pd.DataFrame(columns=columnName, data=data)
+            df.to_excel(writer, sheet_name="Sensitivities",index=False)
         writer.close()
 
         return output
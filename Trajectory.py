@@ -0,0 +1,84 @@
+### Storage for the output of Tank.run_simulation: output times and states in
+### preallocated NumPy buffers. The buffers are sized from the simulation horizon and
+### output density and grow geometrically if more rows arrive, so that appending a
+### segment of the integration only copies the new rows.
+### The output times are set by an output grid (output_grid): a uniform spacing, explicit
+### output times or the steps of the solver. IDA interpolates its solution to the
+### output times, so they do not change the steps it takes.
+
+import numbers
+import numpy as np
+
+OUTPUT_STEPS = "steps"
+
+def output_grid(outputGrid, horizon):
+    """
+    Returns the output times (s, sorted, in (0, horizon]) of the output grid outputGrid:
+    a spacing in minutes, a sequence of output times in minutes, or "steps" for the steps
+    of the solver (returns None). horizon is the simulated time (s).
+    """
+    if isinstance(outputGrid, str):
+        if outputGrid != OUTPUT_STEPS:
+            raise ValueError(f"Unknown output grid {outputGrid}. Give a spacing (min), output times (min) "
+                             f"or \"{OUTPUT_STEPS}\".")
+        return None
+    if isinstance(outputGrid, numbers.Real):
+        if not 0 < 60 * outputGrid <= horizon + 1e-6:
+            raise ValueError(f"The output spacing must lie between 0 and {horizon / 60:g} min, got {outputGrid}.")
+        return np.arange(1, int(np.floor(horizon / (60 * outputGrid) + 1e-9)) + 1) * 60.0 * outputGrid
+    times = np.unique(np.asarray(outputGrid, dtype=float).reshape(-1)) * 60
+    if len(times) == 0 or times[-1] <= 0 or times[0] < 0 or times[-1] > horizon + 1e-6:
+        raise ValueError(f"The output times must lie between 0 and {horizon / 60:g} min.")
+    return times[times > 0]
+
+class Trajectory:
+    """
+    Output times (n x 1) and rows (n x width) of a simulation. capacity is the expected
+    number of rows; if it is exceeded the buffers grow by the factor GROWTH, so that
+    appending n rows in segments costs O(n) time instead of the O(n^2) of np.append.
+    t and y are views of the filled part of the buffers.
+    """
+    GROWTH = 1.5
+
+    def __init__(self, width, capacity=1024, dtype=float):
+        capacity = max(int(capacity), 1)
+        self.n = 0
+        self._t = np.empty((capacity, 1))
+        self._y = np.empty((capacity, width), dtype=dtype)
+
+    def append(self, t, y):
+        """
+        Appends the output times t (length k, may be 0) and the rows y (k x width).
+        """
+        t = np.asarray(t, dtype=float).reshape(-1, 1)
+        y = np.asarray(y).reshape(len(t), self._y.shape[1])
+        end = self.n + len(t)
+        if end > len(self._t):
+            self.reserve(max(end, int(len(self._t) * self.GROWTH) + 1))
+        self._t[self.n:end] = t
+        self._y[self.n:end] = y
+        self.n = end
+
+    def reserve(self, capacity):
+        """
+        Grows the buffers to capacity rows, keeping the rows stored so far.
+        """
+        if capacity <= len(self._t):
+            return
+        t = np.empty((capacity, 1))
+        y = np.empty((capacity, self._y.shape[1]), dtype=self._y.dtype)
+        t[:self.n] = self._t[:self.n]
+        y[:self.n] = self._y[:self.n]
+        self._t, self._y = t, y
+
+    @property
+    def t(self):
+        return self._t[:self.n]
+
+    @property
+    def y(self):
+        return self._y[:self.n]
+
+    @property
+    def nbytes(self):
+        return self._t.nbytes + self._y.nbytes
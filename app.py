@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
 from Tank_v2 import Tank
+from TankModel import SENSITIVITY_PARAMETERS, SENSITIVITY_OUTPUTS, INITIAL_CONDITIONS
+from Calibration import Calibration, CALIBRATION_PARAMETERS, CALIBRATION_OUTPUTS, GRADIENTS, plot_fit
+from MonteCarlo import MC_PARAMETERS, MC_OUTPUTS, DISTRIBUTIONS, monte_carlo, plot_bands
+from neuralNetwork import jit
 from datetime import datetime
 import streamlit_ext as ste
 from io import BytesIO
@@ -111,6 +115,22 @@ with tab1:
     This tab defines the relative/absolute tolerances for the solver which solves the 
     system of Ordinary Differential Algebraic Equations (ODAEs). The running time
     is the simulation run time which is an integer and a multiple of 5 minutes.
+    The property evaluation can be switched from the component ANNs to cubic spline 
+    tables of the ANNs, which are built once per simulation and are faster for large
+    numbers of disks. The maximum deviation of the tables from the ANNs is reported.
+    The heat capacity is by default the heat capacity output of the ANNs. With
+    "derivative" it is the temperature derivative of the enthalpy ANN, which keeps it
+    consistent with the enthalpy, wherever that derivative is positive and close to
+    the heat capacity output.
+    If numba is installed, the ANNs and property polynomials can be evaluated with
+    compiled kernels. The first run compiles them, which takes a few seconds.
+    The smoothed residual replaces the rounding of the feed, product and jacket disks
+    and the flow and evaporation switches by continuous blends over the smoothing width,
+    which lets the solver take longer steps when the liquid level crosses a disk boundary.
+    For large numbers of disks the dense linear solver of IDA becomes the bottleneck;
+    the SPGMR solver solves the Newton systems iteratively instead. The experimental
+    preconditioned SPGMR applies a sparse LU of the Jacobian to the residual itself and
+    has not been compared with the dense solver yet.
 
     #### *Results* tab
     Press "Run Simulation" once all the inputs are completed. Please wait a few minutes
@@ -196,7 +216,8 @@ with tab3:
         st.image('tank.png')
     col1, col2 = st.columns(2)
     st.subheader("Disk Intital Conditions: Please download template and upload file")
-    st.caption("Component columns are in terms of mol fraction")
+    st.caption("Component columns are in terms of mol fraction. A table with other numbers of liquid and "
+               "vapour disks is interpolated over the height of each phase, e.g. to start a run with hundreds of disks.")
     with col1:
         noLDisks = st.number_input("Number of Liquid Disks:", value=5)
     with col2:
@@ -273,39 +294,181 @@ with tab5:
     ambTemp = st.number_input("Ambient Temperature (K):",value=298.0, min_value=0.0)
     roofTemp = st.number_input("Roof Temperature (K):",value=298.0, min_value=0.0)
     refridgeTemp = st.number_input("Refrigerant Temperature (K):",value=93.0, min_value=0.0)
+    monteCarlo = st.checkbox("Monte Carlo uncertainty of the coefficients")
+    if monteCarlo:
+        st.caption("""Spread is relative to the value above: the standard deviation of a normal distribution,
+            the standard deviation of the logarithm of a lognormal one, or the half width of a uniform or
+            triangular one. The pressure, liquid level and boil-off percentile bands are plotted in the
+            Results tab.""")
+        distributionTable = st.data_editor(pd.DataFrame({"Coefficient": MC_PARAMETERS,
+            "Distribution": ["lognormal"] + ["fixed"] * (len(MC_PARAMETERS) - 1),
+            "Spread": [0.3] + [0.2] * (len(MC_PARAMETERS) - 1)}), hide_index=True, disabled=["Coefficient"],
+            column_config={"Distribution": st.column_config.SelectboxColumn(options=DISTRIBUTIONS, required=True),
+                           "Spread": st.column_config.NumberColumn(min_value=0.0, format="%.3f", required=True)})
+        mcSamples = st.number_input("Number of Samples:", value=50, min_value=2, step=10)
+        mcWorkers = st.number_input("Worker Processes:", value=os.cpu_count(), min_value=1)
+    calibrate = st.checkbox("Calibrate the coefficients to plant data")
+    if calibrate:
+        st.caption("""Measurements: an Excel or csv file with the columns Time (min) (from the start of the
+            simulation), Pressure (kPa) and/or h (m). The coefficients above are the initial values, the fit
+            and the fitted values are shown in the Results tab.""")
+        uploaded_measurements_file = st.file_uploader("Upload plant measurements here.", type=["xlsx", "csv"])
+        calibrationParameters = st.multiselect("Coefficients to fit:", SENSITIVITY_PARAMETERS,
+                                               default=CALIBRATION_PARAMETERS)
+        calibrationGradient = st.selectbox("Gradients:", GRADIENTS,
+            format_func=lambda x: {"sensitivities": "IDA sensitivities", "finite-difference": "Parallel finite differences"}[x])
+        calibrationWorkers = None
+        if calibrationGradient == "finite-difference":
+            calibrationWorkers = st.number_input("Worker Processes:", value=os.cpu_count(), min_value=1,
+                                                 key="calibrationWorkers")
+        calibrationEvaluations = st.number_input("Maximum Simulations:", value=50, min_value=2, step=10)
 
 with tab6:
     abstol = st.number_input("Absolute DAE Solver Tolerance:",value=0.01, min_value=0.0, max_value=1.0)
     reltol = st.number_input("Relative DAE Solver Tolerance:", format="%.4f",value=0.0001, min_value=0.0, max_value=1.0)
     numberofIterations = st.number_input("Running Time (min):",value=40,step=5)
+    propertyMode = st.selectbox("Property Evaluation:", ["network", "tabulated"],
+        format_func=lambda x: {"network": "ANN (exact)", "tabulated": "Tabulated (cubic spline of ANN)"}[x])
+    heatCapacity = st.selectbox("Heat Capacity:", ["network", "derivative"],
+        format_func=lambda x: {"network": "Heat capacity ANN",
+                               "derivative": "dH/dT of enthalpy ANN (heat capacity ANN where not valid)"}[x])
+    backend = st.selectbox("Computation Backend:", ["numpy", "numba"],
+        format_func=lambda x: {"numpy": "NumPy", "numba": "Compiled (numba)"}[x])
+    if backend == "numba" and not jit.NUMBA_AVAILABLE:
+        st.warning("numba is not installed, the NumPy backend will be used.")
+    jacobian = st.selectbox("Jacobian:", ["structured", "finite-difference", "verify"],
+        format_func=lambda x: {"structured": "Structured (sparsity pattern)", "finite-difference": "Finite differences (IDA)",
+                               "verify": "Structured, checked against finite differences"}[x])
+    linearSolver = st.selectbox("Linear Solver:", ["dense", "spgmr", "spgmr-experimental"],
+        format_func=lambda x: {"dense": "Dense (direct)", "spgmr": "SPGMR (Krylov, large disk counts)",
+                               "spgmr-experimental": "SPGMR, preconditioned residual (experimental)"}[x])
+    if linearSolver == "spgmr-experimental" and jacobian == "finite-difference":
+        st.warning("The experimental SPGMR preconditioner is built from the structured Jacobian, please select it.")
+    residual = st.selectbox("Residual:", ["exact", "smooth"],
+        format_func=lambda x: {"exact": "Exact (disk rounding and flux switches)", "smooth": "Smoothed switches"}[x])
+    smoothWidth = 0.1
+    if residual == "smooth":
+        smoothWidth = st.number_input("Smoothing Width:", format="%.3f", value=0.1, min_value=0.001)
+    output = st.selectbox("Output Points:", ["uniform", "times", "steps"],
+        format_func=lambda x: {"uniform": "Uniform spacing", "times": "Explicit output times", "steps": "Solver steps only"}[x])
+    if output == "uniform":
+        outputGrid = st.number_input("Output Spacing (min):", format="%.2f", value=0.5, min_value=0.01)
+    elif output == "times":
+        outputTimes = st.text_input("Output Times (min, comma separated):", value="5, 10, 20, 40")
+        try:
+            outputGrid = [float(x) for x in outputTimes.split(",") if x.strip()]
+        except ValueError:
+            st.error("The output times must be numbers separated by commas.")
+            st.stop()
+    else:
+        outputGrid = "steps"
+    initialConditions = st.selectbox("Initial Disk Temperatures:", INITIAL_CONDITIONS,
+        format_func=lambda x: {"table": "Uploaded table", "steady": "Steady state at the initial level"}[x])
+    sensitivities = st.multiselect("Sensitivities (of pressure, level and evaporation rate) to:", SENSITIVITY_PARAMETERS,
+        help="Forward sensitivities computed by IDA together with the simulation, shown in the Uncertainty tab of the results.")
     
     simulation_ran = st.button('Run simulation')
+    steady_ran = st.button('Solve steady state')
 
 
-    if simulation_ran:
+    if simulation_ran or steady_ran:
         if uploaded_input_file is None:
             st.error("Please upload feed flows")
             st.stop()
         if uploaded_initConditions_file is None:
             st.error("Please upload initial conditions")
             st.stop()
-        myTank = Tank(noFeedStreams, noProductStreams, tankDiameter, tankHeight, initialPressure, 
-            initialLiquidHeight, feeds, products, feed_product_df,
-            noComponents, molecular_weights, componentList, ModelF, ModelZg,
-            jacketStartValue, jacketEndValue, sigma, Ul,
-            Uv, Uvw, Ulw, Ur, Ub, Uvr, Ulr, groundTemp, ambTemp, roofTemp, refridgeTemp, 
-            noLDisks, noVDisks, abstol, reltol, numberofIterations, diskinitCombined)
+        tankConfig = dict(noFeedStreams=noFeedStreams, noProductStreams=noProductStreams, tankDiameter=tankDiameter,
+            tankHeight=tankHeight, initialPressure=initialPressure, initialLiquidHeight=initialLiquidHeight, feeds=feeds,
+            products=products, feed_product_df=feed_product_df, noComponents=noComponents,
+            molecular_weights=molecular_weights, componentList=componentList, ModelF=ModelF, ModelZg=ModelZg,
+            jacketStartValue=jacketStartValue, jacketEndValue=jacketEndValue, sigma=sigma, Ul=Ul, Uv=Uv, Uvw=Uvw,
+            Ulw=Ulw, Ur=Ur, Ub=Ub, Uvr=Uvr, Ulr=Ulr, groundTemp=groundTemp, ambTemp=ambTemp, roofTemp=roofTemp,
+            refridgeTemp=refridgeTemp, noLDisks=noLDisks, noVDisks=noVDisks, abstol=abstol, reltol=reltol,
+            numberofIterations=numberofIterations, diskinitCombined=diskinitCombined, propertyMode=propertyMode,
+            heatCapacity=heatCapacity, backend=backend, jacobian=jacobian, residual=residual,
+            smoothWidth=smoothWidth, linearSolver=linearSolver, outputGrid=outputGrid,
+            sensitivities=sensitivities, initialConditions=initialConditions)
+        try:
+            myTank = Tank(**tankConfig)
+        except ValueError as error:
+            st.error(str(error), icon="🚨")
+            st.stop()
         checkStatus = myTank.check_input()
         if checkStatus is not True:
             st.error(checkStatus, icon="🚨")
             st.stop()
+        if propertyMode == "tabulated":
+            st.write("Maximum deviation of the tabulated properties from the ANNs:")
+            st.dataframe(myTank.properties.error_report())
+
+    if steady_ran:
+        with st.spinner(text="Pre-processing data..."):
+            myTank.data_preprocessing()
+        with st.spinner(text="Solving the steady state..."):
+            try:
+                steady = myTank.steady_state()
+            except RuntimeError as error:
+                st.error(str(error), icon="🚨")
+                st.stop()
+        st.success(f"Steady state found in {steady['iterations']} Newton iterations ({steady['wall time (s)']:.1f} s).")
+        st.dataframe(pd.DataFrame({"Quantity": ["Boil-off (kg/s)", "Evaporation Rate (kg/s)", "Pressure (kPa)",
+                                                "Liquid Level (m)", "Interface Temperature (K)"],
+                                   "Value": [steady["boil-off (kg/s)"], steady["evaporation rate (kg/s)"],
+                                             steady["pressure (kPa)"], steady["liquid level (m)"],
+                                             steady["interface temperature (K)"]]}), hide_index=True)
+        st.dataframe(steady["disk conditions"], hide_index=True)
+        buf = BytesIO()
+        steady["disk conditions"].to_excel(buf, index=False)
+        ste.download_button("Download steady disk initial conditions here", data=buf.getvalue(),
+                            file_name="Steady Disk Initial Conditions.xlsx")
+
+    if simulation_ran:
         with st.spinner(text="Pre-processing data..."):
             myTank.data_preprocessing()
         with st.spinner(text="Running Simulation..."):
             myTank.run_simulation()
             st.success("Simulation completed. Please check results tab.")
+            if jacobian == "verify":
+                st.write(f"Largest deviation of the Jacobian from finite differences: {max(myTank.jacobianErrors):.2e}")
+            if linearSolver != "dense" and "linear iterations per step" in myTank.solverStatistics:
+                st.write(f"Linear (Krylov) iterations per step: {myTank.solverStatistics['linear iterations per step']:.2f}")
             st.session_state.submitted = True
             st.session_state.Tank = myTank
+            st.session_state.pop("monteCarlo", None)
+            st.session_state.pop("calibration", None)
+        if monteCarlo:
+            distributions = {row["Coefficient"]: (row["Distribution"], row["Spread"])
+                             for _, row in distributionTable.iterrows()}
+            progress = st.progress(0.0, text="Running Monte Carlo samples...")
+            try:
+                st.session_state.monteCarlo = monte_carlo(tankConfig, distributions, int(mcSamples), int(mcWorkers),
+                    callback=lambda done, total: progress.progress(done / total,
+                                                                   text=f"Monte Carlo sample {done} of {total} done"))
+            except (ValueError, RuntimeError) as error:
+                st.error(str(error), icon="🚨")
+                st.stop()
+            st.success("Monte Carlo ensemble completed. Please check the Uncertainty tab of the results.")
+        if calibrate:
+            if uploaded_measurements_file is None:
+                st.error("Please upload plant measurements")
+                st.stop()
+            if uploaded_measurements_file.name.endswith(".csv"):
+                measurements = pd.read_csv(uploaded_measurements_file)
+            else:
+                measurements = pd.read_excel(uploaded_measurements_file)
+            progress = st.progress(0.0, text="Calibrating...")
+            try:
+                calibration = Calibration(tankConfig, measurements, calibrationParameters, calibrationGradient,
+                                          calibrationWorkers and int(calibrationWorkers))
+                result = calibration.fit(max_evaluations=int(calibrationEvaluations),
+                    callback=lambda iteration, cost: progress.progress(min(iteration / int(calibrationEvaluations), 1.0),
+                                                                       text=f"Iteration {iteration}: cost {cost:.4g}"))
+            except (ValueError, RuntimeError) as error:
+                st.error(str(error), icon="🚨")
+                st.stop()
+            st.session_state.calibration = (result, calibration.comparison(result["parameters"]))
+            st.success("Calibration completed. Please check the Calibration tab of the results.")
 
     with tab7:
         if 'submitted' in st.session_state:
@@ -314,8 +477,9 @@ with tab6:
             current_time = now.strftime("%d-%m-%Y %H%M")
             nameResultsExcel = f"Results {current_time}.xlsx"
             ste.download_button("Download Results here", data=myTank.save_results(), file_name=nameResultsExcel)
-            tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs(["Pressure", "Liquid Level", 
-                "Temperature", "Vapor Flows", "Liquid Comp", "Vapor Comp", "Product Temp", "Product Pressure"])
+            tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, tab9, tab10 = st.tabs(["Pressure", "Liquid Level", 
+                "Temperature", "Vapor Flows", "Liquid Comp", "Vapor Comp", "Product Temp", "Product Pressure",
+                "Uncertainty", "Calibration"])
             
             with tab1:
                 fig = myTank.plot_pressure()
@@ -373,3 +537,32 @@ with tab6:
                 fig.savefig(buf, format='png', dpi=500, bbox_inches="tight")
                 byte_im = buf.getvalue()
                 ste.download_button("Download Figure here", data=byte_im, file_name="Product Pressure.png",mime="image/png")
+            with tab9:
+                if myTank.sensitivities:
+                    for name in SENSITIVITY_OUTPUTS:
+                        fig = myTank.plot_sensitivities(name)
+                        st.pyplot(fig)
+                if "monteCarlo" not in st.session_state:
+                    st.write("Select Monte Carlo uncertainty in the Heat Leak tab to compute percentile bands.")
+                else:
+                    t, bands, runs = st.session_state.monteCarlo
+                    failed = int((runs["status"] != "ok").sum())
+                    st.write(f"{len(runs) - failed} of {len(runs)} samples completed.")
+                    for name in MC_OUTPUTS:
+                        fig = plot_bands(t, bands, name)
+                        st.pyplot(fig)
+                    st.dataframe(runs)
+            with tab10:
+                if "calibration" not in st.session_state:
+                    st.write("Select the calibration to plant data in the Heat Leak tab to fit the coefficients.")
+                else:
+                    result, comparison = st.session_state.calibration
+                    st.write(f"{result['status']} Cost {result['initial cost']:.4g} to {result['cost']:.4g} in "
+                             f"{result['simulations']} simulations ({result['wall time (s)']:.0f} s).")
+                    st.dataframe(pd.DataFrame({"Coefficient": list(result["parameters"]),
+                                               "Fitted Value": list(result["parameters"].values())}), hide_index=True)
+                    for name in ["PV", "h"]:
+                        if f"Simulated {CALIBRATION_OUTPUTS[name]}" in comparison:
+                            fig = plot_fit(comparison, name)
+                            st.pyplot(fig)
+                    st.dataframe(result["history"])
@@ -0,0 +1,17 @@
+### Base case tank (the inputs of 1_Base_Case.py) for the benchmark scripts.
+
+from Tank_v2 import Tank
+from Sweep import BASE_CASE, load_config
+
+def base_case_tank(numberofIterations=40, noLDisks=5, noVDisks=5, **kwargs):
+    """
+    Returns a pre-processed Tank with the base case inputs (Sweep.BASE_CASE). For
+    noLDisks/noVDisks other than 5 the disk initial conditions are interpolated
+    (TankModel.disk_conditions). Keyword arguments override the
+    base case arguments of Tank.
+    """
+    config = load_config({**BASE_CASE, "numberofIterations": numberofIterations, "noLDisks": noLDisks,
+                          "noVDisks": noVDisks})
+    myTank = Tank(**{**config, **kwargs})
+    myTank.data_preprocessing()
+    return myTank
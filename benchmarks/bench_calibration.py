@@ -0,0 +1,44 @@
+### Calibration (Calibration.py) to synthetic plant data with IDA sensitivities and with
+### parallel finite differences.
+### Run from the repository root:  python -m benchmarks.bench_calibration [minutes] [workers]
+### Simulates the base case (default 40 minutes) with sigma and Ul changed by +40 % and
+### -25 %, adds noise of 0.01 kPa to the pressure and 0.1 mm to the level, and fits sigma
+### and Ul to it from the base case values. Prints the wall time, simulations, cache hits,
+### final cost and the fitted coefficients relative to the true ones for each gradient,
+### and the set-up time that the reuse of one pre-processed tank saves per simulation
+### (requires assimulo).
+
+import sys
+import timeit
+import numpy as np
+import pandas as pd
+from Sweep import BASE_CASE
+from Calibration import Calibration
+from benchmarks.base_case import base_case_tank
+
+TRUE = {"sigma": 1.4 * BASE_CASE["sigma"], "Ul": 0.75 * BASE_CASE["Ul"]}
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    start = timeit.default_timer()
+    plant = base_case_tank(minutes, outputGrid=1.0, **TRUE)
+    setup = timeit.default_timer() - start
+    plant.run_simulation()
+    rng = np.random.default_rng(0)
+    t = np.ravel(plant.t) * 24 * 60
+    measurements = pd.DataFrame({"Time (min)": t, "Pressure (kPa)": np.ravel(plant.PV) + rng.normal(0, 0.01, len(t)),
+                                 "h (m)": np.ravel(plant.h) + rng.normal(0, 1e-4, len(t))})
+    base = {**BASE_CASE, "numberofIterations": minutes}
+
+    print(f"{'gradient':>18}{'time (s)':>10}{'simulations':>13}{'cache hits':>12}{'cost':>10}"
+          + "".join(f"{name + ' / true':>14}" for name in TRUE))
+    for gradient in ["sensitivities", "finite-difference"]:
+        calibration = Calibration(base, measurements, list(TRUE), gradient, workers, scales={"PV": 0.01, "h": 1e-4})
+        result = calibration.fit()
+        print(f"{gradient:>18}{result['wall time (s)']:>10.1f}{result['simulations']:>13}{result['cache hits']:>12}"
+              f"{result['cost']:>10.3g}" + "".join(f"{result['parameters'][name] / TRUE[name]:>14.4f}" for name in TRUE))
+    print(f"\nset-up of the tank (once per calibration): {setup:.1f} s")
+
+if __name__ == "__main__":
+    main()
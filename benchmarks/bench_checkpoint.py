@@ -0,0 +1,47 @@
+### Checkpoints of run_simulation (Tank checkpointFile) and resuming from them.
+### Run from the repository root:  python -m benchmarks.bench_checkpoint [minutes] [checkpoint interval (min)]
+### Simulates the base case (default 1 day) without and with checkpoints (default every
+### 60 min, one file per checkpoint in a temporary directory), then resumes from the
+### checkpoint halfway and prints the wall times, the size of the checkpoint files and
+### of their output history file and the largest difference of the tank pressure of the
+### resumed run from the uninterrupted one (requires assimulo).
+
+import os
+import sys
+import glob
+import tempfile
+import timeit
+import numpy as np
+from Checkpoint import load_checkpoint
+from benchmarks.base_case import base_case_tank
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 24 * 60
+    interval = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "checkpoint_{minutes}.npz")
+        times = {}
+        for name, kwargs in [("no checkpoints", {}),
+                             ("checkpoints", {"checkpointFile": path, "checkpointInterval": interval})]:
+            myTank = base_case_tank(minutes, **kwargs)
+            start = timeit.default_timer()
+            myTank.run_simulation()
+            times[name] = timeit.default_timer() - start
+        files = sorted(glob.glob(os.path.join(directory, "*.npz")), key=os.path.getmtime)
+        sizes = [os.path.getsize(file) / 2 ** 20 for file in files]
+        history = os.path.getsize(load_checkpoint(files[-1])["lineage"][-1][0]) / 2 ** 20
+
+        halfway = interval * (minutes // (2 * interval))
+        resumed = base_case_tank(minutes, checkpointFile=os.path.join(directory, "resumed_{minutes}.npz"),
+                                 checkpointInterval=interval)
+        start = timeit.default_timer()
+        resumed.resume_from(path.format(minutes=halfway))
+        times[f"resume at {halfway} min"] = timeit.default_timer() - start
+
+    for name, elapsed in times.items():
+        print(f"{name:>22}{elapsed:>10.1f} s")
+    print(f"{len(files)} checkpoints, {sizes[0]:.3f} to {sizes[-1]:.3f} MB, output history {history:.2f} MB")
+    print(f"largest pressure difference of the resumed run: {np.max(np.abs(resumed.PV - myTank.PV)):.2e} kPa")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+### Feed and product distribution kernels built on every call (as tankfunc and generatefun
+### did) against the cache in TankModel.py (distribution/distribution_matrix).
+### Run from the repository root:  python -m benchmarks.bench_distributions
+### Part 1 times the distributions of 3 feeds and 3 products for 10, 50 and 200 disks.
+### Part 2 runs the 10 minute base case and prints the cache counters (requires assimulo).
+
+import importlib.util
+import timeit
+import numpy as np
+import TankModel
+from TankModel import feed_distribution, product_distribution, normalise_distribution, distribution_matrix
+
+def rebuilt(feeds, products, NL, N):
+    ff = np.zeros((N, len(feeds)))
+    for r, m in enumerate(feeds):
+        ff[:, r] = feed_distribution(m, NL, N)
+    pf = np.zeros((N, len(products)))
+    for s, m in enumerate(products):
+        pf[:, s] = product_distribution(m, NL, N)
+    return normalise_distribution(ff, NL), normalise_distribution(pf, NL)
+
+def cached(feeds, products, NL, N):
+    return distribution_matrix("feed", feeds, NL, N), distribution_matrix("product", products, NL, N)
+
+def main():
+    print(f"{'disks':>8}{'rebuilt (us)':>14}{'cached (us)':>14}{'max diff':>10}")
+    for N in [10, 50, 200]:
+        NL = N // 2
+        feeds, products = [N, N, NL // 2], [1, N, N]
+        diff = max(np.max(np.abs(a - b)) for a, b in zip(rebuilt(feeds, products, NL, N), cached(feeds, products, NL, N)))
+        t_rebuilt = min(timeit.repeat(lambda: rebuilt(feeds, products, NL, N), number=1000, repeat=5)) / 1000
+        t_cached = min(timeit.repeat(lambda: cached(feeds, products, NL, N), number=1000, repeat=5)) / 1000
+        print(f"{N:>8}{t_rebuilt * 1e6:>14.1f}{t_cached * 1e6:>14.1f}{diff:>10.1e}")
+
+    if importlib.util.find_spec("assimulo") is None:
+        print("\nassimulo is not installed, skipping the base case run.")
+        return
+    from benchmarks.base_case import base_case_tank
+    myTank = base_case_tank(10)
+    myTank.run_simulation()
+    hits, misses = myTank.solverStatistics["distribution hits"], myTank.solverStatistics["distribution misses"]
+    print(f"\n10 min base case (solver and post-processing): {hits} hits, {misses} misses, "
+          f"hit rate {hits / (hits + misses):.4f}; whole process {TankModel.distribution_hit_rate():.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+### Compares heat_capacity="derivative" (dH/dT of the enthalpy ANN) with "network"
+### (the heat capacity output of the ANN).
+### Run from the repository root:  python -m benchmarks.bench_heat_capacity
+### Part 1 reports how far the Cp output of each network is from the derivative of its
+### enthalpy output, the share of temperatures where "derivative" falls back to the Cp
+### output, and times the property calls of one residual evaluation.
+### Part 2 times a 10 minute base case simulation with each option (requires assimulo).
+
+import importlib.util
+import timeit
+import numpy as np
+from PropertyPackage import PropertyPackage
+from neuralNetwork.mlp import stacked_temperature_net_derivative
+from benchmarks.bench_property_modes import componentList, residual_property_calls
+
+def main():
+    derivative = PropertyPackage(componentList, heat_capacity="derivative")
+    network = PropertyPackage(componentList, heat_capacity="network")
+    T = np.linspace(104.0, 142.0, 381)
+    print("Cp_net / (dH/dT) over 104-142 K, share of the temperatures where \"derivative\" uses Cp_net")
+    print(f"{'component':<16}{'phase':<8}{'median':>10}{'min':>10}{'max':>10}{'fallback':>10}")
+    for phase, stack in [("liq_prop", network.liq_stack), ("vap_prop", network.vap_stack)]:
+        Cp = getattr(network, phase)(T)[1]
+        ratio = Cp / stacked_temperature_net_derivative(T, stack)[1]
+        fallback = np.isclose(getattr(derivative, phase)(T)[1], Cp, rtol=1e-12, atol=0)
+        for i, name in enumerate(componentList):
+            print(f"{name.split('.')[-1]:<16}{phase[:3]:<8}{np.median(ratio[:, i]):>10.3f}"
+                  f"{ratio[:, i].min():>10.3f}{ratio[:, i].max():>10.3f}{fallback[:, i].mean():>10.2f}")
+
+    print()
+    print(f"{'disks per phase':>16}{'network (us)':>16}{'derivative (us)':>16}")
+    for n in [5, 50, 200, 500]:
+        TL = np.linspace(112.5, 113.5, n)
+        TV = np.linspace(113.0, 118.0, n)
+        TI = np.array([113.2])
+        T2 = np.array([111.0, 111.5, 112.0])
+        times = [min(timeit.repeat(lambda: residual_property_calls(properties, TL, TV, TI, T2),
+                                   number=200, repeat=5)) / 200 * 1e6 for properties in [network, derivative]]
+        print(f"{n:>16}{times[0]:>16.1f}{times[1]:>16.1f}")
+
+    if importlib.util.find_spec("assimulo") is None:
+        print("\nassimulo is not installed, skipping the base case simulation timings.")
+        return
+    from benchmarks.base_case import base_case_tank
+    print()
+    for heatCapacity in ["network", "derivative"]:
+        myTank = base_case_tank(10, heatCapacity=heatCapacity)
+        start = timeit.default_timer()
+        myTank.run_simulation()
+        print(f"10 min base case, {heatCapacity}: {timeit.default_timer() - start:.2f} s, "
+              f"final pressure {myTank.PV[-1, 0]:.4f} kPa")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+### Structured (grouped finite difference) Jacobian of TankModel against the column by
+### column finite differences IDA does without a jac callback.
+### Run from the repository root:  python -m benchmarks.bench_jacobian
+### Part 1 counts the residual evaluations per Jacobian, times both and checks the
+### structured Jacobian against finite differences for 10, 50 and 200 disks. Part 2 runs
+### the 10 minute base case with both Jacobian modes and prints the solver statistics
+### (requires assimulo). The IDA statistics of part 2 are still to be measured: assimulo
+### could not be installed where the structured Jacobian was written.
+
+import importlib.util
+import timeit
+from benchmarks.bench_tank_model import model_at_start
+from benchmarks.base_case import base_case_tank
+
+def main():
+    print(f"{'disks':>8}{'NE':>6}{'residuals (fd)':>16}{'residuals (structured)':>24}"
+          f"{'fd (ms)':>10}{'structured (ms)':>17}{'max rel diff':>14}")
+    for N in [10, 50, 200]:
+        tankModel, u0, du = model_at_start(N)
+        groups = len(tankModel.jacobian_structure(tankModel.global_disks(u0)))
+        number = 1 if N == 200 else 5
+        t_fd = min(timeit.repeat(lambda: tankModel.finite_difference_jacobian(1.0, 0.0, u0, du),
+                                 number=number, repeat=3)) / number * 1e3
+        t_structured = min(timeit.repeat(lambda: tankModel.jacobian(1.0, 0.0, u0, du),
+                                         number=number, repeat=3)) / number * 1e3
+        error = tankModel.check_jacobian(1.0, 0.0, u0, du)
+        print(f"{N:>8}{tankModel.NE:>6}{tankModel.NE + 1:>16}{groups + 1:>24}"
+              f"{t_fd:>10.1f}{t_structured:>17.1f}{error:>14.1e}")
+
+    if importlib.util.find_spec("assimulo") is None:
+        print("\nassimulo is not installed, skipping the base case runs.")
+        return
+    print()
+    for mode in ["finite-difference", "structured"]:
+        myTank = base_case_tank(10, jacobian=mode)
+        start = timeit.default_timer()
+        myTank.run_simulation()
+        print(f"10 min base case, {mode} Jacobian: {timeit.default_timer() - start:.2f} s, "
+              f"final pressure {myTank.PV[-1, 0]:.4f} kPa")
+        print("   ", ", ".join(f"{key} {value}" for key, value in myTank.solverStatistics.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+### Compares the NumPy and numba backends (neuralNetwork/jit.py).
+### Run from the repository root:  python -m benchmarks.bench_jit
+### Part 1 times the network and property calls of one base case residual evaluation
+### (property calls of mass() and tankfunc() plus the ModelF feed flash) and at larger
+### disk counts. Part 2 times a 10 minute base case simulation with each backend
+### (requires assimulo).
+
+import importlib.util
+import timeit
+import numpy as np
+from neuralNetwork import jit
+from neuralNetwork.ModelF import ModelF
+from PropertyPackage import PropertyPackage
+from benchmarks.bench_property_modes import componentList, residual_property_calls
+
+def residual_calls(properties, TL, TV, TI, T2, AN):
+    residual_property_calls(properties, TL, TV, TI, T2)
+    ModelF(AN, properties.backend)
+
+def main():
+    if not jit.NUMBA_AVAILABLE:
+        print("numba is not installed, nothing to compare.")
+        return
+    AN = np.array([[0.95, 0.03, 0.01, 0.01, 200.0, 110.0, 115.0]] * 3)
+    times = {}
+    for backend in jit.BACKENDS:
+        start = timeit.default_timer()
+        properties = PropertyPackage(componentList, backend=backend)
+        residual_calls(properties, np.array([112.0]), np.array([113.0]), np.array([113.2]), np.array([111.0]), AN)
+        print(f"{backend}: first call (including compilation or loading the cache) "
+              f"{timeit.default_timer() - start:.2f} s")
+        times[backend] = {}
+        for n in [5, 50, 200, 500]:
+            TL = np.linspace(112.5, 113.5, n)
+            TV = np.linspace(113.0, 118.0, n)
+            TI = np.array([113.2])
+            T2 = np.array([111.0, 111.5, 112.0])
+            times[backend][n] = min(timeit.repeat(lambda: residual_calls(properties, TL, TV, TI, T2, AN),
+                                                  number=200, repeat=5)) / 200 * 1e6
+
+    print()
+    print(f"{'disks per phase':>16}{'numpy (us)':>16}{'numba (us)':>16}{'speed-up':>10}")
+    for n in times["numpy"]:
+        print(f"{n:>16}{times['numpy'][n]:>16.1f}{times['numba'][n]:>16.1f}"
+              f"{times['numpy'][n] / times['numba'][n]:>10.2f}")
+
+    if importlib.util.find_spec("assimulo") is None:
+        print("\nassimulo is not installed, skipping the base case simulation timings.")
+        return
+    from benchmarks.base_case import base_case_tank
+    print()
+    for backend in jit.BACKENDS:
+        myTank = base_case_tank(10, backend=backend)
+        start = timeit.default_timer()
+        myTank.run_simulation()
+        print(f"10 min base case, {backend}: {timeit.default_timer() - start:.2f} s, "
+              f"final pressure {myTank.PV[-1, 0]:.4f} kPa")
+
+if __name__ == "__main__":
+    main()
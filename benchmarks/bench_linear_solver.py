@@ -0,0 +1,45 @@
+### Dense, SPGMR and experimental preconditioned SPGMR linear solvers of IDA against the
+### number of disks.
+### Run from the repository root:  python -m benchmarks.bench_linear_solver [minutes] [disks per phase ...]
+### Simulates the base case (default 10 minutes) with 5, 25, 50, 100 and 200 disks per
+### phase with linearSolver="dense", "spgmr" and "spgmr-experimental", and prints the
+### wall time, IDA steps, Newton iterations, Krylov iterations per step, Jacobian
+### evaluations or preconditioner updates and the largest pressure difference from the
+### dense solver (requires assimulo).
+### The dense solver factorises the NE x NE iteration matrix (NE = N + N I + N - 2), so
+### SPGMR is expected to overtake it as N grows. This has not been measured with IDA:
+### the comparison needs assimulo (SUNDIALS), which could not be installed where the
+### solver option was written, so run it before relying on either solver for speed.
+
+import sys
+import timeit
+import numpy as np
+from benchmarks.base_case import base_case_tank
+
+def run(minutes, disks, linearSolver):
+    myTank = base_case_tank(minutes, noLDisks=disks, noVDisks=disks, linearSolver=linearSolver)
+    start = timeit.default_timer()
+    myTank.run_simulation()
+    return myTank, timeit.default_timer() - start
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    disks = [int(n) for n in sys.argv[2:]] or [5, 25, 50, 100, 200]
+    print(f"{'disks':>6}{'solver':>20}{'time (s)':>10}{'nsteps':>8}{'nniters':>9}{'lin/step':>10}"
+          f"{'updates':>9}{'dPV (kPa)':>11}")
+    for n in disks:
+        dense = None
+        for linearSolver in ["dense", "spgmr", "spgmr-experimental"]:
+            myTank, elapsed = run(minutes, n, linearSolver)
+            statistics = myTank.solverStatistics
+            updates = statistics["preconditioner updates"] if linearSolver != "dense" else statistics["jacobians"]
+            line = (f"{2 * n:>6}{linearSolver:>20}{elapsed:>10.1f}{statistics.get('nsteps', '-'):>8}"
+                    f"{statistics.get('nniters', '-'):>9}{statistics.get('linear iterations per step', 0):>10.2f}{updates:>9}")
+            if dense is None:
+                dense = myTank
+            elif len(myTank.t) == len(dense.t):
+                line += f"{np.max(np.abs(myTank.PV - dense.PV)):>11.2e}"
+            print(line)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+### Dense versus structured mass matrix (TankModel.mass_product and
+### TankModel.consistent_derivative) for the base case with 10, 50 and 200 disks.
+### Run from the repository root:  python -m benchmarks.bench_mass_matrix
+### Part 1 times the initial derivative computed at the start of every 5 minute segment,
+### pinv(mass(u0)) tankfunc(u0, 0) as before and the structured solve. Part 2 times the
+### residual with the dense matrix product and with the structured product.
+
+import timeit
+import numpy as np
+from benchmarks.bench_tank_model import model_at_start, per_second
+
+def main():
+    print(f"{'disks':>8}{'pinv (ms)':>12}{'structured (ms)':>18}{'saved per segment (ms)':>25}{'max rel diff':>15}")
+    models = {}
+    for N in [10, 50, 200]:
+        tankModel, u0, du = model_at_start(N)
+        models[N] = tankModel, u0, du
+        pinv = lambda: np.linalg.pinv(tankModel.mass(u0)) @ tankModel.tankfunc(u0, 0).reshape(-1)
+        structured = lambda: tankModel.consistent_derivative(u0, 0)
+        diff = np.max(np.abs(pinv() - structured()) / np.maximum(np.abs(structured()), 1e-12))
+        number = 5 if N == 200 else 20
+        t_pinv = min(timeit.repeat(pinv, number=number, repeat=3)) / number * 1e3
+        t_structured = min(timeit.repeat(structured, number=number, repeat=3)) / number * 1e3
+        print(f"{N:>8}{t_pinv:>12.2f}{t_structured:>18.2f}{t_pinv - t_structured:>25.2f}{diff:>15.1e}")
+
+    print()
+    print(f"{'disks':>8}{'dense residual (1/s)':>24}{'structured residual (1/s)':>28}")
+    for N, (tankModel, u0, du) in models.items():
+        dense = lambda: tankModel.tankfunc(u0, 0.0).reshape(-1) - tankModel.mass(u0) @ du
+        print(f"{N:>8}{per_second(dense):>24.0f}{per_second(lambda: tankModel.residual(0.0, u0, du)):>28.0f}")
+
+if __name__ == "__main__":
+    main()
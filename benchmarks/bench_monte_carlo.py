@@ -0,0 +1,64 @@
+### Percentile bands of Monte Carlo ensembles (MonteCarlo.py): streaming P-square
+### estimates against keeping all trajectories.
+### Run from the repository root:  python -m benchmarks.bench_monte_carlo [samples] [minutes]
+### Reduces synthetic ensembles of 100 to 10000 lognormal trajectories of 2881 output
+### times (one day at 30 s) and prints the memory of the estimator and of the stored
+### ensemble (tracemalloc peak) and the largest error of the P5/P50/P95 bands relative
+### to the band width. If assimulo is installed, a Monte Carlo ensemble of the base case
+### (default 8 samples of 10 minutes, sigma and Ul uncertain) is also run.
+
+import importlib.util
+import sys
+import timeit
+import tracemalloc
+import numpy as np
+from MonteCarlo import StreamingPercentiles, PERCENTILES
+
+TIMES = 2881
+
+def trajectories(samples, seed=0):
+    rng = np.random.default_rng(seed)
+    trend = np.linspace(0, 1, TIMES)
+    for _ in range(samples):
+        yield trend * rng.lognormal(0, 0.5) + 0.1 * rng.normal()
+
+def streaming(samples):
+    estimator = StreamingPercentiles(PERCENTILES)
+    for x in trajectories(samples):
+        estimator.add(x)
+    return estimator.percentiles()
+
+def stored(samples):
+    return np.percentile(np.array(list(trajectories(samples))), PERCENTILES, axis=0)
+
+def peak(func, samples):
+    tracemalloc.start()
+    result = func(samples)
+    memory = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, memory
+
+def main():
+    print(f"{'samples':>8}{'streaming (MB)':>16}{'stored (MB)':>13}{'band error':>12}")
+    for samples in [100, 1000, 10000]:
+        estimate, memory = peak(streaming, samples)
+        exact, memory_stored = peak(stored, samples)
+        error = np.max(np.abs(estimate - exact)) / np.max(exact[-1] - exact[0])
+        print(f"{samples:>8}{memory:>16.1f}{memory_stored:>13.1f}{error:>12.3f}")
+
+    if importlib.util.find_spec("assimulo") is None:
+        return
+    from Sweep import BASE_CASE
+    from MonteCarlo import monte_carlo
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    minutes = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    start = timeit.default_timer()
+    t, bands, runs = monte_carlo({**BASE_CASE, "numberofIterations": minutes},
+                                 {"sigma": ("lognormal", 0.3), "Ul": ("normal", 0.2)}, samples, seed=0)
+    print(f"\n{samples} base case samples of {minutes} min in {timeit.default_timer() - start:.1f} s, "
+          f"{int((runs['status'] != 'ok').sum())} failed")
+    for name, band in bands.items():
+        print(f"{name:>4} at {t[-1]:g} min: " + ", ".join(f"P{p} {value:.4g}" for p, value in zip(PERCENTILES, band[:, -1])))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+### Output grid of run_simulation (Tank outputGrid): uniform spacing, explicit output
+### times and the solver steps only.
+### Run from the repository root:  python -m benchmarks.bench_output_grid [minutes]
+### Simulates the base case (default 1 day) with output every 30 s (the former fixed
+### grid), every 60 min, at a few explicit times around the first restart (5 min) and at the
+### IDA steps, and prints the stored rows, IDA steps, residual evaluations, wall time and
+### memory of the stored trajectory (requires assimulo). IDA interpolates to the output
+### times, so the steps and residual evaluations do not depend on the grid.
+
+import sys
+import timeit
+from benchmarks.base_case import base_case_tank
+
+def run(minutes, outputGrid):
+    myTank = base_case_tank(minutes, outputGrid=outputGrid)
+    start = timeit.default_timer()
+    myTank.run_simulation()
+    return myTank, timeit.default_timer() - start
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 24 * 60
+    grids = {"30 s": 0.5, "60 min": min(60, minutes), "around 5 min": [4, 4.5, 5, 5.1, 5.25, 5.5, 6, minutes],
+             "steps": "steps"}
+    print(f"{'grid':>12}{'rows':>9}{'nsteps':>8}{'nfcns':>8}{'time (s)':>10}{'MB':>8}")
+    for name, outputGrid in grids.items():
+        myTank, elapsed = run(minutes, outputGrid)
+        statistics = myTank.solverStatistics
+        print(f"{name:>12}{len(myTank.t):>9}{statistics.get('nsteps', '-'):>8}{statistics.get('nfcns', '-'):>8}"
+              f"{elapsed:>10.1f}{myTank.y.nbytes / 2 ** 20:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+### Vapor pressure and compressibility in the residual of the DAE model (TankModel.py).
+### Run from the repository root:  python -m benchmarks.bench_pressure [minutes]
+### Part 1 evaluates the residual at the initial state, at a perturbed state and at the
+### initial state again, and prints the largest difference between the first and the
+### last evaluation (zero if the residual only depends on its arguments). Part 2 runs the
+### base case (default 60 minutes, requires assimulo) and prints the IDA step, Newton
+### iteration, error test failure and pressure iteration failure counts. Both parts are run with the ModelZg of the
+### base case (a constant) and with the pressure dependent virial ModelZg below, which
+### this module provides as a ModelZg module (ModelZg = "benchmarks.bench_pressure").
+### The script only uses the Tank and TankModel interfaces, so it can be run on older
+### revisions to compare the counts. The IDA counts before and after the pressure was
+### solved inside the residual are still to be measured: assimulo could not be
+### installed where that change was written, so only part 1 has been run.
+
+import importlib.util
+import sys
+import timeit
+import numpy as np
+from TankModel import TankModel
+from benchmarks.base_case import base_case_tank
+
+B = np.array([-0.30, -1.0, -2.0, -0.05])  # approximate second virial coefficients near 115 K (m3/kmol)
+
+def ModelZg(x):
+    """
+    Compressibility factor Z = 1 + B P / (R T) of the truncated virial equation, with B
+    mixed linearly in the mole fractions. x is Q x (I + 2): mole fractions, pressure
+    (kPa) and temperature (K). Returns Z of dimension Q x 1.
+    """
+    z, P, T = x[:, :-2], x[:, -2], x[:, -1]
+    return (1 + (z @ B[:z.shape[1]]) * P / (8.314 * T)).reshape(-1, 1)
+
+ZG_MODELS = {"constant": "neuralNetwork.ModelZg", "virial": "benchmarks.bench_pressure"}
+
+def base_case(minutes, zg):
+    myTank = base_case_tank(minutes)
+    myTank.ModelZg = ZG_MODELS[zg]
+    return myTank
+
+def reproducibility(zg):
+    tankModel = TankModel(base_case(5, zg))
+    tankModel.set_interval(0)
+    u0 = tankModel.initial_state().reshape(-1)
+    du = tankModel.consistent_derivative(u0, 0)
+    first = tankModel.residual(0.0, u0, du)
+    tankModel.residual(0.0, u0 * 1.01, du)
+    return np.max(np.abs(tankModel.residual(0.0, u0, du) - first))
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    print(f"{'ModelZg':>10}{'residual change':>18}")
+    for zg in ZG_MODELS:
+        print(f"{zg:>10}{reproducibility(zg):>18.3e}")
+
+    if importlib.util.find_spec("assimulo") is None:
+        print("\nassimulo is not installed, skipping the solver statistics.")
+        return
+    keys = ["nsteps", "nniters", "nnfails", "nerrfails", "nfcns", "njacs", "pressure failures"]
+    print(f"\n{minutes} min base case")
+    print(f"{'ModelZg':>10}" + "".join(f"{key:>{max(10, len(key) + 2)}}" for key in keys) + f"{'time (s)':>10}")
+    for zg in ZG_MODELS:
+        myTank = base_case(minutes, zg)
+        start = timeit.default_timer()
+        myTank.run_simulation()
+        elapsed = timeit.default_timer() - start
+        statistics = myTank.solverStatistics
+        print(f"{zg:>10}" + "".join(f"{statistics.get(key, '-'):>{max(10, len(key) + 2)}}" for key in keys)
+              + f"{elapsed:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+### Compares the "network" and "tabulated" property modes.
+### Run from the repository root:  python -m benchmarks.bench_property_modes
+### Part 1 times the property calls made by one residual evaluation of Tank.run_simulation
+### (mass() and tankfunc()) for the base case and for larger disk counts.
+### Part 2 times a 10 minute base case simulation in each mode (requires assimulo).
+
+import importlib.util
+import timeit
+import numpy as np
+from PropertyPackage import PropertyPackage
+
+componentList = ["components.Methane", "components.Ethane", "components.Propane", "components.Nitrogen"]
+
+def residual_property_calls(properties, TL, TV, TI, T2):
+    properties.liq_prop(TL)            # mass()
+    properties.vap_prop(TV)
+    properties.liq_prop(TL)            # tankfunc(): density and pressure
+    properties.liq_prop(TL)            # tankfunc(): enthalpies
+    properties.vap_prop(TV)
+    properties.vapor_pressure(TI)      # interface
+    properties.liq_prop(TI)
+    properties.vap_prop(TI)
+    properties.liq_prop(T2)            # feed flash
+    properties.vap_prop(T2)
+
+def main():
+    packages = {mode: PropertyPackage(componentList, mode=mode) for mode in ["network", "tabulated"]}
+    print(packages["tabulated"].error_report().to_string())
+    print()
+    print(f"{'disks per phase':>16}{'network (us)':>16}{'tabulated (us)':>16}{'speed-up':>10}")
+    for n in [5, 50, 200, 500]:
+        TL = np.linspace(112.5, 113.5, n)
+        TV = np.linspace(113.0, 118.0, n)
+        TI = np.array([113.2])
+        T2 = np.array([111.0, 111.5, 112.0])
+        times = {}
+        for mode, properties in packages.items():
+            number = 200
+            times[mode] = min(timeit.repeat(lambda: residual_property_calls(properties, TL, TV, TI, T2),
+                                            number=number, repeat=5)) / number * 1e6
+        print(f"{n:>16}{times['network']:>16.1f}{times['tabulated']:>16.1f}"
+              f"{times['network'] / times['tabulated']:>10.2f}")
+
+    if importlib.util.find_spec("assimulo") is None:
+        print("\nassimulo is not installed, skipping the base case simulation timings.")
+        return
+    from benchmarks.base_case import base_case_tank
+    print()
+    for mode in ["network", "tabulated"]:
+        myTank = base_case_tank(10, propertyMode=mode)
+        start = timeit.default_timer()
+        myTank.run_simulation()
+        print(f"10 min base case, {mode}: {timeit.default_timer() - start:.2f} s, "
+              f"final pressure {myTank.PV[-1, 0]:.4f} kPa")
+
+if __name__ == "__main__":
+    main()
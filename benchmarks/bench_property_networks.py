@@ -0,0 +1,35 @@
+### Micro-benchmark for the batched property networks.
+### Run from the repository root:  python -m benchmarks.bench_property_networks
+### The per-sample cost should stay flat (or fall) as the number of temperatures grows.
+
+import importlib
+import timeit
+import numpy as np
+
+componentList = ["components.Methane", "components.Ethane", "components.Propane",
+                 "components.Nitrogen", "components.Hydrogen"]
+functions = ["liq_enthalpy", "vap_enthalpy", "liq_heat_capacity", "vap_heat_capacity"]
+sizes = [1, 10, 100, 1000, 10000, 100000]
+
+def time_call(func, T):
+    number = max(1, int(20000 / len(T)))
+    best = min(timeit.repeat(lambda: func(T), number=number, repeat=5))
+    return best / number
+
+def main():
+    print(f"{'function':<40}" + "".join(f"{Q:>12}" for Q in sizes))
+    print(f"{'':<40}" + "".join(f"{'us/sample':>12}" for _ in sizes))
+    for name in componentList:
+        component = importlib.import_module(name)
+        for fname in functions:
+            func = getattr(component, fname)
+            row = []
+            for Q in sizes:
+                T = np.linspace(110.0, 140.0, Q).reshape(-1, 1)
+                if name.endswith("Hydrogen"):
+                    T = np.linspace(16.0, 32.0, Q).reshape(-1, 1)
+                row.append(time_call(func, T) / Q * 1e6)
+            print(f"{name.split('.')[-1] + '.' + fname:<40}" + "".join(f"{v:>12.3f}" for v in row))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+### Property calls and time per residual evaluation with the shared residual context of
+### TankModel (TankModel.context) against evaluating the mass matrix product and the
+### right hand side separately, each with its own state evaluation.
+### Run from the repository root:  python -m benchmarks.bench_residual_context
+
+from benchmarks.bench_tank_model import model_at_start, per_second
+
+def property_calls(tankModel, func, number=10):
+    calls = tankModel.properties.calls
+    before = dict(calls)
+    for _ in range(number):
+        func()
+    return ", ".join(f"{key} {(calls[key] - before[key]) / number:g}" for key in calls)
+
+def main():
+    for N in [10, 50, 200]:
+        tankModel, u0, du = model_at_start(N)
+        shared = lambda: tankModel.residual(0.0, u0, du)
+        separate = lambda: tankModel.tankfunc(u0, 0.0).reshape(-1) - tankModel.mass_product(u0, du)
+        print(f"{N} disks")
+        print(f"    shared context: {per_second(shared):6.0f} residuals/s, calls per residual: "
+              f"{property_calls(tankModel, shared)}")
+        print(f"    separate:       {per_second(separate):6.0f} residuals/s, calls per residual: "
+              f"{property_calls(tankModel, separate)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+### Wall-clock time of the base case with IDA re-initialised at every 5 minute interval
+### (restarts="intervals", as before) and only where the schedules change slope
+### (restarts="breakpoints"). Requires assimulo.
+### Run from the repository root:  python -m benchmarks.bench_restarts [minutes]
+### The default horizon is 24 hours (1440 minutes).
+### The wall-clock effect of restarting only at breakpoints is still to be measured: it
+### needs IDA, and assimulo could not be installed where restarts="breakpoints" was
+### written. No speed-up is claimed until this script has been run.
+
+import importlib.util
+import sys
+import timeit
+import numpy as np
+from benchmarks.base_case import base_case_tank
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 24 * 60
+    if importlib.util.find_spec("assimulo") is None:
+        print("assimulo is not installed, the restarts cannot be timed.")
+        return
+    results = {}
+    for restarts in ["intervals", "breakpoints"]:
+        myTank = base_case_tank(minutes, restarts=restarts)
+        start = timeit.default_timer()
+        myTank.run_simulation()
+        results[restarts] = myTank, timeit.default_timer() - start
+        print(f"{restarts:>12}: {results[restarts][1]:8.1f} s, {len(myTank.breakpoints)} IDA (re)starts, "
+              f"final pressure {myTank.PV[-1, 0]:.4f} kPa")
+        print(" " * 14 + ", ".join(f"{key} {value}" for key, value in myTank.solverStatistics.items()))
+    old, new = results["intervals"], results["breakpoints"]
+    print(f"wall-clock time breakpoints / intervals {new[1] / old[1]:.2f}, largest pressure difference "
+          f"{np.max(np.abs(old[0].PV - new[0].PV)):.2e} kPa")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+### Cost of the DAE model against the number of disks (5 to 500 per phase).
+### Run from the repository root:  python -m benchmarks.bench_scaling [max disks per phase to simulate]
+### Times one residual evaluation, the sparse Jacobian (TankModel.sparse_jacobian), its
+### dense copy for IDA, the column by column finite differences IDA computes without a
+### jac callback and one LU factorisation of the iteration matrix, dense (as in the
+### dense linear solver of IDA) and sparse (scipy splu), at the initial state of the base
+### case with a coarse disk table interpolated to each disk count. Only the assembly of
+### the Jacobian is structured: IDA factorises the dense copy, so a Jacobian update of
+### the dense solver costs "dense Jacobian" + "dense LU" with the structured Jacobian and
+### "finite-difference Jacobian" + "dense LU" without. If assimulo is
+### installed, a 10 minute base case is also simulated up to the given number of disks
+### per phase (default 100). The wall times are plotted against N in bench_scaling.png.
+
+import importlib.util
+import sys
+import timeit
+import numpy as np
+import scipy.linalg
+from scipy.sparse.linalg import splu
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from benchmarks.base_case import base_case_tank
+from benchmarks.bench_tank_model import model_at_start
+
+DISKS = [5, 25, 50, 100, 200, 500]
+
+def seconds(func, number=3):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+def main():
+    simulate_up_to = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    if importlib.util.find_spec("assimulo") is None:
+        simulate_up_to = 0
+    columns = ["residual", "sparse Jacobian", "dense Jacobian", "finite-difference Jacobian", "dense LU", "sparse LU",
+               "10 min run"]
+    times = {column: [] for column in columns}
+    print(f"{'disks':>6}{'NE':>7}{'nnz':>9}" + "".join(f"{column + ' (s)':>32}" for column in columns))
+    for n in DISKS:
+        tankModel, u0, du = model_at_start(2 * n)
+        J = tankModel.sparse_jacobian(1.0, 0.0, u0, du)
+        times["residual"].append(seconds(lambda: tankModel.residual(0.0, u0, du), 20))
+        times["sparse Jacobian"].append(seconds(lambda: tankModel.sparse_jacobian(1.0, 0.0, u0, du), 1))
+        times["dense Jacobian"].append(seconds(lambda: tankModel.jacobian(1.0, 0.0, u0, du), 1))
+        times["finite-difference Jacobian"].append(
+            seconds(lambda: tankModel.finite_difference_jacobian(1.0, 0.0, u0, du), 1))
+        dense = J.toarray()
+        times["dense LU"].append(seconds(lambda: scipy.linalg.lu_factor(dense), 1))
+        times["sparse LU"].append(seconds(lambda: splu(J), 1))
+        if n <= simulate_up_to:
+            myTank = base_case_tank(10, noLDisks=n, noVDisks=n)
+            times["10 min run"].append(seconds(myTank.run_simulation, 1))
+        else:
+            times["10 min run"].append(np.nan)
+        print(f"{2 * n:>6}{tankModel.NE:>7}{J.nnz:>9}" + "".join(f"{times[column][-1]:>32.2e}" for column in columns))
+
+    N = [2 * n for n in DISKS]
+    fig, ax = plt.subplots()
+    for column in columns:
+        if not np.all(np.isnan(times[column])):
+            ax.loglog(N, times[column], marker="o", label=column)
+    ax.set_xlabel("Number of disks N")
+    ax.set_ylabel("Wall time (s)")
+    ax.legend()
+    fig.savefig("bench_scaling.png", dpi=150)
+    print("\nSaved bench_scaling.png")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+### Forward sensitivities of IDA (Tank sensitivities) against finite differences of
+### perturbed runs.
+### Run from the repository root:  python -m benchmarks.bench_sensitivity [minutes] [parameters]
+### Simulates the base case (default 40 minutes) once with the sensitivities to the
+### given comma separated coefficients (default sigma,Ul,Uvw), and twice per coefficient
+### perturbed by +-0.1 % for central differences, then prints the wall times and the
+### largest difference of dPV/dp, dh/dp and d(wsqN)/dp relative to their largest value
+### (requires assimulo).
+
+import sys
+import timeit
+import numpy as np
+from TankModel import SENSITIVITY_OUTPUTS
+from benchmarks.base_case import base_case_tank
+
+def run(minutes, **kwargs):
+    myTank = base_case_tank(minutes, **kwargs)
+    start = timeit.default_timer()
+    myTank.run_simulation()
+    return myTank, timeit.default_timer() - start
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    names = sys.argv[2].split(",") if len(sys.argv) > 2 else ["sigma", "Ul", "Uvw"]
+    _, plain = run(minutes)
+    myTank, sensitivity = run(minutes, sensitivities=names)
+    differences = 0.0
+    errors = {}
+    for j, name in enumerate(names):
+        value = myTank.sensitivities["parameters"][j]
+        delta = 1e-3 * value
+        (up, elapsed_up), (down, elapsed_down) = [run(minutes, **{name: value + sign * delta}) for sign in [1, -1]]
+        differences += elapsed_up + elapsed_down
+        for output in SENSITIVITY_OUTPUTS:
+            fd = (np.ravel(getattr(up, output)) - np.ravel(getattr(down, output))) / (2 * delta)
+            scale = max(np.max(np.abs(fd)), np.finfo(float).tiny)
+            errors[name, output] = np.max(np.abs(myTank.sensitivities[output][:, j] - fd)) / scale
+
+    print(f"{'simulation only':>28}{plain:>10.1f} s")
+    print(f"{'with IDA sensitivities':>28}{sensitivity:>10.1f} s")
+    print(f"{f'{2 * len(names)} perturbed runs':>28}{differences:>10.1f} s")
+    print(f"\n{'parameter':>10}" + "".join(f"{output:>12}" for output in SENSITIVITY_OUTPUTS))
+    for name in names:
+        print(f"{name:>10}" + "".join(f"{errors[name, output]:>12.2e}" for output in SENSITIVITY_OUTPUTS))
+
+if __name__ == "__main__":
+    main()
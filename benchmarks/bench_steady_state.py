@@ -0,0 +1,32 @@
+### Direct steady state (Tank.steady_state, Newton's method) against integrating the
+### transient until the boil-off flattens.
+### Run from the repository root:  python -m benchmarks.bench_steady_state [minutes]
+### Solves the steady state of the base case, then simulates it (default 6 hours) from the
+### disk initial conditions of the table and from the steady state (initialConditions=
+### "steady"), and prints the wall times, the evaporation rate and pressure at the end of
+### each run and the largest change of the disk temperatures over the run started from
+### the steady state (requires assimulo). The transient runs also change the level and
+### the vapor holdup through the feeds and products, which the steady state keeps fixed.
+
+import sys
+import timeit
+import numpy as np
+from benchmarks.base_case import base_case_tank
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 6 * 60
+    steady = base_case_tank(minutes).steady_state()
+    print(f"{'steady state':>18}{steady['wall time (s)']:>10.2f} s  evaporation {steady['evaporation rate (kg/s)']:.4f} kg/s"
+          f"  pressure {steady['pressure (kPa)']:.2f} kPa  ({steady['iterations']} Newton iterations)")
+    for initialConditions in ["table", "steady"]:
+        myTank = base_case_tank(minutes, initialConditions=initialConditions)
+        start = timeit.default_timer()
+        myTank.run_simulation()
+        elapsed = timeit.default_timer() - start
+        print(f"{initialConditions + ' start':>18}{elapsed:>10.2f} s  evaporation {np.ravel(myTank.wsqN)[-1]:.4f} kg/s"
+              f"  pressure {np.ravel(myTank.PV)[-1]:.2f} kPa")
+    change = np.max(np.abs(myTank.T - steady["disk temperatures (K)"]), axis=0)
+    print("largest change of the disk temperatures from the steady state (K):", np.round(change, 3))
+
+if __name__ == "__main__":
+    main()
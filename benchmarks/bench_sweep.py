@@ -0,0 +1,31 @@
+### Throughput of the process-pool sweep (Sweep.py) against the number of workers.
+### Run from the repository root:  python -m benchmarks.bench_sweep [runs] [minutes]
+### Sweeps sigma over the given number of runs (default 8) of the base case (default
+### 10 minutes) with 1, 2, 4, ... workers up to the number of cores, and prints the wall
+### time, runs per minute and speedup over one worker (requires assimulo). The runs are
+### independent, so the speedup is limited by the cores and the start-up of the workers.
+
+import os
+import sys
+import timeit
+import numpy as np
+from Sweep import BASE_CASE, sweep
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    minutes = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    base = {**BASE_CASE, "numberofIterations": minutes}
+    variants = [{"sigma": sigma} for sigma in np.linspace(2.5e-9, 1e-8, runs)]
+    workers = [2 ** k for k in range(int(np.log2(os.cpu_count())) + 1)]
+    print(f"{'workers':>8}{'time (s)':>10}{'runs/min':>10}{'speedup':>9}{'failed':>8}")
+    serial = None
+    for n in workers:
+        start = timeit.default_timer()
+        table, summary = sweep(base, variants, n)
+        elapsed = timeit.default_timer() - start
+        serial = serial or elapsed
+        failed = int((summary["status"] != "ok").sum())
+        print(f"{n:>8}{elapsed:>10.1f}{60 * runs / elapsed:>10.2f}{serial / elapsed:>9.2f}{failed:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+### Residual evaluations per second of the DAE model (TankModel.py) for the base case
+### with 5 + 5, 25 + 25 and 100 + 100 disks.
+### Run from the repository root:  python -m benchmarks.bench_tank_model
+### Times tankfunc, mass and the full residual tankfunc(u, t) - mass(u) du at the initial
+### state with the forcing of the first 5 minute interval. No solver is run, so
+### assimulo is not needed.
+
+import timeit
+from TankModel import TankModel
+from benchmarks.base_case import base_case_tank
+
+def model_at_start(N, **kwargs):
+    """
+    Returns the TankModel of the base case tank with N disks (half liquid), the initial
+    state and a state derivative to evaluate the residual with.
+    """
+    tankModel = TankModel(base_case_tank(5, noLDisks=N // 2, noVDisks=N - N // 2, **kwargs))
+    tankModel.set_interval(0)
+    u0 = tankModel.initial_state().reshape(-1)
+    du = tankModel.consistent_derivative(u0, 0)
+    return tankModel, u0, du
+
+def per_second(func, number=50):
+    return number / min(timeit.repeat(func, number=number, repeat=5))
+
+def main():
+    print(f"{'disks':>8}{'tankfunc (1/s)':>18}{'mass (1/s)':>14}{'residual (1/s)':>18}")
+    for N in [10, 50, 200]:
+        tankModel, u0, du = model_at_start(N)
+        residual = lambda: tankModel.residual(0.0, u0, du)
+        print(f"{N:>8}{per_second(lambda: tankModel.tankfunc(u0, 0.0)):>18.0f}"
+              f"{per_second(lambda: tankModel.mass(u0)):>14.0f}{per_second(residual):>18.0f}")
+
+if __name__ == "__main__":
+    main()
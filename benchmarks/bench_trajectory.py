@@ -0,0 +1,57 @@
+### Storing the output of run_simulation: np.append per segment against the
+### preallocated buffers of Trajectory.py, for 1, 7 and 30 day runs.
+### Run from the repository root:  python -m benchmarks.bench_trajectory
+### Appends the 10 output points of each 5 minute segment (the worst case of
+### restarts="intervals") of width NE (base case and 100 + 100 disks), and prints the
+### wall time and the peak memory allocated while storing (tracemalloc).
+
+import timeit
+import tracemalloc
+import numpy as np
+from Trajectory import Trajectory
+
+SEGMENT = 10  # output points per 5 minute segment
+
+def store_append(segments, width):
+    t = np.zeros((1, 1))
+    y = np.zeros((1, width))
+    t2 = np.zeros((SEGMENT, 1))
+    y2 = np.zeros((SEGMENT, width))
+    for _ in range(segments):
+        t = np.append(t, t2, axis=0)
+        y = np.append(y, y2, axis=0)
+    return t, y
+
+def store_trajectory(segments, width):
+    trajectory = Trajectory(width, capacity=SEGMENT * segments + 1)
+    trajectory.append([0.0], np.zeros((1, width)))
+    t2 = np.zeros((SEGMENT, 1))
+    y2 = np.zeros((SEGMENT, width))
+    for _ in range(segments):
+        trajectory.append(t2, y2)
+    return trajectory.t, trajectory.y
+
+def measure(store, segments, width):
+    tracemalloc.start()
+    start = timeit.default_timer()
+    store(segments, width)
+    elapsed = timeit.default_timer() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+def main():
+    print(f"{'days':>5}{'NE':>6}{'rows':>9}{'append (s)':>12}{'append (MB)':>13}"
+          f"{'buffer (s)':>12}{'buffer (MB)':>13}")
+    for NE in [58, 1198]:
+        for days in [1, 7, 30]:
+            segments = days * 24 * 12
+            if NE > 100 and days == 30:
+                continue  # about 20 minutes with np.append
+            append = measure(store_append, segments, NE)
+            buffer = measure(store_trajectory, segments, NE)
+            print(f"{days:>5}{NE:>6}{SEGMENT * segments + 1:>9}{append[0]:>12.2f}{append[1]:>13.1f}"
+                  f"{buffer[0]:>12.2f}{buffer[1]:>13.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+### Stepwise digital twin (Tank.advance) fed with streaming plant inputs.
+### Run from the repository root:  python -m benchmarks.bench_twin [minutes] [dt]
+### Streams the feeds and products of the base case schedule (default 60 minutes) to
+### the twin every dt seconds (default 60), once as they are and once with 1 % noise on
+### the feed flows (a restart of IDA at every step), and prints the latency of the
+### first call (set-up), the mean and largest latency of the later calls relative to
+### dt, the restarts and IDA steps, and the pressure and level at the end against one
+### run_simulation of the schedule (requires assimulo).
+
+import sys
+import timeit
+import numpy as np
+from TankModel import INTERVAL
+from benchmarks.base_case import base_case_tank
+
+def measurements(tankModel, t, rng=None):
+    """
+    Returns the feed and product inputs of the schedule of tankModel at time t (s), with
+    1 % noise on the feed flows if rng is given.
+    """
+    Fi, FT, FP, Fz = [x[0] for x in tankModel.feed_conditions(t)]
+    if rng is not None:
+        Fi = Fi * (1 + 0.01 * rng.standard_normal(len(Fi)))
+    feeds = {j + 1: {"flow": Fi[j], "temperature": FT[j], "pressure": FP[j], "composition": Fz[j]}
+             for j in range(len(Fi))}
+    r = min(int(t // INTERVAL), len(tankModel.schedule()["Ag"]) - 1)
+    products = {j + 1: flow for j, flow in enumerate(tankModel.schedule()["Ag"][r])}
+    return feeds, products
+
+def stream(minutes, dt, rng=None):
+    myTank = base_case_tank(minutes)
+    latencies, restarts, steps = [], 0, 0
+    for k in range(int(60 * minutes / dt)):
+        inputs = measurements(myTank.twin["model"], k * dt, rng) if myTank.twin is not None else (None, None)
+        state = myTank.advance(dt, *inputs)
+        latencies.append(state["wall time (s)"])
+        restarts += state["restarted"]
+        steps += state["steps"]
+    return state, np.array(latencies), restarts, steps
+
+def main():
+    minutes = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    dt = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+    batch = base_case_tank(minutes, outputGrid=[minutes])
+    start = timeit.default_timer()
+    batch.run_simulation()
+    elapsed = timeit.default_timer() - start
+
+    print(f"run_simulation of {minutes} min: {elapsed:.1f} s, PV {np.ravel(batch.PV)[-1]:.4f} kPa, "
+          f"h {np.ravel(batch.h)[-1]:.5f} m\n")
+    print(f"{'inputs':>10}{'set-up (s)':>12}{'mean / dt':>11}{'max / dt':>10}{'restarts':>10}{'steps':>8}"
+          f"{'PV (kPa)':>11}{'h (m)':>10}")
+    for name, rng in [("schedule", None), ("noisy", np.random.default_rng(0))]:
+        state, latencies, restarts, steps = stream(minutes, dt, rng)
+        print(f"{name:>10}{latencies[0]:>12.2f}{latencies[1:].mean() / dt:>11.2e}{latencies[1:].max() / dt:>10.2e}"
+              f"{restarts:>10}{steps:>8}{state['pressure (kPa)']:>11.4f}{state['liquid level (m)']:>10.5f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+### Import-time and per-call benchmarks for the .npz weight store.
+### Run from the repository root:  python -m benchmarks.bench_weight_store
+### Part 1 times a fresh import of the modules that load networks from the store.
+### Part 2 compares reading each weight file with building the same arrays from python
+### list literals, which ModelF and the CL/CV/EL/EV modules used to do on every call.
+### Part 3 times ModelF for the base case feed flash (3 feeds) with both.
+
+import os
+import subprocess
+import sys
+import timeit
+import numpy as np
+from neuralNetwork import weight_store
+from neuralNetwork.mlp import tansig_net
+from neuralNetwork.ModelF import ModelF
+
+modules = ["components.Methane", "neuralNetwork.ModelF", "neuralNetwork.CL1", "PropertyPackage"]
+nets = ["Methane_liq", "ModelF_7", "ModelF_8"]
+
+def import_time(module, repeat=5):
+    code = ("import time, numpy, scipy.interpolate, pandas; start = time.perf_counter(); "
+            f"import {module}; print(time.perf_counter() - start)")
+    times = [float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                  check=True).stdout) for _ in range(repeat)]
+    return min(times)
+
+def literal_code(net):
+    """
+    Compiles the python source that rebuilds net from nested list literals, as written
+    in the original MATLAB exports.
+    """
+    source = "{" + ", ".join(f"{key!r}: np.array({np.asarray(value).tolist()!r})" for key, value in net.items()) + "}"
+    return compile(source, "<literal>", "eval")
+
+def main():
+    print(f"{'fresh import':<32}{'ms':>10}")
+    for module in modules:
+        print(f"{module:<32}{import_time(module) * 1e3:>10.2f}")
+
+    print()
+    print(f"{'network':<16}{'load .npz (us)':>16}{'literals (us)':>16}")
+    for name in nets:
+        path = os.path.join(weight_store.WEIGHT_DIR, name + ".npz")
+        def load():
+            weight_store._nets.pop(path, None)
+            weight_store.load_net(name)
+        code = literal_code(weight_store.load_net(name))
+        t_load = min(timeit.repeat(load, number=200, repeat=5)) / 200
+        t_literal = min(timeit.repeat(lambda: eval(code, {"np": np}), number=200, repeat=5)) / 200
+        print(f"{name:<16}{t_load * 1e6:>16.1f}{t_literal * 1e6:>16.1f}")
+
+    print()
+    x = np.array([[0.95, 0.03, 0.01, 0.01, 200.0, 110.0, 115.0]] * 3)
+    code = literal_code(weight_store.load_net("ModelF_7"))
+    def literal_ModelF(x):
+        net = eval(code, {"np": np})
+        x = np.array(x, dtype=float)
+        x[:, -3:-1] = (x[:, -3:-1] - net["Pmin"]) / (net["Pmax"] - net["Pmin"])
+        x[:, -1] = (x[:, -1] - net["Tmin"]) / (net["Tmax"] - net["Tmin"])
+        return tansig_net(x, net["b1"], net["IW1_1"], net["b2"], net["LW2_1"], net["x_xoffset"], net["x_gain"],
+                          net["x_ymin"], net["y1_ymin"], net["y1_gain"], net["y1_xoffset"])
+    t_store = min(timeit.repeat(lambda: ModelF(x), number=2000, repeat=5)) / 2000
+    t_literal = min(timeit.repeat(lambda: literal_ModelF(x), number=2000, repeat=5)) / 2000
+    print(f"ModelF, 3 feeds: {t_store * 1e6:.1f} us per call with the weight store, "
+          f"{t_literal * 1e6:.1f} us rebuilding the weights from literals")
+
+if __name__ == "__main__":
+    main()
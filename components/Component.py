@@ -3,6 +3,13 @@ import numpy as np
 """
 This is a python file to define the properties of a component.
 Do not change the function names!
+
+Optionally, a component whose enthalpy and heat capacity come from a MATLAB-exported
+single-input ANN can also define the module level dictionaries liq_net and vap_net
+(see components/Methane.py), with outputs [enthalpy, heat capacity]. These are then
+evaluated together with the other components in one batched pass. The dictionaries can
+be written out as literals, or converted once to weight files with
+neuralNetwork/convert_weights.py and loaded with neuralNetwork.weight_store.load_net.
 """
 def vapor_pressure(T):
     """
@@ -1,4 +1,5 @@
-import numpy as np
+from neuralNetwork.mlp import temperature_net
+from neuralNetwork.weight_store import load_net
 
 def vapor_pressure(T):
     P_s = 0.0039*(T**3) - 1.0268*(T**2) + 93.435*T - 2896.7
@@ -8,250 +9,24 @@ def density(T):
     LD = 434.6 + 0*T
     return LD
 
-def liq_enthalpy(T):
-    x = np.array(T)
-
-    Tmin = -170 + 273.15
-    Tmax = -130 + 273.15
-    x = (x - Tmin) / (Tmax - Tmin)
-
-    Q = len(x)
-
-    x_xoffset = 0.05
-    x_gain = 4
-    x_ymin = -1
-
-    # Layer 1
-    b1 = [[-5.4659836470057632241],[-6.3112160998070532258],[3.5093427712738973767],[2.7388190807465297993],[-1.0001100865238170545],
-        [-0.050671316605543456624],[-1.6199133093108155634],[-0.19515072270546562905],[8.2642815765633219627],[-4.4137170921377837374]]
-
-    b1 = np.array(b1)
-
-    IW1_1 = [[5.3191961549465860415],[7.5955762691729944436],[-5.1283676883686464265],[-5.63206176497242339],[3.4726991756527256783],
-            [-6.7662140615419561485],[-8.3891621852053308572],[-0.45843321035804124319],[11.427747519114822339],[-4.2438977841069416286]]
-
-    IW1_1 = np.array(IW1_1)
-
-    # Layer 2
-    b2 = [[-0.31180297502305898139], [-0.17825346758835852734]]
-    b2 = np.array(b2)
-
-    LW2_1 = [[0.060265649881227768836, 0.009806744613589709475, -0.029372628699245451056, -0.0098723936464147499931, 0.025237196135635353578,
-            -0.0016343789167856202088, -0.00063351675942744929519, -2.1499597031671848768, 0.00028288985315490900547, -0.013482246355602542018],
-            [0.14388510866512740916, 0.020977316536027790922, -0.075436339107375530166, -0.020880167180678487621, 0.084219826766348773739,
-            -0.0084950221887451510955, -0.009933698841604568508, -1.7693030937355875842, -0.0019296000646688864135, 0.024178063704714883309]]
-
-    LW2_1 = np.array(LW2_1)
-
-    # Output 1
-    y1_ymin = -1
-    y1_gain = [[2.8320569907456*10**(-5)], [0.0134082990380211]]
-    y1_xoffset = [[6906.85449849907], [3448.91851335571]]
-
-
-    xp1 = [(x[i][0]-x_xoffset)*x_gain+x_ymin for i in range(len(x))]
-
-    a1 = np.empty((len(b1), 0))
-    a2 = np.array([])
-
-    for i in range(len(xp1)):
-        b3 = b1 + IW1_1*xp1[i]
-        a = 2 / (1 + np.exp(-2*b3)) - 1
-        a1 = np.append(a1, a, axis=1)
-
-    a2 = np.repeat(b2, Q, axis=1) + np.matmul(LW2_1, a1)
-
-    a3 = a2 - y1_ymin
-    a3 = np.divide(a3, y1_gain)
-    a3 = a3 + y1_xoffset
-
-    y1 = np.transpose(a3)
+## Liquid and vapor phase ANNs, outputs: [enthalpy (J/kg), heat capacity (J/kg/K)]
+## Weights in neuralNetwork/weights/Methane_liq.npz and Methane_vap.npz
+liq_net = load_net("Methane_liq")
+vap_net = load_net("Methane_vap")
 
+def liq_enthalpy(T):
+    y1 = temperature_net(T, liq_net)
     return y1[:,0]
 
 def vap_enthalpy(T):
-    x = np.array(T)
-
-    Tmin = -170 + 273.15
-    Tmax = -130 + 273.15
-    x = (x - Tmin) / (Tmax - Tmin)
-
-    Q = len(x)
-
-    x_xoffset = 0.05
-    x_gain = 4
-    x_ymin = -1
-
-    # Layer 1
-    b1 = [[-7.1860167313655587407],[-4.9510817195974015092],[2.4176005872471182379],[2.6809799679152854779],[0.85481430726846441281],
-        [-0.37364833941900110759],[0.19189739929693364062],[-5.5944016044552942191],[-1.7858050729622882979],[12.500175851465092691]]
-
-
-    b1 = np.array(b1)
-
-    IW1_1 = [[6.6343971422820455786],[5.3706661791838419262],[-3.1101241436996680534],[-5.63224587988993175],[-1.9066519031974795695],
-            [-8.467408981542716262],[0.72951550803177989124],[-9.8122247527277384194],[-1.2816696628132917546],[12.490234883087284246]]
-
-
-    IW1_1 = np.array(IW1_1)
-
-    # Layer 2
-    b2 = [[-0.41145297847952910786], [0.015136002464959861374]]
-    b2 = np.array(b2)
-
-    LW2_1 = [[0.034601554840821995007, 0.017998930722716879188, -0.057044548175911855004, -0.00065891846119621032708, -0.081694875912279987795,
-            -4.3219284259182321611e-05, 1.2220043209332733802, -3.1958244004914561831e-05, -0.43646213571012343335, 0.00036787153951763388541],
-            [0.095359242666421928369, 0.049088536766890143725, -0.13863439356637077826, 0.00085505994391477319408, -0.22057824391632765981,
-            -0.0015206891547729392382, 1.0439254700505689044, 0.0012272670206960308113, 0.0028403967152065526421, 0.0023908362485956808491]]
-
-    LW2_1 = np.array(LW2_1)
-
-    # Output 1
-    y1_ymin = -1
-    y1_gain = [[6.28312752600286*10**(-5)], [0.0112404303643407]]
-    y1_xoffset = [[529278.582475826], [2149.84072457443]]
-
-
-    xp1 = [(x[i][0]-x_xoffset)*x_gain+x_ymin for i in range(len(x))]
-
-    a1 = np.empty((len(b1), 0))
-    a2 = np.array([])
-
-    for i in range(len(xp1)):
-        b3 = b1 + IW1_1*xp1[i]
-        a = 2 / (1 + np.exp(-2*b3)) - 1
-        a1 = np.append(a1, a, axis=1)
-
-    a2 = np.repeat(b2, Q, axis=1) + np.matmul(LW2_1, a1)
-
-    a3 = a2 - y1_ymin
-    a3 = np.divide(a3, y1_gain)
-    a3 = a3 + y1_xoffset
-
-    y1 = np.transpose(a3)
-
+    y1 = temperature_net(T, vap_net)
     return y1[:,0]
 
 def liq_heat_capacity(T):
-    x = np.array(T)
-
-    Tmin = -170 + 273.15
-    Tmax = -130 + 273.15
-    x = (x - Tmin) / (Tmax - Tmin)
-
-    Q = len(x)
-
-    x_xoffset = 0.05
-    x_gain = 4
-    x_ymin = -1
-
-    # Layer 1
-    b1 = [[-5.4659836470057632241],[-6.3112160998070532258],[3.5093427712738973767],[2.7388190807465297993],[-1.0001100865238170545],
-        [-0.050671316605543456624],[-1.6199133093108155634],[-0.19515072270546562905],[8.2642815765633219627],[-4.4137170921377837374]]
-
-    b1 = np.array(b1)
-
-    IW1_1 = [[5.3191961549465860415],[7.5955762691729944436],[-5.1283676883686464265],[-5.63206176497242339],[3.4726991756527256783],
-            [-6.7662140615419561485],[-8.3891621852053308572],[-0.45843321035804124319],[11.427747519114822339],[-4.2438977841069416286]]
-
-    IW1_1 = np.array(IW1_1)
-
-    # Layer 2
-    b2 = [[-0.31180297502305898139], [-0.17825346758835852734]]
-    b2 = np.array(b2)
-
-    LW2_1 = [[0.060265649881227768836, 0.009806744613589709475, -0.029372628699245451056, -0.0098723936464147499931, 0.025237196135635353578,
-            -0.0016343789167856202088, -0.00063351675942744929519, -2.1499597031671848768, 0.00028288985315490900547, -0.013482246355602542018],
-            [0.14388510866512740916, 0.020977316536027790922, -0.075436339107375530166, -0.020880167180678487621, 0.084219826766348773739,
-            -0.0084950221887451510955, -0.009933698841604568508, -1.7693030937355875842, -0.0019296000646688864135, 0.024178063704714883309]]
-
-    LW2_1 = np.array(LW2_1)
-
-    # Output 1
-    y1_ymin = -1
-    y1_gain = [[2.8320569907456*10**(-5)], [0.0134082990380211]]
-    y1_xoffset = [[6906.85449849907], [3448.91851335571]]
-
-
-    xp1 = [(x[i][0]-x_xoffset)*x_gain+x_ymin for i in range(len(x))]
-
-    a1 = np.empty((len(b1), 0))
-    a2 = np.array([])
-
-    for i in range(len(xp1)):
-        b3 = b1 + IW1_1*xp1[i]
-        a = 2 / (1 + np.exp(-2*b3)) - 1
-        a1 = np.append(a1, a, axis=1)
-
-    a2 = np.repeat(b2, Q, axis=1) + np.matmul(LW2_1, a1)
-
-    a3 = a2 - y1_ymin
-    a3 = np.divide(a3, y1_gain)
-    a3 = a3 + y1_xoffset
-
-    y1 = np.transpose(a3)
-
+    y1 = temperature_net(T, liq_net)
     return y1[:,1]
 
 def vap_heat_capacity(T):
-    x = np.array(T)
-
-    Tmin = -170 + 273.15
-    Tmax = -130 + 273.15
-    x = (x - Tmin) / (Tmax - Tmin)
-
-    Q = len(x)
-
-    x_xoffset = 0.05
-    x_gain = 4
-    x_ymin = -1
-
-    # Layer 1
-    b1 = [[-7.1860167313655587407],[-4.9510817195974015092],[2.4176005872471182379],[2.6809799679152854779],[0.85481430726846441281],
-        [-0.37364833941900110759],[0.19189739929693364062],[-5.5944016044552942191],[-1.7858050729622882979],[12.500175851465092691]]
-
-
-    b1 = np.array(b1)
-
-    IW1_1 = [[6.6343971422820455786],[5.3706661791838419262],[-3.1101241436996680534],[-5.63224587988993175],[-1.9066519031974795695],
-            [-8.467408981542716262],[0.72951550803177989124],[-9.8122247527277384194],[-1.2816696628132917546],[12.490234883087284246]]
-
-
-    IW1_1 = np.array(IW1_1)
-
-    # Layer 2
-    b2 = [[-0.41145297847952910786], [0.015136002464959861374]]
-    b2 = np.array(b2)
-
-    LW2_1 = [[0.034601554840821995007, 0.017998930722716879188, -0.057044548175911855004, -0.00065891846119621032708, -0.081694875912279987795,
-            -4.3219284259182321611e-05, 1.2220043209332733802, -3.1958244004914561831e-05, -0.43646213571012343335, 0.00036787153951763388541],
-            [0.095359242666421928369, 0.049088536766890143725, -0.13863439356637077826, 0.00085505994391477319408, -0.22057824391632765981,
-            -0.0015206891547729392382, 1.0439254700505689044, 0.0012272670206960308113, 0.0028403967152065526421, 0.0023908362485956808491]]
-
-    LW2_1 = np.array(LW2_1)
-
-    # Output 1
-    y1_ymin = -1
-    y1_gain = [[6.28312752600286*10**(-5)], [0.0112404303643407]]
-    y1_xoffset = [[529278.582475826], [2149.84072457443]]
-
-
-    xp1 = [(x[i][0]-x_xoffset)*x_gain+x_ymin for i in range(len(x))]
-
-    a1 = np.empty((len(b1), 0))
-    a2 = np.array([])
-
-    for i in range(len(xp1)):
-        b3 = b1 + IW1_1*xp1[i]
-        a = 2 / (1 + np.exp(-2*b3)) - 1
-        a1 = np.append(a1, a, axis=1)
-
-    a2 = np.repeat(b2, Q, axis=1) + np.matmul(LW2_1, a1)
-
-    a3 = a2 - y1_ymin
-    a3 = np.divide(a3, y1_gain)
-    a3 = a3 + y1_xoffset
-
-    y1 = np.transpose(a3)
-
+    y1 = temperature_net(T, vap_net)
     return y1[:,1]
+
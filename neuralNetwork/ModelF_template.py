@@ -14,6 +14,8 @@ def ModelF(x):
     P1 is its pressure before flashing,
     P2 is its pressure after flashing,
     V represents the component mass flows in its vapor phase as fractions of their feed flows
+    ModelF may also take a keyword argument backend ("numpy" or "numba"), which the
+    simulation then sets to the backend of its property package (see ModelF.py).
     """
     
     return
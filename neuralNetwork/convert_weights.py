@@ -0,0 +1,111 @@
+### Converts the weight literals of MATLAB-exported ANNs in python files to the weight
+### store format (see neuralNetwork/weight_store.py).
+### Run from the repository root, e.g.:
+###     python -m neuralNetwork.convert_weights components/Methane.py neuralNetwork/ModelF.py
+### Networks are found in two forms:
+###   - module level dictionaries containing "b1" (e.g. liq_net in components/*.py),
+###     written as <module>_<name without "_net">, e.g. Methane_liq.npz
+###   - assignments of the weight names inside a function (e.g. ModelF_template.py),
+###     written as <module>_<function> (just <module> if the two names are equal), with
+###     a suffix _<k> for the networks in the branches of an "if len(x[0]) == k:" chain,
+###     e.g. ModelF_7.npz and ModelF_8.npz
+
+import argparse
+import ast
+import os
+import numpy as np
+from neuralNetwork.weight_store import WEIGHT_DIR, save_net
+
+WEIGHT_KEYS = ["Tmin", "Tmax", "Pmin", "Pmax", "x_xoffset", "x_gain", "x_ymin",
+               "b1", "IW1_1", "b2", "LW2_1", "y1_ymin", "y1_gain", "y1_xoffset"]
+
+def _value(node):
+    """
+    Evaluates a literal expression (numbers, nested lists, arithmetic and np.array of
+    these). Returns None for anything that depends on other variables.
+    """
+    try:
+        return np.asarray(eval(compile(ast.Expression(node), "<weights>", "eval"),
+                               {"__builtins__": {}, "np": np}), dtype=float)
+    except Exception:
+        return None
+
+def _assignments(statements):
+    """
+    Collects the first literal assignment of each weight name in statements, without
+    descending into if/else branches.
+    """
+    net = {}
+    for statement in statements:
+        if (isinstance(statement, ast.Assign) and len(statement.targets) == 1
+                and isinstance(statement.targets[0], ast.Name)):
+            name = statement.targets[0].id
+            if name in WEIGHT_KEYS and name not in net:
+                value = _value(statement.value)
+                if value is not None:
+                    net[name] = value
+    return net
+
+def _branches(statement, k=0):
+    """
+    Yields (label, statements) for each branch of an if/elif/else chain. The label is
+    the constant compared against in the test, or the branch number.
+    """
+    while True:
+        label = k
+        if isinstance(statement.test, ast.Compare) and isinstance(statement.test.comparators[0], ast.Constant):
+            label = statement.test.comparators[0].value
+        yield label, statement.body
+        k += 1
+        if len(statement.orelse) == 1 and isinstance(statement.orelse[0], ast.If):
+            statement = statement.orelse[0]
+        else:
+            if statement.orelse:
+                yield k, statement.orelse
+            return
+
+def extract_nets(path):
+    """
+    Returns a dictionary {name: net} of all networks in the python file at path.
+    """
+    module = os.path.splitext(os.path.basename(path))[0]
+    prefix = lambda function: module if function == module else f"{module}_{function}"
+    with open(path) as file:
+        tree = ast.parse(file.read())
+    nets = {}
+    for statement in tree.body:
+        if (isinstance(statement, ast.Assign) and isinstance(statement.value, ast.Dict)
+                and isinstance(statement.targets[0], ast.Name)):
+            keys = [key.value for key in statement.value.keys if isinstance(key, ast.Constant)]
+            if "b1" in keys:
+                net = {key: _value(value) for key, value in zip(keys, statement.value.values) if key in WEIGHT_KEYS}
+                name = statement.targets[0].id
+                nets[f"{module}_{name[:-4] if name.endswith('_net') else name}"] = net
+        elif isinstance(statement, ast.FunctionDef):
+            net = _assignments(statement.body)
+            if "b1" in net:
+                nets[prefix(statement.name)] = net
+            for inner in statement.body:
+                if isinstance(inner, ast.If):
+                    for label, body in _branches(inner):
+                        branch = dict(net)
+                        branch.update(_assignments(body))
+                        if "b1" in _assignments(body):
+                            nets[f"{prefix(statement.name)}_{label}"] = branch
+    return nets
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert ANN weight literals to .npz weight files.")
+    parser.add_argument("files", nargs="+", help="python files containing the weight literals")
+    parser.add_argument("--out", default=WEIGHT_DIR, help="output directory (default neuralNetwork/weights)")
+    args = parser.parse_args()
+    for path in args.files:
+        for name, net in extract_nets(path).items():
+            missing = [key for key in WEIGHT_KEYS[4:] if key not in net]
+            if missing:
+                print(f"{path}: {name} is missing {missing}, skipped")
+                continue
+            print(f"{path}: {name} -> {save_net(name, net, args.out)}")
+
+if __name__ == "__main__":
+    main()
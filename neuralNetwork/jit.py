@@ -0,0 +1,155 @@
+### Optional numba backend for the network evaluations in neuralNetwork/mlp.py and for the
+### pure component property functions (vapor pressure and density polynomials).
+### With backend="numba" the functions in mlp.py run compiled nopython kernels instead of
+### NumPy. The backend is an argument of those functions, held by each PropertyPackage
+### (and passed on to ModelF by TankModel), so tanks with different backends can share
+### a process. Compiled kernels are cached on disk (numba cache=True), so only the first
+### run on a machine pays for compilation. Without numba installed the NumPy
+### implementation is used and resolve_backend("numba") only issues a warning.
+### The kernels remove the per-call overhead of the NumPy implementation, which dominates
+### for the few temperatures of a typical residual. NumPy's vectorised tanh is faster for
+### large batches, so batches of more than MAX_KERNEL_ROWS samples still use NumPy.
+
+import warnings
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ["numpy", "numba"]
+NUMBA_AVAILABLE = numba is not None
+
+MAX_KERNEL_ROWS = 64
+
+# temperatures (K) that jit_function compiles the component functions for
+SAMPLE_TEMPERATURES = np.array([110.0, 120.0])
+
+def resolve_backend(name):
+    """
+    Returns the backend to use for name ("numpy" or "numba"), which is "numpy" if numba
+    is not installed.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name}. Choose from {BACKENDS}.")
+    if name == "numba" and not NUMBA_AVAILABLE:
+        warnings.warn("numba is not installed, using the NumPy backend.")
+        name = "numpy"
+    return name
+
+def jit_function(func):
+    """
+    Returns a compiled version of a pure numeric function of a temperature array, such
+    as the vapor_pressure and density functions in components/*.py. The function is
+    compiled here, for a vector of temperatures. If it cannot be compiled in nopython
+    mode (e.g. it calls pandas), a warning is issued and the function itself is used.
+    """
+    if not NUMBA_AVAILABLE:
+        return func
+    compiled = numba.njit(cache=True)(func)
+    try:
+        compiled(SAMPLE_TEMPERATURES)
+    except numba.core.errors.NumbaError as error:
+        warnings.warn(f"{func.__module__}.{func.__name__} cannot be compiled with numba, using the NumPy "
+                      f"version ({type(error).__name__}).", RuntimeWarning)
+        return func
+    return compiled
+
+if NUMBA_AVAILABLE:
+
+    @numba.njit(cache=True)
+    def tansig_kernel(x, b1, IW1_1, b2, LW2_1, x_xoffset, x_gain, x_ymin, y1_ymin, y1_gain, y1_xoffset):
+        """
+        Compiled tansig_net for x of dimension Q x R. Returns y of dimension Q x M.
+        """
+        Q, R = x.shape
+        H = b1.shape[0]
+        M = b2.shape[0]
+        y = np.empty((Q, M))
+        xp1 = np.empty(R)
+        a1 = np.empty(H)
+        for q in range(Q):
+            for r in range(R):
+                xp1[r] = (x[q, r] - x_xoffset[r]) * x_gain[r] + x_ymin
+            for h in range(H):
+                n = b1[h]
+                for r in range(R):
+                    n += IW1_1[h, r] * xp1[r]
+                a1[h] = np.tanh(n)
+            for m in range(M):
+                n = b2[m]
+                for h in range(H):
+                    n += LW2_1[m, h] * a1[h]
+                y[q, m] = (n - y1_ymin) / y1_gain[m] + y1_xoffset[m]
+        return y
+
+    @numba.njit(cache=True)
+    def stacked_kernel(T, Tmin, Trange, x_xoffset, x_gain, x_ymin, b1, IW1_1, W, y0):
+        """
+        Compiled stacked_temperature_net for T of dimension Q x 1 or Q x I, using the
+        folded output weights W and y0 of the stack. Returns y of dimension Q x I x M.
+        """
+        Q = T.shape[0]
+        I, M, H = W.shape
+        y = np.empty((Q, I, M))
+        for q in range(Q):
+            for i in range(I):
+                t = T[q, 0] if T.shape[1] == 1 else T[q, i]
+                xp1 = ((t - Tmin[i]) / Trange[i] - x_xoffset[i]) * x_gain[i] + x_ymin[i]
+                for m in range(M):
+                    y[q, i, m] = y0[i, m]
+                for h in range(H):
+                    a1 = np.tanh(xp1 * IW1_1[i, h] + b1[i, h])
+                    for m in range(M):
+                        y[q, i, m] += W[i, m, h] * a1
+        return y
+
+    @numba.njit(cache=True)
+    def stacked_derivative_kernel(T, Tmin, Trange, x_xoffset, x_gain, x_ymin, b1, IW1_1, W, dW, dW_sum, y0, output):
+        """
+        Compiled stacked_temperature_net_derivative. Returns y and dy/dT of dimension Q x I.
+        """
+        Q = T.shape[0]
+        I, M, H = W.shape
+        y = np.empty((Q, I))
+        dy = np.empty((Q, I))
+        for q in range(Q):
+            for i in range(I):
+                t = T[q, 0] if T.shape[1] == 1 else T[q, i]
+                xp1 = ((t - Tmin[i]) / Trange[i] - x_xoffset[i]) * x_gain[i] + x_ymin[i]
+                s = y0[i, output]
+                ds = dW_sum[i, output]
+                for h in range(H):
+                    a1 = np.tanh(xp1 * IW1_1[i, h] + b1[i, h])
+                    s += W[i, output, h] * a1
+                    ds -= dW[i, output, h] * a1 * a1
+                y[q, i] = s
+                dy[q, i] = ds
+        return y, dy
+
+    @numba.njit(cache=True)
+    def stacked_value_derivative_kernel(T, Tmin, Trange, x_xoffset, x_gain, x_ymin, b1, IW1_1, W, dW, dW_sum, y0,
+                                        output):
+        """
+        Compiled stacked_temperature_net_and_derivative. Returns y of dimension Q x I x M
+        and dy/dT of dimension Q x I.
+        """
+        Q = T.shape[0]
+        I, M, H = W.shape
+        y = np.empty((Q, I, M))
+        dy = np.empty((Q, I))
+        for q in range(Q):
+            for i in range(I):
+                t = T[q, 0] if T.shape[1] == 1 else T[q, i]
+                xp1 = ((t - Tmin[i]) / Trange[i] - x_xoffset[i]) * x_gain[i] + x_ymin[i]
+                for m in range(M):
+                    y[q, i, m] = y0[i, m]
+                ds = dW_sum[i, output]
+                for h in range(H):
+                    a1 = np.tanh(xp1 * IW1_1[i, h] + b1[i, h])
+                    for m in range(M):
+                        y[q, i, m] += W[i, m, h] * a1
+                    ds -= dW[i, output, h] * a1 * a1
+                dy[q, i] = ds
+        return y, dy
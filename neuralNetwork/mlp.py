@@ -0,0 +1,189 @@
+### Shared evaluation engine for the two-layer tansig networks exported from MATLAB
+### (mapminmax -> tansig -> purelin -> reverse mapminmax), as used by the component
+### property functions in components/*.py and the CL/CV/EL/EV modules.
+### With backend="numba" (as resolved by neuralNetwork.jit.resolve_backend) the
+### evaluations run compiled kernels.
+
+import numpy as np
+from neuralNetwork import jit
+
+def tansig_net(x, b1, IW1_1, b2, LW2_1, x_xoffset, x_gain, x_ymin, y1_ymin, y1_gain, y1_xoffset, backend="numpy"):
+    """
+    Evaluates the network for all Q samples in one pass.
+    x is the (already range-normalised) input of dimension Q x R, or a vector of
+    length Q when the network has a single input. Returns y of dimension Q x M where
+    M is the number of network outputs, matching the layout of the MATLAB export.
+    backend is "numpy" or "numba".
+    """
+    IW1_1 = np.asarray(IW1_1, dtype=float)
+    LW2_1 = np.asarray(LW2_1, dtype=float)
+    R = IW1_1.shape[1]
+    x = np.asarray(x, dtype=float).reshape(-1, R)
+
+    if backend == "numba" and len(x) <= jit.MAX_KERNEL_ROWS:
+        vector = lambda v: np.ascontiguousarray(np.asarray(v, dtype=float).reshape(-1))
+        return jit.tansig_kernel(np.ascontiguousarray(x), vector(b1), np.ascontiguousarray(IW1_1), vector(b2),
+                                 np.ascontiguousarray(LW2_1), vector(x_xoffset), vector(x_gain), float(x_ymin),
+                                 float(y1_ymin), vector(y1_gain), vector(y1_xoffset))
+
+    # Input mapminmax
+    xp1 = x - np.asarray(x_xoffset, dtype=float).reshape(-1)
+    xp1 *= np.asarray(x_gain, dtype=float).reshape(-1)
+    xp1 += x_ymin
+
+    # Layer 1: tansig(n) = 2/(1+exp(-2n))-1 = tanh(n)
+    a1 = np.matmul(xp1, IW1_1.T)
+    a1 += np.asarray(b1, dtype=float).reshape(-1)
+    np.tanh(a1, out=a1)
+
+    # Layer 2 and output reverse mapminmax
+    y1 = np.matmul(a1, LW2_1.T)
+    y1 += np.asarray(b2, dtype=float).reshape(-1)
+    y1 -= y1_ymin
+    y1 /= np.asarray(y1_gain, dtype=float).reshape(-1)
+    y1 += np.asarray(y1_xoffset, dtype=float).reshape(-1)
+    return y1
+
+def temperature_net(T, net, backend="numpy"):
+    """
+    Evaluates a single-input temperature network described by the dictionary net
+    (Tmin, Tmax and the tansig_net weights) at the temperatures T (in K) with backend
+    as in tansig_net. Returns y of dimension Q x M.
+    """
+    x = np.asarray(T, dtype=float).reshape(-1)
+    x = (x - net["Tmin"]) / (net["Tmax"] - net["Tmin"])
+    return tansig_net(x, net["b1"], net["IW1_1"], net["b2"], net["LW2_1"], net["x_xoffset"], net["x_gain"],
+                      net["x_ymin"], net["y1_ymin"], net["y1_gain"], net["y1_xoffset"], backend)
+
+def stack_temperature_nets(nets):
+    """
+    Stacks the weights of I single-input temperature networks so that they can be
+    evaluated together by stacked_temperature_net. Networks with fewer hidden neurons
+    are padded with zero weights, which contribute nothing to the outputs.
+    """
+    I = len(nets)
+    H = max(np.asarray(net["b1"]).size for net in nets)
+    M = max(np.asarray(net["b2"]).size for net in nets)
+    stack = {
+        "Tmin": np.array([net["Tmin"] for net in nets], dtype=float),
+        "Trange": np.array([net["Tmax"] - net["Tmin"] for net in nets], dtype=float),
+        "x_xoffset": np.array([net["x_xoffset"] for net in nets], dtype=float),
+        "x_gain": np.array([net["x_gain"] for net in nets], dtype=float),
+        "x_ymin": np.array([net["x_ymin"] for net in nets], dtype=float),
+        "b1": np.zeros((I, H)),
+        "IW1_1": np.zeros((I, H)),
+        "b2": np.zeros((I, M)),
+        "LW2_1": np.zeros((I, M, H)),
+        "y1_ymin": np.array([net["y1_ymin"] for net in nets], dtype=float),
+        "y1_gain": np.ones((I, M)),
+        "y1_xoffset": np.zeros((I, M)),
+    }
+    for i, net in enumerate(nets):
+        h = np.asarray(net["b1"]).size
+        m = np.asarray(net["b2"]).size
+        stack["b1"][i, :h] = np.asarray(net["b1"], dtype=float).reshape(-1)
+        stack["IW1_1"][i, :h] = np.asarray(net["IW1_1"], dtype=float).reshape(-1)
+        stack["b2"][i, :m] = np.asarray(net["b2"], dtype=float).reshape(-1)
+        stack["LW2_1"][i, :m, :h] = np.asarray(net["LW2_1"], dtype=float).reshape(m, h)
+        stack["y1_gain"][i, :m] = np.asarray(net["y1_gain"], dtype=float).reshape(-1)
+        stack["y1_xoffset"][i, :m] = np.asarray(net["y1_xoffset"], dtype=float).reshape(-1)
+
+    # Output layer folded with the reverse mapminmax (y = a1.W + y0) and, for the
+    # temperature derivative, with the input scaling (dy/dT = (1 - a1^2).dW)
+    stack["W"] = stack["LW2_1"] / stack["y1_gain"][:, :, np.newaxis]
+    stack["dW"] = stack["W"] * (stack["IW1_1"] * (stack["x_gain"] / stack["Trange"])[:, np.newaxis])[:, np.newaxis, :]
+    stack["dW_sum"] = stack["dW"].sum(axis=2)
+    stack["y0"] = stack["y1_xoffset"] + (stack["b2"] - stack["y1_ymin"][:, np.newaxis]) / stack["y1_gain"]
+    return stack
+
+def stacked_temperature_net(T, stack, backend="numpy"):
+    """
+    Evaluates all I stacked networks at the Q temperatures T (in K) in one pass.
+    T is a vector of length Q shared by all networks, or a Q x I array with one
+    column per network, backend as in tansig_net. Returns y of dimension Q x I x M.
+    """
+    T = np.asarray(T, dtype=float)
+    if T.ndim < 2:
+        T = T.reshape(-1, 1)
+    if backend == "numba" and len(T) <= jit.MAX_KERNEL_ROWS:
+        return jit.stacked_kernel(np.ascontiguousarray(T), stack["Tmin"], stack["Trange"], stack["x_xoffset"],
+                                  stack["x_gain"], stack["x_ymin"], stack["b1"], stack["IW1_1"], stack["W"],
+                                  stack["y0"])
+    xp1 = (T - stack["Tmin"]) / stack["Trange"]
+    xp1 -= stack["x_xoffset"]
+    xp1 *= stack["x_gain"]
+    xp1 += stack["x_ymin"]
+
+    a1 = xp1[:, :, np.newaxis] * stack["IW1_1"]
+    a1 += stack["b1"]
+    np.tanh(a1, out=a1)
+
+    y1 = np.einsum("qih,imh->qim", a1, stack["LW2_1"])
+    y1 += stack["b2"]
+    y1 -= stack["y1_ymin"][:, np.newaxis]
+    y1 /= stack["y1_gain"]
+    y1 += stack["y1_xoffset"]
+    return y1
+
+def stacked_temperature_net_derivative(T, stack, output=0, backend="numpy"):
+    """
+    Evaluates one output of all I stacked networks and its exact derivative with
+    respect to temperature in the same pass (chain rule through mapminmax and tansig,
+    d tanh(n)/dn = 1 - tanh(n)^2). T and backend are as in stacked_temperature_net.
+    Returns y and dy/dT (per K), both of dimension Q x I.
+    """
+    T = np.asarray(T, dtype=float)
+    if T.ndim < 2:
+        T = T.reshape(-1, 1)
+    if backend == "numba" and len(T) <= jit.MAX_KERNEL_ROWS:
+        return jit.stacked_derivative_kernel(np.ascontiguousarray(T), stack["Tmin"], stack["Trange"],
+                                             stack["x_xoffset"], stack["x_gain"], stack["x_ymin"], stack["b1"],
+                                             stack["IW1_1"], stack["W"], stack["dW"], stack["dW_sum"],
+                                             stack["y0"], output)
+    xp1 = (T - stack["Tmin"]) / stack["Trange"]
+    xp1 -= stack["x_xoffset"]
+    xp1 *= stack["x_gain"]
+    xp1 += stack["x_ymin"]
+
+    a1 = xp1[:, :, np.newaxis] * stack["IW1_1"]
+    a1 += stack["b1"]
+    np.tanh(a1, out=a1)
+
+    y1 = np.einsum("qih,ih->qi", a1, stack["W"][:, output])
+    y1 += stack["y0"][:, output]
+    a1 *= a1
+    dy1 = np.einsum("qih,ih->qi", a1, stack["dW"][:, output])
+    np.subtract(stack["dW_sum"][:, output], dy1, out=dy1)
+    return y1, dy1
+
+def stacked_temperature_net_and_derivative(T, stack, output=0, backend="numpy"):
+    """
+    Evaluates all outputs of the I stacked networks, as stacked_temperature_net, and
+    the exact temperature derivative of one output, as
+    stacked_temperature_net_derivative, from the same hidden layer pass. T and backend
+    are as in stacked_temperature_net. Returns y of dimension Q x I x M and dy/dT (per
+    K) of dimension Q x I.
+    """
+    T = np.asarray(T, dtype=float)
+    if T.ndim < 2:
+        T = T.reshape(-1, 1)
+    if backend == "numba" and len(T) <= jit.MAX_KERNEL_ROWS:
+        return jit.stacked_value_derivative_kernel(np.ascontiguousarray(T), stack["Tmin"], stack["Trange"],
+                                                   stack["x_xoffset"], stack["x_gain"], stack["x_ymin"],
+                                                   stack["b1"], stack["IW1_1"], stack["W"], stack["dW"],
+                                                   stack["dW_sum"], stack["y0"], output)
+    xp1 = (T - stack["Tmin"]) / stack["Trange"]
+    xp1 -= stack["x_xoffset"]
+    xp1 *= stack["x_gain"]
+    xp1 += stack["x_ymin"]
+
+    a1 = xp1[:, :, np.newaxis] * stack["IW1_1"]
+    a1 += stack["b1"]
+    np.tanh(a1, out=a1)
+
+    y1 = np.einsum("qih,imh->qim", a1, stack["W"])
+    y1 += stack["y0"]
+    a1 *= a1
+    dy1 = np.einsum("qih,ih->qi", a1, stack["dW"][:, output])
+    np.subtract(stack["dW_sum"][:, output], dy1, out=dy1)
+    return y1, dy1
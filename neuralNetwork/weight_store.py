@@ -0,0 +1,40 @@
+### Weight store for the MATLAB-exported ANNs.
+### Each network is kept as one uncompressed .npz file in neuralNetwork/weights/ holding
+### the tansig_net arrays (b1, IW1_1, b2, LW2_1, x_xoffset, x_gain, x_ymin, y1_ymin,
+### y1_gain, y1_xoffset) and any input scaling constants (Tmin, Tmax, Pmin, Pmax).
+### The files are written by neuralNetwork/convert_weights.py.
+
+import os
+import numpy as np
+
+WEIGHT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "weights")
+
+_nets = {}
+
+def load_net(name, weight_dir=WEIGHT_DIR):
+    """
+    Returns the network stored in weight_dir/<name>.npz as a dictionary of read-only
+    float64 arrays. Each file is read once per process; later calls return the same
+    dictionary.
+    """
+    path = os.path.join(weight_dir, name + ".npz")
+    if path not in _nets:
+        net = {}
+        with np.load(path) as data:
+            for key in data.files:
+                array = np.array(data[key], dtype=float)
+                array.setflags(write=False)
+                net[key] = array
+        _nets[path] = net
+    return _nets[path]
+
+def save_net(name, net, weight_dir=WEIGHT_DIR):
+    """
+    Writes the dictionary of arrays/scalars net to weight_dir/<name>.npz as float64.
+    Returns the path of the file.
+    """
+    os.makedirs(weight_dir, exist_ok=True)
+    path = os.path.join(weight_dir, name + ".npz")
+    np.savez(path, **{key: np.asarray(value, dtype=float) for key, value in net.items()})
+    _nets.pop(path, None)
+    return path
@@ -0,0 +1,103 @@
+### Reference residuals of the original model (the run_simulation closures of Tank_v2
+### before TankModel) for tests/test_tank_model.py, saved to tests/data/baseline_residuals.npz.
+### Run from the repository root with a checkout of the original tree, e.g.
+###     git archive <baseline commit> | tar -x -C /tmp/baseline
+###     python -m tests.baseline_residuals /tmp/baseline
+### The original model runs in a separate process on its own modules. Its residual
+### closure f is taken from the Implicit_Problem call of run_simulation (assimulo is
+### not needed for that), and its tankfunc and mass are evaluated at random states of
+### the base case near the initial state, with 5 liquid and 5 vapor disks and the
+### forcing of the first interval. The vapor pressure of the ModelZg input (Tank.Pg,
+### the pressure of the previous evaluation) is iterated to its fixed point first.
+### Ethane.vap_enthalpy of the original tree returned the heat capacity output of its
+### network; it is corrected to the enthalpy output, as in the components now.
+
+import os
+import sys
+import json
+import types
+import inspect
+import subprocess
+import numpy as np
+
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "baseline_residuals.npz")
+STATES = 4
+MINUTES = 10
+
+def main(checkout):
+    from Sweep import BASE_CASE
+    config = {**BASE_CASE, "numberofIterations": MINUTES, "noLDisks": 5, "noVDisks": 5}
+    config["feed_product_df"] = os.path.abspath(config["feed_product_df"])
+    config["diskinitCombined"] = os.path.abspath(config["diskinitCombined"])
+    subprocess.run([sys.executable, os.path.abspath(__file__), "--original", os.path.abspath(checkout), OUTPUT],
+                   input=json.dumps(config), text=True, check=True, cwd=checkout)
+    print(f"Saved {OUTPUT}")
+
+def original(checkout, output, seed=0):
+    import pandas as pd
+    sys.path.insert(0, checkout)
+    for name in ["assimulo", "assimulo.problem", "assimulo.solvers"]:
+        if name not in sys.modules:
+            try:
+                __import__(name)
+            except ImportError:
+                sys.modules[name] = types.ModuleType(name)
+    sys.modules["assimulo.problem"].Implicit_Problem = None
+    sys.modules["assimulo.solvers"].IDA = None
+    import Tank_v2
+    import components.Ethane as ethane
+    head, _, tail = inspect.getsource(ethane.vap_enthalpy).rpartition("return y1[:, 1]")
+    exec(head + "return y1[:, 0]" + tail, vars(ethane))
+
+    config = json.loads(sys.stdin.read())
+    tables = pd.read_excel(config["feed_product_df"], sheet_name=None)
+    config["feed_product_df"] = {name: table[table.iloc[:, 0] <= MINUTES] for name, table in tables.items()}
+    config["diskinitCombined"] = pd.read_excel(config["diskinitCombined"])
+    for name in ["feeds", "products", "molecular_weights"]:
+        config[name] = {int(key): value for key, value in config[name].items()}
+    tank = Tank_v2.Tank(**config)
+    tank.data_preprocessing()
+
+    captured = {}
+    class Captured(Exception):
+        pass
+    def problem(f, y0, dy0, t0):
+        captured.update(f=f, y0=np.array(y0, dtype=float))
+        raise Captured
+    Tank_v2.Implicit_Problem = problem
+    try:
+        tank.run_simulation()
+    except Captured:
+        pass
+    f = captured["f"]
+    closure = dict(zip(f.__code__.co_freevars, [cell.cell_contents for cell in f.__closure__]))
+    tankfunc, mass = closure["tankfunc"], closure["mass"]
+
+    y0 = captured["y0"]
+    N = tank.noLDisks + tank.noVDisks
+    NC = N + N * tank.noComponents
+    rng = np.random.default_rng(seed)
+    states = {name: [] for name in ["t", "u", "du", "tankfunc", "mass", "Pg"]}
+    for _ in range(STATES):
+        u = y0 * (1 + 0.02 * rng.uniform(-1, 1, len(y0)))
+        u[NC:] = 0.01 * rng.standard_normal(len(y0) - NC)
+        du = 1e-4 * np.abs(u) * rng.standard_normal(len(y0))
+        t = rng.uniform(0, 300)
+        for _ in range(100):
+            Pg = float(np.ravel(tank.Pg)[0])
+            tankfunc(u, t)
+            if abs(float(np.ravel(tank.Pg)[0]) - Pg) <= 1e-14 * abs(Pg):
+                break
+        states["t"].append(t)
+        states["u"].append(u)
+        states["du"].append(du)
+        states["tankfunc"].append(np.ravel(tankfunc(u, t)))
+        states["mass"].append(mass(u))
+        states["Pg"].append(float(np.ravel(tank.Pg)[0]))
+    np.savez_compressed(output, **{name: np.array(values) for name, values in states.items()})
+
+if __name__ == "__main__":
+    if sys.argv[1] == "--original":
+        original(sys.argv[2], sys.argv[3])
+    else:
+        main(sys.argv[1])
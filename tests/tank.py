@@ -0,0 +1,33 @@
+### Small base case tanks for the tests of TankModel, without the IDA solver.
+
+import functools
+from Tank_v2 import Tank
+from TankModel import TankModel
+from Sweep import BASE_CASE, load_config
+
+@functools.lru_cache(maxsize=None)
+def base_case_config():
+    return load_config(BASE_CASE)
+
+def small_tank(minutes=10, noLDisks=3, noVDisks=3, **kwargs):
+    """
+    Returns a pre-processed Tank with the base case inputs (Sweep.BASE_CASE) and the
+    feed and product schedules cut after minutes, so that data_preprocessing is quick.
+    Keyword arguments override the base case arguments of Tank.
+    """
+    config = dict(base_case_config())
+    config["feed_product_df"] = {name: table[table.iloc[:, 0] <= minutes]
+                                 for name, table in config["feed_product_df"].items()}
+    myTank = Tank(**{**config, "numberofIterations": minutes, "noLDisks": noLDisks, "noVDisks": noVDisks,
+                     **kwargs})
+    myTank.data_preprocessing()
+    return myTank
+
+def small_model(minutes=10, noLDisks=3, noVDisks=3, **kwargs):
+    """
+    Returns the TankModel of small_tank with the forcing of the first interval and its
+    initial state (NE).
+    """
+    tankModel = TankModel(small_tank(minutes, noLDisks, noVDisks, **kwargs))
+    tankModel.set_interval(0)
+    return tankModel, tankModel.initial_state().ravel()
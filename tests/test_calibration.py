@@ -0,0 +1,92 @@
+### Calibration of the tank coefficients to measurements (least squares on the logarithms).
+### Run from the repository root:  python -m pytest tests
+### The Tank is replaced by a closed form response of the pressure and level to sigma
+### and Ul, with exact sensitivities, and the worker processes of the finite
+### differences by a loop, so that a known pair of coefficients can be recovered
+### without IDA.
+
+import numpy as np
+import pandas as pd
+import pytest
+from Calibration import Calibration
+from tests.tank import base_case_config
+
+SIGMA, UL = 5e-09, 200.0  # base case values
+TRUE = {"sigma": 1.6 * SIGMA, "Ul": 0.7 * UL}
+
+class ResponseTank:
+    """
+    Stand-in for Tank with the calls of Calibration: PV (kPa) rises to 110 + 8 s with
+    the time constant 60 u min and h (m) falls at the rate 1e-3 s u m/min, where s and
+    u are sigma and Ul relative to the base case. Runs with s > 3 fail.
+    """
+    def __init__(self, sensitivities=None, **config):
+        self.__dict__.update(config)
+        self.sensitivityParameters = list(sensitivities or [])
+
+    def check_input(self):
+        return True
+
+    def data_preprocessing(self):
+        pass
+
+    def run_simulation(self):
+        s, u = self.sigma / SIGMA, self.Ul / UL
+        if s > 3:
+            raise FloatingPointError("The pressure diverged.")
+        minutes = np.concatenate(([0.0], self.outputGrid))
+        e = np.exp(-minutes / (60 * u))
+        self.t = (minutes / (24 * 60)).reshape(-1, 1)
+        self.PV = 110 + 8 * s * (1 - e)
+        self.h = 90 - 1e-3 * s * u * minutes
+        derivatives = {"sigma": {"PV": 8 * (1 - e) / SIGMA, "h": -1e-3 * u * minutes / SIGMA},
+                       "Ul": {"PV": -8 * s * e * minutes / (60 * u ** 2) / UL, "h": -1e-3 * s * minutes / UL}}
+        self.sensitivities = {name: np.column_stack([derivatives[p][name] for p in self.sensitivityParameters])
+                              for name in ["PV", "h"]} if self.sensitivityParameters else {}
+
+def serial_sweep(base, variants, workers=None, outputs=()):
+    for index, variant in enumerate(variants):
+        tank = ResponseTank(**{**base, **variant})
+        tank.run_simulation()
+        trajectories = {"time (min)": np.ravel(tank.t) * 24 * 60, **{name: getattr(tank, name) for name in outputs}}
+        yield index, variant, {"status": "ok", "trajectories": trajectories}
+
+@pytest.fixture
+def measurements(monkeypatch):
+    monkeypatch.setattr("Calibration.Tank", ResponseTank)
+    monkeypatch.setattr("Calibration.iter_sweep", serial_sweep)
+    tank = ResponseTank(**TRUE, outputGrid=np.arange(5.0, 125.0, 5.0))
+    tank.run_simulation()
+    table = pd.DataFrame({"Time (min)": np.ravel(tank.t) * 24 * 60, "Pressure (kPa)": tank.PV, "h (m)": tank.h})
+    table.loc[3, "h (m)"] = np.nan  # a missing measurement
+    return table
+
+@pytest.mark.parametrize("gradient", ["sensitivities", "finite-difference"])
+def test_recovers_known_coefficients(measurements, gradient):
+    calibration = Calibration(base_case_config(), measurements, ["sigma", "Ul"], gradient)
+    assert len(calibration.measured) == 2 * len(measurements) - 1
+    result = calibration.fit()
+    assert result["success"] and result["cost"] < 1e-12 * result["initial cost"]
+    for name, value in TRUE.items():
+        assert result["parameters"][name] == pytest.approx(value, rel=1e-6)
+    assert result["simulations"] == len(calibration.history) and (result["history"]["status"] == "ok").all()
+    table = calibration.comparison(result["parameters"])
+    assert np.allclose(table["Simulated Pressure (kPa)"], measurements["Pressure (kPa)"], rtol=1e-9)
+
+def test_sensitivities_match_finite_differences(measurements):
+    exact = Calibration(base_case_config(), measurements, ["sigma", "Ul"], "sensitivities")
+    differences = Calibration(base_case_config(), measurements, ["sigma", "Ul"], "finite-difference")
+    z = np.array([0.2, -0.1])
+    J = exact.jacobian(z)
+    assert np.allclose(differences.jacobian(z), J, rtol=0.05, atol=0.05 * np.abs(J).max())
+    # the perturbed runs are cached
+    assert differences.residuals(z + [np.log(1.01), 0]) is not None and differences.cacheHits == 1
+
+def test_failed_run_is_not_cached(measurements):
+    calibration = Calibration(base_case_config(), measurements, ["sigma", "Ul"])
+    z = np.array([np.log(4.0), 0.0])
+    assert np.isnan(calibration.residuals(z)).all()
+    assert calibration.history[-1]["status"].startswith("FloatingPointError")
+    assert calibration._key(z) not in calibration.cache
+    with pytest.raises(RuntimeError):
+        calibration.jacobian(z)
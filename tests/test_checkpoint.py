@@ -0,0 +1,58 @@
+### Checkpoints (Checkpoint.py): save, crash, resume and fork of a run.
+### Run from the repository root:  python -m pytest tests
+
+import os
+import numpy as np
+from Checkpoint import CheckpointWriter, load_checkpoint
+from Trajectory import Trajectory
+
+NE = 3
+ROWS = 4  # output rows per 5 minute interval
+
+def output(interval, scenario=0.0):
+    """
+    Returns the output times and rows of the interval of a made-up scenario.
+    """
+    t = 300.0 * interval + np.linspace(75.0, 300.0, ROWS)
+    return t, np.column_stack([np.sin(t + k + scenario) for k in range(NE)])
+
+def run(path, intervals, checkpoint=None, scenario=0.0, every=2):
+    """
+    Writes the checkpoints of a run over the intervals, as Tank.run_simulation does,
+    from checkpoint (load_checkpoint) if given. Returns the trajectory.
+    """
+    trajectory = Trajectory(NE)
+    if checkpoint is None:
+        trajectory.append([0.0], np.zeros((1, NE)))
+    else:
+        trajectory.append(checkpoint["t"], checkpoint["y"])
+    writer = CheckpointWriter(path, checkpoint)
+    for r in intervals:
+        trajectory.append(*output(r, scenario))
+        if (r + 1) % every == 0:
+            writer.write(r + 1, trajectory.y[-1], trajectory.t, trajectory.y, {"nsteps": r + 1}, [])
+    return trajectory
+
+def test_crash_resume_and_fork(tmp_path):
+    path = os.path.join(tmp_path, "run_{minutes}.npz")
+    reference = run(os.path.join(tmp_path, "reference_{minutes}.npz"), range(8))
+
+    # the run stops after the checkpoint at 20 min and is resumed from it
+    run(path, range(5))
+    resumed = run(path, range(4, 8), load_checkpoint(path.format(minutes=20)))
+    assert np.array_equal(resumed.y, reference.y)
+    checkpoint = load_checkpoint(path.format(minutes=40))
+    assert np.array_equal(checkpoint["t"], reference.t) and np.array_equal(checkpoint["y"], reference.y)
+    assert checkpoint["interval"] == 8 and checkpoint["statistics"] == {"nsteps": 8}
+
+    # another scenario from the checkpoint at 10 min, written to the same checkpoint files
+    fork = run(path, range(2, 4), load_checkpoint(path.format(minutes=10)), scenario=1.0)
+    checkpoint = load_checkpoint(path.format(minutes=20))
+    assert np.array_equal(checkpoint["y"], fork.y)
+    assert np.array_equal(checkpoint["y"][:1 + 2 * ROWS], reference.y[:1 + 2 * ROWS])
+    assert not np.allclose(checkpoint["y"][1 + 2 * ROWS:], reference.y[1 + 2 * ROWS:1 + 4 * ROWS])
+    # the later checkpoints of the original run still hold its output
+    for minutes in [30, 40]:
+        checkpoint = load_checkpoint(path.format(minutes=minutes))
+        assert np.array_equal(checkpoint["y"], reference.y[:len(checkpoint["y"])])
+    assert len([name for name in os.listdir(tmp_path) if name.startswith("run_history")]) == 3
@@ -0,0 +1,61 @@
+### Cached Poisson feed and product distributions of TankModel.
+### Run from the repository root:  python -m pytest tests
+
+import numpy as np
+import pytest
+from scipy.stats import poisson
+from TankModel import distribution, distribution_counters, poisson_pmf
+
+def original(m, NL, N, product=False):
+    # the feed (and liquid product) distribution loops of the original run_simulation,
+    # not normalised
+    column = np.zeros(N)
+    for i in range(N):
+        if product and m == NL:
+            column[i] = poisson.pmf(m - i - 1, mu=1) if i <= m - 1 else 0
+        elif m > NL:
+            if i <= NL - 1:
+                column[i] = poisson.pmf(NL - i - 1, mu=1)
+            elif i < m - 1:
+                column[i] = poisson.pmf(m - i - 2, mu=1)
+            else:
+                column[i] = poisson.pmf(i - m + 1, mu=1)
+        elif m == NL:
+            column[i] = poisson.pmf(NL - i - 1 if i <= NL - 1 else i - NL, mu=1)
+        elif i <= m - 1:
+            column[i] = poisson.pmf(m - i - 1, mu=1)
+        elif i <= NL - 1:
+            column[i] = poisson.pmf(i - m, mu=1)
+    return column
+
+def normalised(column, NL):
+    column = column.copy()
+    for phase in [slice(None, NL), slice(NL, None)]:
+        if column[phase].sum() > 0:
+            column[phase] /= column[phase].sum()
+    return column
+
+def test_poisson_pmf():
+    assert np.allclose(poisson_pmf(30), poisson.pmf(np.arange(30), mu=1), rtol=1e-14, atol=0)
+    assert len(poisson_pmf(0)) == 0
+
+@pytest.mark.parametrize("NL, N", [(5, 10), (3, 7), (20, 50)])
+def test_distributions_match_original(NL, N):
+    for m in range(1, N + 1):
+        assert np.allclose(distribution("feed", m, NL, N), normalised(original(m, NL, N), NL), rtol=1e-13)
+    for m in range(1, NL + 1):
+        assert np.allclose(distribution("product", m, NL, N), normalised(original(m, NL, N, True), NL), rtol=1e-13)
+    # the original indexed outside the kernel of a vapor product with more than one vapor disk
+    for m in range(NL + 1, N + 1):
+        column = distribution("product", m, NL, N)
+        assert not column[:NL].any() and column[NL:].sum() == pytest.approx(1.0)
+
+def test_cached_once():
+    key = ("feed", 4, 6, 17)
+    misses, hits = distribution_counters["misses"], distribution_counters["hits"]
+    column = distribution(*key)
+    assert distribution_counters["misses"] == misses + 1
+    assert distribution(*key) is column
+    assert distribution_counters["hits"] == hits + 1
+    with pytest.raises(ValueError):
+        column[0] = 1.0
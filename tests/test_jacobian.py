@@ -0,0 +1,34 @@
+### Structured (grouped finite difference) Jacobian of TankModel.
+### Run from the repository root:  python -m pytest tests
+
+import numpy as np
+import pytest
+from TankModel import RESIDUAL_MODES
+from tests.tank import small_model
+
+def jacobian_residuals(tankModel, *args):
+    # residual evaluations of one sparse_jacobian
+    count = tankModel.statistics["jacobian residuals"]
+    tankModel.sparse_jacobian(*args)
+    return tankModel.statistics["jacobian residuals"] - count
+
+@pytest.mark.parametrize("residual", RESIDUAL_MODES)
+def test_structured_equals_finite_differences(residual):
+    tankModel, u0 = small_model(residual=residual)
+    rng = np.random.default_rng(1)
+    for c, t in [(1.0, 0.0), (100.0, 150.0)]:
+        u = u0 * (1 + 0.01 * rng.uniform(-1, 1, len(u0)))
+        du = tankModel.consistent_derivative(u, t)
+        J = tankModel.sparse_jacobian(c, t, u, du).toarray()
+        assert np.array_equal(J, tankModel.finite_difference_jacobian(c, t, u, du))
+        assert np.array_equal(J, tankModel.jacobian(c, t, u, du))
+        assert tankModel.check_jacobian(c, t, u, du) == 0.0
+
+def test_residuals_per_jacobian_do_not_grow():
+    counts = []
+    for n in [5, 20]:
+        tankModel, u = small_model(noLDisks=n, noVDisks=n)
+        count = jacobian_residuals(tankModel, 1.0, 0.0, u, tankModel.consistent_derivative(u, 0.0))
+        counts.append(count)
+        assert count < tankModel.NE / 2
+    assert counts[0] == counts[1]
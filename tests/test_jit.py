@@ -0,0 +1,31 @@
+### Network backends of PropertyPackage (neuralNetwork/jit.py).
+### Run from the repository root:  python -m pytest tests
+
+import numpy as np
+import pandas as pd
+import pytest
+from neuralNetwork import jit
+from PropertyPackage import PropertyPackage, HEAT_CAPACITY_MODES
+from tests.test_property_package import COMPONENTS, T
+
+def pandas_function(T):
+    return pd.Series(T).to_numpy() * 2
+
+@pytest.mark.skipif(not jit.NUMBA_AVAILABLE, reason="numba is not installed")
+@pytest.mark.parametrize("heat_capacity", HEAT_CAPACITY_MODES)
+def test_backend_per_package(heat_capacity):
+    numpy = PropertyPackage(COMPONENTS, backend="numpy", heat_capacity=heat_capacity)
+    numba = PropertyPackage(COMPONENTS, backend="numba", heat_capacity=heat_capacity)
+    assert (numpy.backend, numba.backend) == ("numpy", "numba")
+    for phase in ["liq_prop", "vap_prop", "vapor_pressure"]:
+        assert np.allclose(getattr(numpy, phase)(T[:10]), getattr(numba, phase)(T[:10]), rtol=1e-12)
+
+@pytest.mark.skipif(not jit.NUMBA_AVAILABLE, reason="numba is not installed")
+def test_uncompilable_function_warns():
+    with pytest.warns(RuntimeWarning, match="pandas_function"):
+        function = jit.jit_function(pandas_function)
+    assert function is pandas_function
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        PropertyPackage(COMPONENTS, backend="cuda")
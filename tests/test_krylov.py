@@ -0,0 +1,38 @@
+### SPGMR residuals of TankModel: the preconditioned krylov_residual against residual.
+### Run from the repository root:  python -m pytest tests
+
+import numpy as np
+from scipy.sparse.linalg import LinearOperator, gmres
+from tests.tank import small_model
+
+def backward_euler(residual, jacobian_vector, u, du, NE, h=30.0, steps=10):
+    """
+    Integrates residual(t, u, du) = 0 with backward Euler steps of h seconds, solving
+    the Newton systems with GMRES on the Jacobian-vector products, as the SPGMR solver
+    of IDA does. Returns the states (steps + 1 x NE).
+    """
+    t, states = 0.0, [u]
+    for _ in range(steps):
+        t += h
+        v = u + h * du
+        for _ in range(20):
+            dv = (v - u) / h
+            F = residual(t, v, dv)
+            J = LinearOperator((NE, NE), matvec=lambda x: jacobian_vector(t, v, dv, F, x, 1 / h))
+            delta = gmres(J, -F, rtol=1e-12, atol=0.0, restart=NE, maxiter=5)[0]
+            v = v + delta
+            if np.linalg.norm(delta) <= 1e-10 * np.linalg.norm(v):
+                break
+        u, du = v, (v - u) / h
+        states.append(u)
+    return np.array(states)
+
+def test_preconditioned_residual_same_trajectory():
+    tankModel, u0 = small_model()
+    du0 = tankModel.consistent_derivative(u0, 0.0)
+    NE = tankModel.NE
+    reference = backward_euler(tankModel.residual, tankModel.jacobian_vector, u0, du0, NE)
+    preconditioned = backward_euler(tankModel.krylov_residual, tankModel.krylov_jacobian_vector, u0, du0, NE)
+    assert tankModel.statistics["preconditioner updates"] >= 1
+    assert np.allclose(preconditioned, reference, rtol=1e-7, atol=1e-9)
+    assert not np.allclose(reference[-1], u0, rtol=1e-7, atol=1e-9)
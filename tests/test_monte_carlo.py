@@ -0,0 +1,40 @@
+### Streaming P-square percentile estimates of the Monte Carlo bands.
+### Run from the repository root:  python -m pytest tests
+
+import numpy as np
+import pytest
+from MonteCarlo import PERCENTILES, StreamingPercentiles
+
+def test_first_samples_are_exact():
+    rng = np.random.default_rng(5)
+    x = rng.standard_normal((40, 6))
+    estimator = StreamingPercentiles(PERCENTILES, exact=100)
+    for row in x:
+        estimator.add(row)
+    assert np.array_equal(estimator.percentiles(), np.percentile(x, PERCENTILES, axis=0))
+    with pytest.raises(ValueError):
+        StreamingPercentiles().percentiles()
+
+@pytest.mark.parametrize("draw", ["normal", "lognormal", "uniform"])
+def test_stream_follows_np_percentile(draw):
+    rng = np.random.default_rng(6)
+    samples, length = 5000, 4
+    x = getattr(rng, draw)(size=(samples, length)) * np.arange(1, length + 1)
+    estimator = StreamingPercentiles(PERCENTILES, exact=50)
+    for row in x:
+        estimator.add(row)
+    exact = np.percentile(x, PERCENTILES, axis=0)
+    spread = np.percentile(x, 99, axis=0) - np.percentile(x, 1, axis=0)
+    assert estimator.count == samples and estimator.percentiles().shape == exact.shape
+    assert np.all(np.abs(estimator.percentiles() - exact) < 0.02 * spread)
+    # P5 < P50 < P95 for every element
+    assert np.all(np.diff(estimator.percentiles(), axis=0) > 0)
+
+def test_markers_stay_ordered():
+    rng = np.random.default_rng(7)
+    estimator = StreamingPercentiles([5, 50, 95], exact=5)
+    for _ in range(2000):
+        estimator.add(rng.exponential(size=3))
+    assert np.all(np.diff(estimator.q, axis=1) >= 0)
+    assert np.all(np.diff(estimator.n, axis=1) >= 1)
+    assert np.all(estimator.n[:, 4] == estimator.count - 1)
@@ -0,0 +1,47 @@
+### Vapor pressure fixed point of TankModel (PV = factor Z(PV)).
+### Run from the repository root:  python -m pytest tests
+
+import numpy as np
+import pytest
+from tests.tank import small_model
+
+def states(tankModel, u0, count=3):
+    rng = np.random.default_rng(2)
+    return [u0 * (1 + 0.02 * rng.uniform(-1, 1, len(u0))) for _ in range(count)]
+
+def ideal_gas_pressure(tankModel, context):
+    # NV R T sumw / (A (H - h) Mw) of the top vapor disk (the pressure at Z = 1)
+    return tankModel.NV * tankModel.R * context["T"][-1] * context["sumw"][-1] / \
+        (tankModel.A * (tankModel.H - context["h"]) * context["Mw"][-1])
+
+def test_pressure_is_fixed_point():
+    tankModel, u0 = small_model()
+    NL = tankModel.NL
+    for u in states(tankModel, u0):
+        context = tankModel.context(u)
+        x, T, PV = context["x"], context["T"], context["PV"]
+        AN = np.concatenate((x[:, -1], [PV, T[-1]])).reshape(1, -1)
+        factor = ideal_gas_pressure(tankModel, context)
+        assert factor * max(tankModel.ModelZg.ModelZg(AN)[0][0], 0) == pytest.approx(PV, rel=1e-10)
+        # the vapor disks are at PV, with densities from their own Z
+        assert np.allclose(context["P"][NL:], PV)
+        assert np.allclose(context["rho"][NL:], PV * context["Mw"][NL:] / (context["Z"] * tankModel.R * T[NL:]))
+
+def test_pressure_does_not_depend_on_history():
+    tankModel, u0 = small_model()
+    us = states(tankModel, u0)
+    first = [tankModel.context(u)["PV"] for u in us]
+    second = [tankModel.context(u)["PV"] for u in reversed(us)][::-1]
+    assert first == second
+    assert tankModel.statistics["pressure failures"] == 0
+
+def test_batched_pressure():
+    tankModel, u0 = small_model()
+    contexts = [tankModel.context(u) for u in states(tankModel, u0)]
+    NL, NV = tankModel.NL, tankModel.NV
+    zf = np.array([context["x"][:, NL:].T for context in contexts])
+    TV = np.array([context["T"][NL:] for context in contexts])
+    factor = np.array([ideal_gas_pressure(tankModel, context) for context in contexts])
+    PV, Z = tankModel.pressure(zf, TV, factor)
+    assert np.allclose(PV, [context["PV"] for context in contexts], rtol=1e-10)
+    assert Z.shape == (len(contexts), NV)
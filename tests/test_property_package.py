@@ -0,0 +1,48 @@
+### Heat capacities of PropertyPackage on the operating grid of the tank.
+### Run from the repository root:  python -m pytest tests
+
+import numpy as np
+import pytest
+from PropertyPackage import PropertyPackage, PROPERTY_MODES, HEAT_CAPACITY_MODES, evaluate_table, \
+    evaluate_table_and_derivative
+from neuralNetwork.mlp import stacked_temperature_net, stacked_temperature_net_derivative, \
+    stacked_temperature_net_and_derivative
+
+COMPONENTS = ["components.Methane", "components.Ethane", "components.Propane", "components.Nitrogen"]
+# training window of the component networks (K)
+T = np.linspace(103.15, 143.15, 401)
+
+@pytest.mark.parametrize("mode", PROPERTY_MODES)
+@pytest.mark.parametrize("heat_capacity", HEAT_CAPACITY_MODES)
+def test_heat_capacity_positive(mode, heat_capacity):
+    properties = PropertyPackage(COMPONENTS, mode=mode, heat_capacity=heat_capacity)
+    for phase in [properties.liq_prop, properties.vap_prop]:
+        Cp = phase(T)[1]
+        assert np.all(np.isfinite(Cp))
+        assert np.all(Cp > 0)
+
+def test_derivative_within_tolerance_of_network():
+    network = PropertyPackage(COMPONENTS, heat_capacity="network")
+    derivative = PropertyPackage(COMPONENTS, heat_capacity="derivative")
+    for phase in ["liq_prop", "vap_prop"]:
+        Cp, dH = getattr(network, phase)(T)[1], getattr(derivative, phase)(T)[1]
+        assert np.all(np.abs(dH - Cp) <= derivative.heat_capacity_tol * Cp)
+    # nitrogen vapor: dH/dT of the enthalpy network is negative over the whole window
+    assert derivative.fallbacks["vap_prop"] >= len(T)
+
+@pytest.mark.parametrize("mode", PROPERTY_MODES)
+def test_one_pass_matches_separate_evaluations(mode):
+    properties = PropertyPackage(COMPONENTS, mode=mode)
+    for stack, table in [(properties.liq_stack, properties.liq_table), (properties.vap_stack, properties.vap_table)]:
+        # 95-150 K also covers the network fallback of the tables outside the training window
+        Tw = np.linspace(95.0, 150.0, 111)
+        if table is None:
+            y, dy = stacked_temperature_net_and_derivative(Tw, stack)
+            y_ref, dy_ref = stacked_temperature_net(Tw, stack), stacked_temperature_net_derivative(Tw, stack)[1]
+        else:
+            y, dy = evaluate_table_and_derivative(Tw, table, stack)
+            y_ref = evaluate_table(Tw, table, stack)
+            h = 1e-4
+            dy_ref = (evaluate_table(Tw + h, table, stack) - evaluate_table(Tw - h, table, stack))[:, :, 0] / (2 * h)
+        assert np.allclose(y, y_ref, rtol=1e-12, atol=1e-9)
+        assert np.allclose(dy, dy_ref, rtol=1e-6, atol=1e-6)
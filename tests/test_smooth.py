@@ -0,0 +1,47 @@
+### Smooth residual mode of TankModel: blends of the switches and their limits.
+### Run from the repository root:  python -m pytest tests
+
+import numpy as np
+from TankModel import smoothstep, smooth_max
+from tests.tank import small_model
+
+def test_smooth_max():
+    width = 0.1
+    x = np.linspace(-1, 1, 2001)
+    y = smooth_max(x, width)
+    outside = np.abs(x) >= width
+    assert np.array_equal(y[outside], np.maximum(x[outside], 0))
+    assert smooth_max(0.0, width) == 0.0
+    assert np.max(np.abs(y - np.maximum(x, 0))) < width / 4
+    # continuous derivative, also at the ends of the blend
+    slope = np.diff(y) / np.diff(x)
+    assert np.max(np.abs(np.diff(slope))) < 0.02
+    assert smoothstep(-1.0) == 0.0 and smoothstep(2.0) == 1.0 and smoothstep(0.5) == 0.5
+
+def test_small_width_gives_exact_residual():
+    exact, u0 = small_model()
+    smooth = small_model(residual="smooth", smoothWidth=1e-6)[0]
+    rng = np.random.default_rng(3)
+    NC = exact.NC
+    for t in [0.0, 120.0]:
+        u = u0 * (1 + 0.02 * rng.uniform(-1, 1, len(u0)))
+        u[NC:] = 0.01 * rng.standard_normal(len(u0) - NC)
+        du = exact.consistent_derivative(u, t)
+        F = exact.residual(t, u, du)
+        assert np.max(np.abs(smooth.residual(t, u, du) - F)) <= 1e-12 * np.max(np.abs(F))
+
+def test_stream_moves_continuously_between_disks():
+    exact, u0 = small_model(noLDisks=5, noVDisks=5)
+    smooth = small_model(noLDisks=5, noVDisks=5, residual="smooth")[0]
+    h = exact.context(u0)["h"]
+    # feed heights across the boundary between the second and third liquid disk
+    n = np.linspace(2.0, 3.0, 401) * h / exact.NL
+    jumps = {}
+    for name, tankModel in [("exact", exact), ("smooth", smooth)]:
+        matrix, disks, weights = tankModel.stream_distribution("feed", n, h)
+        assert np.allclose(weights.sum(axis=0), 1)
+        jumps[name] = np.max(np.abs(np.diff(matrix, axis=1)))
+    assert jumps["smooth"] < 0.1 * jumps["exact"]
+    # outside the blend both put the stream on the same disk
+    for tankModel in [exact, smooth]:
+        assert np.array_equal(tankModel.stream_distribution("feed", n[:1], h)[0], matrix[:, :1])
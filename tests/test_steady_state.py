@@ -0,0 +1,41 @@
+### Direct steady state of TankModel (Newton's method on steady_residual).
+### Run from the repository root:  python -m pytest tests
+
+import numpy as np
+import pytest
+from TankModel import INTERVAL
+from tests.tank import small_model, small_tank
+
+def test_steady_state_keeps_targets():
+    tankModel, u0 = small_model()
+    N, NC = tankModel.N, tankModel.NC
+    targets = tankModel.steady_targets(u0)
+    u, iterations = tankModel.steady_state(u0)
+    assert 0 < iterations < 50
+    G = tankModel.steady_residual(u, 0.0, targets)
+    assert np.max(np.abs(G)) < 1e-9
+    kept = tankModel.steady_targets(u)
+    assert kept["h"] == pytest.approx(targets["h"], rel=1e-9)
+    assert kept["vapor"] == pytest.approx(targets["vapor"], rel=1e-9)
+    assert np.allclose(kept["x"], targets["x"], rtol=0, atol=1e-9)
+    # the temperatures no longer change, the algebraic equations hold
+    du = tankModel.consistent_derivative(u, 0.0)
+    assert np.max(np.abs(du[:N])) * INTERVAL < 1e-9
+    assert np.max(np.abs(tankModel.tankfunc(u, 0.0).reshape(-1)[NC:])) < 1e-9
+
+def test_steady_state_is_fixed_point():
+    tankModel, u0 = small_model()
+    u = tankModel.steady_state(u0)[0]
+    v, iterations = tankModel.steady_state(u)
+    assert iterations == 1
+    assert np.allclose(v, u, rtol=1e-8, atol=1e-10)
+
+def test_tank_steady_state():
+    myTank = small_tank()
+    steady = myTank.steady_state()
+    assert steady is myTank.steadyState
+    assert len(steady["disk conditions"]) == 6
+    tankModel, u0 = small_model()
+    u = tankModel.steady_state(u0)[0]
+    assert steady["pressure (kPa)"] == pytest.approx(tankModel.context(u)["PV"], rel=1e-12)
+    assert np.allclose(steady["disk conditions"].iloc[:, 1].to_numpy(float), tankModel.context(u)["T"], rtol=1e-12)
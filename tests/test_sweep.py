@@ -0,0 +1,18 @@
+### Worker processes of the parameter sweeps (Sweep.py).
+### Run from the repository root:  python -m pytest tests
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from Sweep import BASE_CASE, WORKER_ENVIRONMENT, iter_sweep, _init_worker
+
+def test_worker_environment_only_in_workers(monkeypatch):
+    for name in WORKER_ENVIRONMENT:
+        monkeypatch.delenv(name, raising=False)
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(WORKER_ENVIRONMENT,)) as pool:
+        assert {name: pool.submit(os.getenv, name).result() for name in WORKER_ENVIRONMENT} == WORKER_ENVIRONMENT
+    # a run that fails at once: the sweep reports it and leaves this process alone
+    (index, variant, result), = iter_sweep(BASE_CASE, [{"linearSolver": "lu"}], workers=1)
+    assert result["status"].startswith("ValueError") and result["trajectories"] is None
+    assert not any(name in os.environ for name in WORKER_ENVIRONMENT)
@@ -0,0 +1,49 @@
+### TankModel against the original run_simulation closures of Tank_v2 (reference values
+### in tests/data/baseline_residuals.npz, made by tests/baseline_residuals.py).
+### Run from the repository root:  python -m pytest tests
+
+import os
+import numpy as np
+import pytest
+from tests.tank import small_model
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "baseline_residuals.npz")
+
+@pytest.fixture(scope="module")
+def baseline():
+    tankModel = small_model(noLDisks=5, noVDisks=5)[0]
+    with np.load(BASELINE) as data:
+        states = [{name: data[name][k] for name in data.files} for k in range(len(data["t"]))]
+    return tankModel, states
+
+def close(a, b, rtol=1e-10):
+    # relative to the largest entry, as the balances of the disks differ by orders of magnitude
+    return np.max(np.abs(a - b)) <= rtol * np.max(np.abs(b))
+
+def test_tankfunc_matches_original(baseline):
+    tankModel, states = baseline
+    for state in states:
+        assert close(tankModel.tankfunc(state["u"], state["t"]).reshape(-1), state["tankfunc"])
+        assert tankModel.context(state["u"])["PV"] == pytest.approx(state["Pg"], rel=1e-10)
+
+def test_residual_matches_original(baseline):
+    tankModel, states = baseline
+    for state in states:
+        F = state["tankfunc"] - state["mass"] @ state["du"]
+        assert close(tankModel.residual(state["t"], state["u"], state["du"]), F)
+
+def test_mass_matrix_matches_original(baseline):
+    tankModel, states = baseline
+    for state in states:
+        u, du = state["u"], state["du"]
+        assert close(tankModel.mass(u), state["mass"], 1e-12)
+        assert close(tankModel.sparse_mass(u).toarray(), state["mass"], 1e-12)
+        assert close(tankModel.mass_product(u, du), state["mass"] @ du, 1e-12)
+
+def test_consistent_derivative_is_pinv(baseline):
+    tankModel, states = baseline
+    for state in states:
+        du = tankModel.consistent_derivative(state["u"], state["t"])
+        # the original initial derivative
+        assert close(du, np.linalg.pinv(state["mass"]) @ state["tankfunc"], 1e-8)
+        assert not du[tankModel.NC:].any()
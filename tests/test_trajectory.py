@@ -0,0 +1,37 @@
+### Output buffers (Trajectory) and output grids (output_grid) of Tank.run_simulation.
+### Run from the repository root:  python -m pytest tests
+
+import numpy as np
+import pytest
+from Trajectory import Trajectory, output_grid
+
+def test_segments_equal_np_append():
+    rng = np.random.default_rng(4)
+    trajectory = Trajectory(3, capacity=4)
+    t, y = np.zeros((0, 1)), np.zeros((0, 3))
+    for k in range(20):
+        tk, yk = rng.random(k % 5), rng.random((k % 5, 3))
+        trajectory.append(tk, yk)
+        t, y = np.append(t, tk.reshape(-1, 1), axis=0), np.append(y, yk, axis=0)
+    assert np.array_equal(trajectory.t, t) and np.array_equal(trajectory.y, y)
+    assert trajectory.n == len(t) and len(trajectory._t) < 2 * len(t)
+
+def test_reserve_keeps_rows():
+    trajectory = Trajectory(2, capacity=2)
+    trajectory.append([1.0, 2.0], [[1, 2], [3, 4]])
+    trajectory.reserve(100)
+    assert trajectory.nbytes == 100 * 8 * 3
+    assert np.array_equal(trajectory.y, [[1, 2], [3, 4]])
+
+def test_output_grid():
+    horizon = 40 * 60
+    assert np.array_equal(output_grid(0.5, horizon), np.arange(1, 81) * 30.0)
+    assert np.array_equal(output_grid(40, horizon), [horizon])
+    assert output_grid(7, horizon)[-1] == 35 * 60  # the horizon is not a multiple of the spacing
+    assert np.array_equal(output_grid([10, 0, 2.5, 10], horizon), [150.0, 600.0])
+    assert output_grid("steps", horizon) is None
+
+@pytest.mark.parametrize("outputGrid", [0, -1, 41, [], [0], [50], [-1, 10], "minutes"])
+def test_invalid_output_grid(outputGrid):
+    with pytest.raises(ValueError):
+        output_grid(outputGrid, 40 * 60)
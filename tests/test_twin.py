@@ -0,0 +1,74 @@
+### Stepwise digital twin (Tank.advance): held inputs, restarts and the carried step size.
+### Run from the repository root:  python -m pytest tests
+### IDA is replaced by a fixed step backward Euler solver with the same simulate and
+### re_init calls, so that the tests do not need assimulo.
+
+import numpy as np
+import pytest
+from Tank_v2 import Tank
+from tests.tank import small_tank
+
+class BackwardEuler:
+    """
+    Fixed step (h seconds) backward Euler integration of the residual of tankModel with
+    Newton iterations on its dense Jacobian. simulate returns the start and the steps,
+    or only the start if steps is False.
+    """
+    def __init__(self, tankModel, y0, dy0, t0, h=15.0):
+        self.tankModel = tankModel
+        self.h = h
+        self.inith = 0.0
+        self.steps = True
+        self.re_init(t0, y0, dy0)
+
+    def re_init(self, t0, y0, dy0):
+        self.t, self.y, self.yd = t0, np.array(y0, dtype=float), np.array(dy0, dtype=float)
+
+    def simulate(self, tfinal, ncp=0):
+        t, y = [self.t], [self.y]
+        while self.steps and self.t < tfinal - 1e-9:
+            h = min(self.h, tfinal - self.t)
+            tn, v = self.t + h, self.y + h * self.yd
+            for _ in range(20):
+                dv = (v - self.y) / h
+                delta = np.linalg.solve(self.tankModel.jacobian(1 / h, tn, v, dv), -self.tankModel.residual(tn, v, dv))
+                v = v + delta
+                if np.linalg.norm(delta) <= 1e-10 * np.linalg.norm(v):
+                    break
+            self.t, self.y, self.yd = tn, v, (v - self.y) / h
+            t.append(tn)
+            y.append(v)
+        return t, y, None
+
+@pytest.fixture
+def backward_euler(monkeypatch):
+    monkeypatch.setattr(Tank, "_solver", lambda self, tankModel, y0, dy0, t0, names=():
+                        BackwardEuler(tankModel, y0, dy0, t0))
+
+def test_two_steps_equal_one(backward_euler):
+    twice, once = small_tank(), small_tank()
+    first = twice.advance(60.0)
+    second = twice.advance(60.0)
+    state = once.advance(120.0)
+    assert first["restarted"] and not second["restarted"]
+    assert (first["steps"], second["steps"], state["steps"]) == (4, 4, 8)
+    assert second["time (min)"] == state["time (min)"] == 2.0
+    assert np.allclose(twice.twin["u"], once.twin["u"], rtol=1e-12, atol=1e-14)
+    assert second["pressure (kPa)"] == pytest.approx(state["pressure (kPa)"], rel=1e-12)
+
+def test_changed_inputs_restart(backward_euler):
+    myTank = small_tank()
+    myTank.advance(60.0)
+    assert not myTank.advance(60.0, product_inputs={1: myTank.twin["model"].Ag[0]})["restarted"]
+    assert myTank.advance(60.0, feed_inputs={2: {"flow": 10.0}})["restarted"]
+    assert myTank.twin["model"].Af[1] == 10.0
+    with pytest.raises(ValueError):
+        myTank.advance(60.0, feed_inputs={2: {"composition": [1.0]}})
+
+def test_no_steps_keep_step_size(backward_euler):
+    myTank = small_tank()
+    myTank.advance(60.0)
+    assert myTank.twin["step"] == 15.0
+    myTank.twin["solver"].steps = False
+    state = myTank.advance(60.0)
+    assert state["steps"] == 0 and myTank.twin["step"] == 15.0